@@ -0,0 +1,43 @@
+"""Benchmark rendering hexdumps of unparsed ``.el1`` entries.
+
+Run with ``python benchmarks/bench_hexdump.py``.
+"""
+
+import timeit
+from pathlib import Path
+
+from el1_parse.structures.el1 import el1
+from el1_parse.structures.hexdump_norepeat import (
+    HexDumpRepeatSuppressedBytes,
+    hexdump_repeat_suppressed,
+)
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+REPEAT = 20
+
+
+def main() -> None:
+    """Time rendering every unparsed entry of the largest sample file."""
+    sample = max(SAMPLES_DIR.glob("*.el1"), key=lambda path: path.stat().st_size)
+    parsed = el1.parse(sample.read_bytes())
+    print(f"{sample.name}:")
+    total = 0.0
+    for entry in parsed.entries:
+        if not isinstance(entry.data, HexDumpRepeatSuppressedBytes):
+            continue
+        data = entry.data.data
+        width = entry.data._width  # noqa: SLF001
+        seconds = (
+            timeit.timeit(
+                lambda data=data, width=width: hexdump_repeat_suppressed(data, width),
+                number=REPEAT,
+            )
+            / REPEAT
+        )
+        total += seconds
+        print(f"  {entry.name:<18} {len(data):>8} bytes  {seconds * 1000:8.3f} ms")
+    print(f"  {'total':<18} {'':>14}  {total * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark the startup time of the ``el1-parse`` command in different modes.
+
+Run with ``python benchmarks/bench_startup.py --budget 150``. Each mode runs
+``el1-parse`` on a sample file in a fresh interpreter with ``-X importtime``, and
+records the total import time, the wall time of the whole command and the
+slowest imports. Exits with an error status if the import time of any mode
+exceeds the budget in milliseconds.
+
+Byte-compile the package first (e.g. ``python -m compileall src``), and don't set
+``PYTHONDONTWRITEBYTECODE``, or compiling the sources is measured too.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+SAMPLE = Path(__file__).parent.parent / "samples" / "p1-l001-f1one-f2two.el1"
+MODES = {
+    "import": None,
+    "extract": ["--extract", "--archive", "tar", str(SAMPLE)],
+    "entry": ["--entry", "PhotoFile.dat", str(SAMPLE)],
+    "check": ["--check", str(SAMPLE)],
+    "parse": ["--format", "json", str(SAMPLE)],
+}
+RUN_MAIN = "from el1_parse.__main__ import main; main()"
+DEFAULT_BUDGET_MS = 150.0
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Return the module, depth and cumulative microseconds of each import."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), depth, int(cumulative)))
+    return imports
+
+
+def bench_mode(args: list[str] | None, repeat: int, top: int) -> dict[str, Any]:
+    """Run ``el1-parse`` with ``args`` and measure its imports and wall time."""
+    command = [sys.executable, "-X", "importtime", "-c"]
+    command += ["import el1_parse.__main__"] if args is None else [RUN_MAIN, *args]
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key != "PYTHONDONTWRITEBYTECODE"
+    }
+    wall_times = []
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(  # noqa: S603
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            env=env,
+            check=False,
+        )
+        wall_times.append(time.perf_counter() - start)
+        if result.returncode:
+            sys.exit(result.stderr.decode())
+        imports = parse_importtime(result.stderr.decode())
+        runs.append((sum(us for _, depth, us in imports if depth == 0), imports))
+    total, imports = min(runs, key=lambda run: run[0])
+    slowest = sorted(
+        (item for item in imports if item[1] == 1), key=lambda item: -item[2]
+    )
+    return {
+        "import_ms": total / 1000,
+        "wall_ms": min(wall_times) * 1000,
+        "modules": len(imports),
+        "slowest_imports": {name: us / 1000 for name, _, us in slowest[:top]},
+    }
+
+
+def main() -> None:
+    """Run the benchmarks, write the results as JSON and check the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Maximum import time of each mode in ms (default: {DEFAULT_BUDGET_MS})",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs to take the best times of"
+    )
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to list")
+    parser.add_argument("--output", type=Path, help="Write JSON here, not to stdout")
+    opts = parser.parse_args()
+    results = {}
+    over_budget = False
+    for mode, args in MODES.items():
+        results[mode] = bench_mode(args, opts.repeat, opts.top)
+        import_ms = results[mode]["import_ms"]
+        flag = "  OVER BUDGET" if import_ms > opts.budget else ""
+        over_budget |= bool(flag)
+        print(
+            f"{mode:<8} import {import_ms:6.1f} ms"
+            f"  wall {results[mode]['wall_ms']:6.1f} ms{flag}",
+            file=sys.stderr,
+        )
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "budget_ms": opts.budget,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if opts.output:
+        opts.output.write_text(output + "\n")
+    else:
+        print(output)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Benchmark parsing and rendering synthetic ``.el1`` files of growing size.
+
+Run with ``python benchmarks/bench_suite.py --output results.json``, and compare
+against earlier results with ``--compare baseline.json``. Each result records
+the parse time and throughput, the peak memory allocated while parsing
+(``tracemalloc``), and the time to render the parsed structure as text.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from el1_parse.structures.el1 import el1, el1_dat_extract, el1_fast
+from el1_parse.structures.hexdump_norepeat import hexdump_repeat_suppressed
+from el1_parse.synthetic import generate_el1
+
+TEMPLATE = Path(__file__).parent.parent / "samples" / "p1-l001-f1one-f2two.el1"
+DEFAULT_SIZES = "1x2,10x8,50x20"  # pages x frames per page
+PARSERS: dict[str, Callable[[bytes], Any]] = {
+    "el1.parse": el1.parse,
+    "el1_fast.parse": el1_fast.parse,
+    "el1_dat_extract.parse": el1_dat_extract.parse,
+}
+TIMED_METRICS = ("parse_seconds", "render_seconds")
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    """Return the fastest of ``repeat`` runs in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(function: Callable[[], object]) -> int:
+    """Return the peak memory allocated by a function call in bytes."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_size(pages: int, frames: int, repeat: int) -> list[dict[str, Any]]:
+    """Run all benchmarks for one synthetic file size."""
+    data = generate_el1(TEMPLATE.read_bytes(), pages, frames)
+    size = {"pages": pages, "frames_per_page": frames, "bytes": len(data)}
+    results = []
+    for name, parse in PARSERS.items():
+        parse_seconds = best_time(lambda parse=parse: parse(data), repeat)
+        parsed = parse(data)
+        results.append(
+            {
+                "benchmark": name,
+                **size,
+                "parse_seconds": parse_seconds,
+                "mb_per_second": len(data) / parse_seconds / 1e6,
+                "peak_memory_bytes": peak_memory(lambda parse=parse: parse(data)),
+                "render_seconds": best_time(lambda parsed=parsed: str(parsed), 1),
+            }
+        )
+    entries = [entry.data.data for entry in el1_dat_extract.parse(data).entries]
+    results.append(
+        {
+            "benchmark": "hexdump_repeat_suppressed",
+            **size,
+            "render_seconds": best_time(
+                lambda: [hexdump_repeat_suppressed(entry, 32) for entry in entries],
+                repeat,
+            ),
+        }
+    )
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float) -> bool:
+    """Print time ratios against a baseline, and return whether any regressed."""
+    old = {(r["benchmark"], r["pages"], r["frames_per_page"]): r for r in baseline}
+    regressed = False
+    for result in results:
+        key = (result["benchmark"], result["pages"], result["frames_per_page"])
+        if key not in old:
+            continue
+        for metric in TIMED_METRICS:
+            if metric not in result or metric not in old[key]:
+                continue
+            ratio = result[metric] / old[key][metric]
+            flag = "  REGRESSION" if ratio > threshold else ""
+            regressed |= bool(flag)
+            print(
+                f"{key[0]:<26} {key[1]:>4}x{key[2]:<3} {metric:<15}"
+                f" {ratio:6.2f}x{flag}",
+                file=sys.stderr,
+            )
+    return regressed
+
+
+def main() -> None:
+    """Run the benchmarks and write the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"Comma separated PAGESxFRAMES file sizes (default: {DEFAULT_SIZES})",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs to take the best of"
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON here, not to stdout")
+    parser.add_argument("--compare", type=Path, help="Compare to earlier JSON results")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Time ratio to baseline counted as a regression (default: 1.2)",
+    )
+    opts = parser.parse_args()
+    results = []
+    for size in opts.sizes.split(","):
+        pages, frames = map(int, size.split("x"))
+        results.extend(bench_size(pages, frames, opts.repeat))
+        print(f"done {size}", file=sys.stderr)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if opts.output:
+        opts.output.write_text(output + "\n")
+    else:
+        print(output)
+    if opts.compare:
+        baseline = json.loads(opts.compare.read_text())["results"]
+        if compare(results, baseline, opts.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
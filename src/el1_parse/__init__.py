@@ -1 +1,15 @@
 """Main package for el1_parse."""
+
+from typing import Any
+
+__all__ = ["validate"]
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import ``validate()`` on first use, since importing it builds the parsers."""
+    if name == "validate":
+        from el1_parse.validation import validate  # noqa: PLC0415
+
+        return validate
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
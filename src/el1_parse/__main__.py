@@ -1,41 +1,723 @@
-"""Parse ``.el1`` files."""
+"""Parse ``.el1`` files.
+
+Modules which only some of the modes need are imported in those modes, so that
+e.g. ``--extract`` doesn't pay for generating the parsers or for importing
+``sqlite3`` and ``multiprocessing``.
+"""
+
+from __future__ import annotations
 
 import argparse
+import json
 import logging
+import signal
+import sys
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from el1_parse.structures.el1 import el1, el1_dat_extract
+from construct import ConstructError, Container
+
+from el1_parse.batch import find_el1_files, parse_batch
+from el1_parse.el1_file import El1File
+from el1_parse.extract import ARCHIVE_FORMATS, extract_to_directory, write_archive
+from el1_parse.serialize import FORMATS, UNPARSED_MODES, dump, iter_serialized
 
 if TYPE_CHECKING:
-    from construct import Container
+    from collections.abc import Callable
+
+    from el1_parse.cache import ParseCache
+    from el1_parse.serialize import Format, UnparsedMode
 
 logger = logging.getLogger(__name__)
 
 
-def main() -> None:
-    """Parse ``.el1`` files."""
+def main(argv: list[str] | None = None) -> None:
+    """Parse ``.el1`` files, or run the subcommand named by the first argument."""
     logging.basicConfig(level=logging.INFO, format="%(message)s")
-    parser = argparse.ArgumentParser(description="Parse .el1 files")
-    parser.add_argument("input_file", type=Path, help="Path to the .el1 file to parse")
+    args = sys.argv[1:] if argv is None else argv
+    if args and args[0] in COMMANDS:
+        COMMANDS[args[0]](args[1:])
+        return
+    parser = argparse.ArgumentParser(
+        description="Parse .el1 files",
+        epilog=(
+            f"Other commands: {', '.join(COMMANDS)}. See `el1-parse COMMAND --help`."
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        metavar="PATH",
+        help="Path to an .el1 file to parse, or a directory to search for them",
+    )
+    parser.add_argument(
+        "-x",
+        "--extract",
+        action="store_true",
+        help="Only extract raw .dat files, or with --entry only the named ones",
+    )
+    parser.add_argument(
+        "--archive",
+        choices=ARCHIVE_FORMATS,
+        help="With --extract, write the .dat files as a tar or zip stream to stdout",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check files against all constraints and report violations",
+    )
+    parser.add_argument(
+        "--all-violations",
+        action="store_true",
+        help="With --check, report all violations instead of the first in each file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Only parse files, and report the calls, time and bytes of each entry"
+            " and field, as a table or with --format json as JSON"
+        ),
+    )
     parser.add_argument(
-        "-x", "--extract", action="store_true", help="Only extract raw .dat files"
+        "-e",
+        "--entry",
+        action="append",
+        metavar="NAME",
+        help="Only read and parse the named entry, e.g. PhotoFile.dat (repeatable)",
     )
-    opts = parser.parse_args()
-    if opts.extract:
-        extract_raw_dat_files(opts.input_file)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help=(
+            "Parse files in this many processes, writing a JSON line for each file"
+            " (default with multiple files or directories: one per CPU)"
+        ),
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        help="Output format (default: text for one file, json for multiple files)",
+    )
+    parser.add_argument(
+        "--unparsed",
+        choices=UNPARSED_MODES,
+        default="inline",
+        help=(
+            "Embed the raw bytes of unparsed entries in json/msgpack output (inline),"
+            " or only give their offset and size in the .el1 file (ref)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        metavar="DIR",
+        help="Reuse parse results for files with unchanged content from this cache",
+    )
+    opts = parser.parse_args(args)
+    cache = None
+    if opts.cache_dir:
+        from el1_parse.cache import ParseCache  # noqa: PLC0415
+
+        cache = ParseCache(opts.cache_dir)
+    try:
+        run(parser, opts, cache)
+    finally:
+        if cache:
+            logger.info("%s", cache.stats())
+            cache.close()
+
+
+def run(  # noqa: C901, PLR0912
+    parser: argparse.ArgumentParser, opts: argparse.Namespace, cache: ParseCache | None
+) -> None:
+    """Run the command selected by the command line options."""
+    if opts.archive and not opts.extract:
+        parser.error("--archive requires --extract")
+    if opts.extract and opts.archive:
+        write_archive(
+            find_el1_files(opts.paths), sys.stdout.buffer, opts.archive, opts.entry
+        )
+    elif opts.extract:
+        for input_file in find_el1_files(opts.paths):
+            extract_to_directory(input_file, names=opts.entry)
+    elif opts.check:
+        if opts.format == "msgpack":
+            parser.error("--check only supports text and json output")
+        single = len(opts.paths) == 1 and not opts.paths[0].is_dir()
+        failures = check_files(
+            opts.paths,
+            opts.jobs or (1 if single else None),
+            all_violations=opts.all_violations,
+            fmt=opts.format or "text",
+        )
+        if failures:
+            logger.error("%d file(s) failed the check", failures)
+            sys.exit(1)
+    elif opts.profile:
+        if opts.format == "msgpack":
+            parser.error("--profile only supports text and json output")
+        failures = profile_files(opts.paths, fmt=opts.format or "text")
+        if failures:
+            logger.error("%d file(s) failed to parse", failures)
+            sys.exit(1)
+    elif opts.entry:
+        for input_file in find_el1_files(opts.paths):
+            print_entries(input_file, opts.entry)
+    elif opts.jobs or len(opts.paths) > 1 or opts.paths[0].is_dir():
+        if opts.format == "text":
+            parser.error("text output is only supported for a single file")
+        failures = parse_batch(
+            opts.paths,
+            sys.stdout.buffer,
+            jobs=opts.jobs,
+            fmt=opts.format or "json",
+            unparsed=opts.unparsed,
+            cache=cache,
+        )
+        if failures:
+            logger.error("%d file(s) failed to parse", failures)
+            sys.exit(1)
+    elif cache:
+        print_cached(opts.paths[0], opts.format or "text", opts.unparsed, cache)
+    else:
+        from el1_parse.structures.el1 import el1_fast  # noqa: PLC0415
+
+        parsed = el1_fast.parse(opts.paths[0].read_bytes())
+        dump(parsed, sys.stdout.buffer, opts.format or "text", unparsed=opts.unparsed)
+
+
+def print_cached(
+    path: Path, fmt: Format, unparsed: UnparsedMode, cache: ParseCache
+) -> None:
+    """Parse one file and print the result, or print the result from the cache."""
+    from el1_parse.structures.el1 import el1_fast  # noqa: PLC0415
+
+    key = cache.key(path, fmt, unparsed)
+    cached = cache.get(key)
+    if cached and not cached[0]:
+        # A failure stored by a batch run, with the error type and message
+        error = json.loads(cached[1])
+        logger.error("%s: %s: %s", path, error["error"], error["message"])
+        sys.exit(1)
+    if cached:
+        payload = cached[1]
     else:
-        parsed: Container = el1.parse(opts.input_file.read_bytes())
-        print(parsed)  # noqa: T201
-
-
-def extract_raw_dat_files(input_file: Path) -> None:
-    """Extract raw ``.dat`` files into a directory."""
-    data = el1_dat_extract.parse(input_file.read_bytes())
-    directory = input_file.parent / input_file.stem
-    directory.mkdir(parents=True, exist_ok=True)
-    for entry_index, entry_data in enumerate(data.entries):
-        entry_name = data.entry_table[entry_index].name
-        output_path = directory / entry_name
-        output_path.write_bytes(entry_data.data)
-        logger.info("Extracted %s to %s", entry_name, output_path)
+        parsed: Container = el1_fast.parse(path.read_bytes())
+        payload = b"".join(iter_serialized(parsed, fmt, unparsed=unparsed))
+        cache.put(key, True, payload)  # noqa: FBT003
+    sys.stdout.buffer.write(payload if fmt == "msgpack" else payload + b"\n")
+
+
+def check_files(
+    paths: list[Path], jobs: int | None, *, all_violations: bool, fmt: str
+) -> int:
+    """Print the violations in each file, or a JSON line for each file.
+
+    :return: the number of files with violations
+    """
+    from el1_parse.validation import validate_files  # noqa: PLC0415
+
+    failures = 0
+    for path, violations in validate_files(paths, jobs, all_violations=all_violations):
+        failures += bool(violations)
+        if fmt == "json":
+            record = {
+                "path": str(path),
+                "ok": not violations,
+                "violations": [violation._asdict() for violation in violations],
+            }
+            print(json.dumps(record), flush=True)  # noqa: T201
+        elif violations:
+            for violation in violations:
+                print(f"{path}: {violation}", flush=True)  # noqa: T201
+        else:
+            print(f"{path}: OK", flush=True)  # noqa: T201
+    return failures
+
+
+def profile_files(paths: list[Path], fmt: str) -> int:
+    """Parse files with profiling, and print the report.
+
+    :return: the number of files which failed to parse
+    """
+    from el1_parse.profiling import ParseProfile  # noqa: PLC0415
+
+    profile = ParseProfile()
+    failures = 0
+    for path in find_el1_files(paths):
+        try:
+            profile.parse_file(path)
+        except (ConstructError, OSError) as exc:
+            logger.error("%s: %s", path, exc)  # noqa: TRY400
+            failures += 1
+    if fmt == "json":
+        profile.dump(sys.stdout)
+    else:
+        print(profile.report())  # noqa: T201
+    return failures
+
+
+def print_entries(input_file: Path, names: list[str]) -> None:
+    """Read, parse and print only the named entries of an ``.el1`` file."""
+    with El1File.open(input_file) as el1_file:
+        for name in names:
+            print(Container(name=name, data=el1_file.entry(name)))  # noqa: T201
+
+
+def stats_command(argv: list[str]) -> None:
+    """Collect per-offset byte statistics of unparsed entries over a corpus."""
+    from el1_parse.byte_stats import (  # noqa: PLC0415
+        DEFAULT_ENTRIES,
+        DEFAULT_MAX_OFFSET,
+        CorpusStats,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="el1-parse stats",
+        description=(
+            "Show which bytes of unparsed entries are constant or varying over many"
+            " .el1 files, and which match known fields like num_photos"
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        metavar="PATH",
+        help="Path to an .el1 file, or a directory to search for them",
+    )
+    parser.add_argument(
+        "-e",
+        "--entry",
+        action="append",
+        metavar="NAME",
+        help="Analyze the named entry (repeatable, default: all unparsed entries)",
+    )
+    parser.add_argument(
+        "--max-offset",
+        type=int,
+        default=DEFAULT_MAX_OFFSET,
+        help=f"Analyze this many bytes of each entry (default: {DEFAULT_MAX_OFFSET})",
+    )
+    parser.add_argument(
+        "--width", type=int, default=16, help="Bytes on each row of the text output"
+    )
+    parser.add_argument(
+        "-f", "--format", choices=("text", "json"), default="text", help="Output format"
+    )
+    opts = parser.parse_args(argv)
+    stats = CorpusStats(opts.entry or DEFAULT_ENTRIES, opts.max_offset)
+    failures = 0
+    for path in find_el1_files(opts.paths):
+        try:
+            stats.add_file(path)
+        except (ConstructError, OSError) as exc:
+            logger.error("%s: %s", path, exc)  # noqa: TRY400
+            failures += 1
+        except KeyError as exc:
+            logger.error("%s: %s", path, exc.args[0])  # noqa: TRY400
+            failures += 1
+    if opts.format == "json":
+        json.dump(stats.as_dict(), sys.stdout, indent=2)
+        print()  # noqa: T201
+    else:
+        print(stats.report(opts.width))  # noqa: T201
+    if failures:
+        logger.error("%d file(s) could not be read", failures)
+        sys.exit(1)
+
+
+def diff_command(argv: list[str]) -> None:
+    """Compare ``.el1`` files entry by entry against a reference file."""
+    from el1_parse.diff import ReferenceFile  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(
+        prog="el1-parse diff",
+        description=(
+            "Show which entries of .el1 files differ from a reference file: changed"
+            " fields of parsed entries and changed hexdump rows of other entries"
+        ),
+    )
+    parser.add_argument("reference", type=Path, help="The .el1 file to compare to")
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        metavar="PATH",
+        help="Path to an .el1 file to compare, or a directory to search for them",
+    )
+    parser.add_argument(
+        "-q",
+        "--brief",
+        action="store_true",
+        help="Only list the names of the entries which differ",
+    )
+    parser.add_argument(
+        "-n",
+        "--max-lines",
+        type=int,
+        default=20,
+        help="Show at most this many lines for each entry (default: 20)",
+    )
+    opts = parser.parse_args(argv)
+    num_different = failures = 0
+    with ReferenceFile(opts.reference) as reference:
+        for path in find_el1_files(opts.paths):
+            try:
+                differences = reference.diff(path)
+            except (ConstructError, OSError) as exc:
+                logger.error("%s: %s", path, exc)  # noqa: TRY400
+                failures += 1
+                continue
+            num_different += bool(differences)
+            if opts.brief:
+                names = ", ".join(differences) or "identical"
+                print(f"{path}: {names}", flush=True)  # noqa: T201
+                continue
+            if not differences:
+                continue
+            print(f"--- {opts.reference}\n+++ {path}")  # noqa: T201
+            for name, lines in differences.items():
+                print(f"{name}:")  # noqa: T201
+                for line in lines[: opts.max_lines]:
+                    print(f"  {line}")  # noqa: T201
+                if len(lines) > opts.max_lines:
+                    print("  ...")  # noqa: T201
+    if failures:
+        logger.error("%d file(s) could not be read", failures)
+        sys.exit(2)
+    if num_different:
+        sys.exit(1)
+
+
+def verify_command(argv: list[str]) -> None:
+    """Check the cached photo files of ``.el1`` files in their data directories."""
+    from el1_parse.verify import DEFAULT_JOBS, verify_albums  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(
+        prog="el1-parse verify",
+        description=(
+            "Check that the cached photo files named in PhotoFile.dat exist in the"
+            " .el1.Data directory with the recorded sizes, optionally hashing them"
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        metavar="PATH",
+        help="Path to an .el1 file to verify, or a directory to search for them",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Check files in this many threads (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "--hash", action="store_true", help="Also hash the content of each photo file"
+    )
+    parser.add_argument(
+        "--rehash",
+        action="store_true",
+        help=(
+            "Hash even files whose digests are cached, and report content which"
+            " changed without a change in size or mtime (implies --hash)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        metavar="DIR",
+        help="Store digests here, and don't rehash files which haven't changed",
+    )
+    parser.add_argument(
+        "-f", "--format", choices=("text", "json"), default="text", help="Output format"
+    )
+    opts = parser.parse_args(argv)
+    cache = None
+    if opts.cache_dir:
+        from el1_parse.cache import ParseCache  # noqa: PLC0415
+
+        cache = ParseCache(opts.cache_dir)
+    num_failed = 0
+    try:
+        reports = verify_albums(
+            opts.paths,
+            opts.jobs,
+            content=opts.hash or opts.rehash,
+            cache=cache,
+            rehash=opts.rehash,
+        )
+        for report in reports:
+            num_failed += not report.ok
+            if opts.format == "json":
+                print(json.dumps(report.as_dict()), flush=True)  # noqa: T201
+            elif report.error:
+                print(f"{report.path}: {report.error}", flush=True)  # noqa: T201
+            elif report.ok:
+                print(f"{report.path}: OK ({len(report.checks)} files)", flush=True)  # noqa: T201
+            else:
+                for check in report.checks:
+                    if check.problem:
+                        print(f"{report.path}: {check.path.name}: {check.problem}")  # noqa: T201
+                sys.stdout.flush()
+    finally:
+        if cache:
+            cache.close()
+    if num_failed:
+        sys.exit(1)
+
+
+def serve_command(argv: list[str]) -> None:
+    """Run a local service which parses ``.el1`` files over HTTP."""
+    from el1_parse.server import (  # noqa: PLC0415
+        DEFAULT_CACHE_SIZE,
+        DEFAULT_HOST,
+        ParseService,
+        make_server,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="el1-parse serve",
+        description=(
+            "Parse .el1 files sent to POST /parse, or named by GET /parse?path=PATH,"
+            " on warm worker processes, caching results by content. GET /stats"
+            " returns counters."
+        ),
+    )
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--port", type=int, help="Listen on this TCP port")
+    address.add_argument(
+        "--unix-socket", type=Path, metavar="PATH", help="Listen on this Unix socket"
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"With --port, listen on this address (default: {DEFAULT_HOST})",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Parse in this many processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        metavar="BYTES",
+        help=f"Keep up to this many bytes of results (default: {DEFAULT_CACHE_SIZE})",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log requests")
+    opts = parser.parse_args(argv)
+    with ParseService(opts.jobs, opts.cache_size) as service:
+        server = make_server(
+            service,
+            host=opts.host,
+            port=opts.port or 0,
+            unix_socket=opts.unix_socket,
+            verbose=opts.verbose,
+        )
+        logger.info("Listening on %s", opts.unix_socket or server.server_address)
+        # Shut down cleanly when stopped by a service manager, too
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if opts.unix_socket:
+                opts.unix_socket.unlink(missing_ok=True)
+            logger.info("%s", json.dumps(service.stats()))
+
+
+def index_command(argv: list[str]) -> None:
+    """Update or query an SQLite index of the photo files of ``.el1`` files."""
+    from el1_parse.index import PhotoIndex  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(
+        prog="el1-parse index",
+        description=(
+            "Keep an SQLite index of the pages, frames and photo files of .el1 files,"
+            " and find the files which use a photo"
+        ),
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    update = subparsers.add_parser(
+        "update", help="Add new and changed files and remove deleted ones"
+    )
+    update.add_argument("database", type=Path, help="The index, created if missing")
+    update.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        metavar="PATH",
+        help="Path to an .el1 file to index, or a directory to search for them",
+    )
+    update.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Hash and parse files in this many processes (default: one per CPU)",
+    )
+    query = subparsers.add_parser(
+        "query",
+        help="Find photo files, case-insensitively and with * wildcards",
+    )
+    query.add_argument("database", type=Path, help="The index to query")
+    query.add_argument("--origin-filename", metavar="NAME")
+    query.add_argument("--origin-dir", metavar="DIR")
+    query.add_argument("--cache-filename", metavar="NAME")
+    query.add_argument("--cache-dir", metavar="DIR")
+    query.add_argument(
+        "--sql", help="Run this SQL query instead, and print its rows tab-separated"
+    )
+    query.add_argument(
+        "-f", "--format", choices=("text", "json"), default="text", help="Output format"
+    )
+    opts = parser.parse_args(argv)
+    if opts.action == "update":
+        with PhotoIndex(opts.database) as index:
+            logger.info("%s", index.update(opts.paths, opts.jobs))
+        return
+    if not opts.database.exists():
+        parser.error(f"{opts.database} doesn't exist, create it with `update`")
+    criteria = {
+        name: value
+        for name in ("origin_filename", "origin_dir", "cache_filename", "cache_dir")
+        if (value := getattr(opts, name)) is not None
+    }
+    with PhotoIndex(opts.database, read_only=True) as index:
+        if opts.sql:
+            names, rows = index.execute(opts.sql)
+            for row in rows:
+                if opts.format == "json":
+                    print(json.dumps(dict(zip(names, row, strict=True))))  # noqa: T201
+                else:
+                    print("\t".join(map(str, row)))  # noqa: T201
+            return
+        matches = index.find(**criteria)
+    for match in matches:
+        if opts.format == "json":
+            print(json.dumps(match))  # noqa: T201
+        else:
+            origin = f"{match['origin_dir_path']}\\{match['origin_filename']}"
+            print(f"{match['path']}: {match['photo_file_id']}: {origin}")  # noqa: T201
+    if not matches:
+        sys.exit(1)
+
+
+def export_command(argv: list[str]) -> None:
+    """Export the records of ``.el1`` files to Parquet files."""
+    from el1_parse.arrow_export import DEFAULT_BATCH_SIZE, export_parquet  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(
+        prog="el1-parse export",
+        description=(
+            "Export the pages, frames, photos and photo files of .el1 files"
+            " to a Parquet file for each record type"
+        ),
+    )
+    parser.add_argument(
+        "directory", type=Path, help="Directory to write the Parquet files to"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        metavar="PATH",
+        help="Path to an .el1 file to export, or a directory to search for them",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows in each row group (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--compression",
+        default="zstd",
+        help="Parquet compression codec (default: zstd)",
+    )
+    opts = parser.parse_args(argv)
+    rows = export_parquet(
+        opts.paths, opts.directory, opts.batch_size, compression=opts.compression
+    )
+    logger.info("%s", ", ".join(f"{count} {table}" for table, count in rows.items()))
+
+
+def identify_command(argv: list[str]) -> None:
+    """Identify the format variant of ``.el1`` files from their headers."""
+    from collections import Counter  # noqa: PLC0415
+
+    from el1_parse.identify import (  # noqa: PLC0415
+        closest_variant,
+        identify_file,
+        match_variant,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="el1-parse identify",
+        description=(
+            "Read only the headers of .el1 files and print the format variant each"
+            " one matches, or how it differs from the closest known variant"
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        metavar="PATH",
+        help="Path to an .el1 file to identify, or a directory to search for them",
+    )
+    parser.add_argument(
+        "-f", "--format", choices=("text", "json"), default="text", help="Output format"
+    )
+    opts = parser.parse_args(argv)
+    counts: Counter[str] = Counter()
+    for path in find_el1_files(opts.paths):
+        try:
+            fingerprint = identify_file(path)
+        except (ConstructError, OSError) as exc:
+            counts["failed"] += 1
+            error = f"{type(exc).__name__}: {exc}"
+            if opts.format == "json":
+                print(json.dumps({"path": str(path), "error": error}))  # noqa: T201
+            else:
+                print(f"{path}: {error}")  # noqa: T201
+            continue
+        variant = match_variant(fingerprint)
+        mismatches = closest_variant(fingerprint)[1] if variant is None else []
+        name = variant.name if variant else "unknown"
+        counts[name] += 1
+        if opts.format == "json":
+            record = {
+                "path": str(path),
+                "variant": variant and variant.name,
+                "mismatches": mismatches,
+                "fingerprint": fingerprint.as_dict(),
+            }
+            print(json.dumps(record))  # noqa: T201
+        else:
+            print(f"{path}: {'; '.join([name, *mismatches])}")  # noqa: T201
+    logger.info("%s", ", ".join(f"{count} {name}" for name, count in counts.items()))
+    if counts.keys() & {"failed", "unknown"}:
+        sys.exit(1)
+
+
+COMMANDS: dict[str, Callable[[list[str]], None]] = {
+    "stats": stats_command,
+    "diff": diff_command,
+    "verify": verify_command,
+    "serve": serve_command,
+    "index": index_command,
+    "export": export_command,
+    "identify": identify_command,
+}
@@ -0,0 +1,276 @@
+"""Export pages, frames, photos and photo files of ``.el1`` files to Arrow and Parquet.
+
+Each record type becomes a table with a column for each field of its struct, and
+foreign keys back to the file (``file_id``) and, for frames, the page
+(``page_index``). The ``files`` table maps each ``file_id`` to the path of the
+file, or the error which kept it from being parsed.
+
+Records are decoded in bulk with ``el1_parse.numpy_records``, and converted to
+Arrow columns a whole array at a time. ``FileTime`` fields become timestamp
+columns with ``filetime_to_datetime64()``, not through a ``datetime`` per value.
+Batches are cut to at most ``batch_size`` rows as files are read, so a corpus of
+any size is exported with the records of one batch and one file in memory.
+
+PyArrow and NumPy are optional dependencies: ``pip install el1-parse[arrow]``.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from construct import Array, ConstructError, FormatField, StringEncoded, Subconstruct
+
+from el1_parse.batch import find_el1_files
+from el1_parse.el1_file import El1File
+from el1_parse.numpy_records import (
+    decode_field,
+    filetime_to_datetime64,
+    read_frames,
+    read_records,
+)
+from el1_parse.structures.el1 import entry_structs
+from el1_parse.structures.filetime_adapter import FileTimeAdapter
+
+try:
+    import numpy as np
+    import pyarrow as pa
+except ImportError as exc:
+    msg = "Arrow export requires the pyarrow package: pip install pyarrow"
+    raise ImportError(msg) from exc
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from os import PathLike
+
+    from construct import Construct, Struct
+
+DEFAULT_BATCH_SIZE = 65_536
+TABLES = ("files", "pages", "frames", "photos", "photo_files")
+
+
+def _records_struct(entry_name: str) -> Struct:
+    """Return the struct of the records in the array at the end of an entry."""
+    records: Construct = entry_structs[entry_name].subcons[-1].subcon.subcon
+    while not hasattr(records, "subcons"):  # look through ``Padded``
+        records = records.subcon
+    return records
+
+
+@cache
+def record_structs() -> dict[str, Struct]:
+    """Return the struct of the records of each table, except ``files``."""
+    page = _records_struct("Page.dat")
+    frames = next(subcon for subcon in page.subcons if subcon.name == "frames")
+    return {
+        "pages": page,
+        "frames": frames.subcon.subcon,
+        "photos": _records_struct("Photo.dat"),
+        "photo_files": _records_struct("PhotoFile.dat"),
+    }
+
+
+def _record_fields(table: str) -> list[Construct]:
+    """Return the named fields of a table's records, without nested arrays."""
+    return [
+        subcon
+        for subcon in record_structs()[table].subcons
+        if subcon.name and not (table == "pages" and subcon.name == "frames")
+    ]
+
+
+def field_type(subcon: Construct) -> pa.DataType:
+    """Return the Arrow type of a column for a fixed-size field."""
+    inner = subcon
+    while isinstance(inner, Subconstruct) and not isinstance(
+        inner, Array | FileTimeAdapter | StringEncoded
+    ):
+        inner = inner.subcon
+    if isinstance(inner, FileTimeAdapter):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(inner, StringEncoded):
+        return pa.string()
+    if isinstance(inner, Array):
+        return pa.list_(field_type(inner.subcon), inner.count)
+    if isinstance(inner, FormatField):
+        return pa.from_numpy_dtype(np.dtype(inner.fmtstr))
+    return pa.binary()
+
+
+@cache
+def schemas() -> dict[str, pa.Schema]:
+    """Return the schema of each table."""
+    keys = {
+        "pages": ["page_index"],
+        "frames": ["page_index", "frame_index"],
+        "photos": ["photo_index"],
+        "photo_files": ["photo_file_index"],
+    }
+    result = {
+        "files": pa.schema(
+            [("file_id", pa.int32()), ("path", pa.string()), ("error", pa.string())]
+        )
+    }
+    for table, key_names in keys.items():
+        result[table] = pa.schema(
+            [("file_id", pa.int32())]
+            + [(name, pa.int32()) for name in key_names]
+            + [(subcon.name, field_type(subcon)) for subcon in _record_fields(table)]
+        )
+    return result
+
+
+def _column(table: str, records: np.ndarray, field: pa.Field) -> pa.Array:
+    """Convert a column of a structured array to an Arrow array of the field type."""
+    column = records[field.name]
+    if pa.types.is_timestamp(field.type):
+        path = f"(parsing) -> {table} -> [{{}}] -> {field.name}".format
+        return pa.array(filetime_to_datetime64(column, path=path), type=field.type)
+    if pa.types.is_string(field.type) or pa.types.is_binary(field.type):
+        decoded = decode_field(record_structs()[table], records, field.name)
+        return pa.array(decoded, type=field.type)
+    if pa.types.is_fixed_size_list(field.type):
+        values = pa.array(column.reshape(-1), type=field.type.value_type)
+        return pa.FixedSizeListArray.from_arrays(values, field.type.list_size)
+    return pa.array(column, type=field.type)
+
+
+def _record_batch(
+    table: str, file_id: int, records: np.ndarray, keys: list[np.ndarray]
+) -> pa.RecordBatch:
+    """Build a batch from a file's records and their key columns."""
+    schema = schemas()[table]
+    key_columns = [
+        pa.array(np.full(len(records), file_id), type=pa.int32()),
+        *(pa.array(key, type=pa.int32()) for key in keys),
+    ]
+    record_columns = [
+        _column(table, records, field) for field in list(schema)[len(key_columns) :]
+    ]
+    return pa.RecordBatch.from_arrays(key_columns + record_columns, schema=schema)
+
+
+def _files_batch(
+    file_id: int, path: str | PathLike[str], error: str | None
+) -> pa.RecordBatch:
+    """Build the row of the ``files`` table for a file."""
+    files = [[file_id], [str(path)], [error]]
+    return pa.RecordBatch.from_arrays(files, schema=schemas()["files"])
+
+
+def file_batches(file_id: int, path: str | PathLike[str]) -> dict[str, pa.RecordBatch]:
+    """Decode the records of one ``.el1`` file into a batch for each table.
+
+    If the file can't be read or parsed, or a value like a timestamp can't be
+    converted, only the ``files`` batch is returned, with the error.
+    """
+    try:
+        with El1File.open(path) as el1_file:
+            pages, frames, page_index = read_frames(el1_file)
+            photos = read_records(el1_file, "Photo.dat")
+            photo_files = read_records(el1_file, "PhotoFile.dat")
+        # Frames are in page order, so each frame's index on its page is its
+        # position minus the position of the first frame on the page
+        frame_index = np.arange(len(page_index)) - np.searchsorted(
+            page_index, page_index
+        )
+        batches = {
+            "files": _files_batch(file_id, path, None),
+            "pages": _record_batch("pages", file_id, pages, [np.arange(len(pages))]),
+            "frames": _record_batch(
+                "frames", file_id, frames, [page_index, frame_index]
+            ),
+            "photos": _record_batch(
+                "photos", file_id, photos, [np.arange(len(photos))]
+            ),
+            "photo_files": _record_batch(
+                "photo_files", file_id, photo_files, [np.arange(len(photo_files))]
+            ),
+        }
+    except (ConstructError, OSError) as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        return {"files": _files_batch(file_id, path, error)}
+    return batches
+
+
+class _Batcher:
+    """Collect the batches of one table and cut them into batches of fixed size."""
+
+    def __init__(self, schema: pa.Schema, batch_size: int) -> None:
+        self.schema = schema
+        self.batch_size = batch_size
+        self._pending: list[pa.RecordBatch] = []
+        self._rows = 0
+
+    def add(self, batch: pa.RecordBatch) -> Iterator[pa.RecordBatch]:
+        """Add rows, and yield full batches."""
+        self._pending.append(batch)
+        self._rows += batch.num_rows
+        while self._rows >= self.batch_size:
+            yield self._take(self.batch_size)
+
+    def flush(self) -> Iterator[pa.RecordBatch]:
+        """Yield the remaining rows as one batch, if there are any."""
+        if self._rows:
+            yield self._take(self._rows)
+
+    def _take(self, count: int) -> pa.RecordBatch:
+        table = pa.Table.from_batches(self._pending, schema=self.schema)
+        self._pending = table.slice(count).to_batches()
+        self._rows -= count
+        return table.slice(0, count).combine_chunks().to_batches()[0]
+
+
+def iter_record_batches(
+    paths: Iterable[Path], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[tuple[str, pa.RecordBatch]]:
+    """Read ``.el1`` files and yield record batches of each table.
+
+    :param paths: ``.el1`` files, or directories to search for them recursively
+    :param batch_size: the maximum number of rows in a batch
+    :return: the name of the table and a batch of its rows, in file order within
+             each table
+    """
+    batchers = {
+        table: _Batcher(schema, batch_size) for table, schema in schemas().items()
+    }
+    for file_id, path in enumerate(find_el1_files(paths)):
+        for table, batch in file_batches(file_id, path).items():
+            for full_batch in batchers[table].add(batch):
+                yield table, full_batch
+    for table, batcher in batchers.items():
+        for batch in batcher.flush():
+            yield table, batch
+
+
+def export_parquet(
+    paths: Iterable[Path],
+    directory: str | PathLike[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compression: str = "zstd",
+) -> dict[str, int]:
+    """Export ``.el1`` files to a Parquet file for each table in ``directory``.
+
+    Each batch is written as a row group of ``<table>.parquet``.
+
+    :return: the number of rows written to each table
+    """
+    import pyarrow.parquet as pq  # noqa: PLC0415
+
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    writers = {
+        table: pq.ParquetWriter(
+            Path(directory) / f"{table}.parquet", schema, compression=compression
+        )
+        for table, schema in schemas().items()
+    }
+    rows = dict.fromkeys(TABLES, 0)
+    try:
+        for table, batch in iter_record_batches(paths, batch_size):
+            writers[table].write_batch(batch)
+            rows[table] += batch.num_rows
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return rows
@@ -0,0 +1,169 @@
+"""Parse many ``.el1`` files in parallel and write a record for each."""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from construct import ConstructError
+
+from el1_parse.serialize import iter_record, iter_serialized
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from concurrent.futures import Future
+
+    from el1_parse.cache import ParseCache
+    from el1_parse.serialize import Format, UnparsedMode
+
+PENDING_PER_JOB = 4  # how many files to queue for each worker process
+
+
+def find_el1_files(paths: Iterable[Path]) -> Iterator[Path]:
+    """Yield given files, and ``.el1`` files found recursively in given directories."""
+    for path in paths:
+        if not path.is_dir():
+            yield path
+            continue
+        for root, dirs, files in path.walk():
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".el1"):
+                    yield root / name
+
+
+def serialize_file(
+    path: str, fmt: Format = "json", unparsed: UnparsedMode = "inline"
+) -> tuple[bool, bytes]:
+    """Parse one ``.el1`` file and serialize the result.
+
+    :return: whether parsing succeeded, and the serialized result, or the error
+             type and message as JSON
+    """
+    try:
+        data = Path(path).read_bytes()
+    except OSError as exc:
+        return False, error_payload(exc)
+    return serialize_bytes(data, fmt, unparsed)
+
+
+def serialize_bytes(
+    data: bytes, fmt: Format = "json", unparsed: UnparsedMode = "inline"
+) -> tuple[bool, bytes]:
+    """Parse the contents of an ``.el1`` file and serialize the result.
+
+    :return: like ``serialize_file()``
+    """
+    from el1_parse.structures.el1 import el1_fast  # noqa: PLC0415
+
+    try:
+        parsed = el1_fast.parse(data)
+    except ConstructError as exc:
+        return False, error_payload(exc)
+    return True, b"".join(iter_serialized(parsed, fmt, unparsed=unparsed))
+
+
+def error_payload(exc: Exception) -> bytes:
+    """Serialize the type and message of an error as JSON."""
+    error = {"error": type(exc).__name__, "message": str(exc)}
+    return json.dumps(error).encode("utf-8")
+
+
+def make_record(path: str, ok: bool, payload: bytes, fmt: Format = "json") -> bytes:  # noqa: FBT001
+    """Build the output record for a result from ``serialize_file()``."""
+    if ok:
+        return b"".join(
+            iter_record({"path": path, "ok": True}, fmt=fmt, serialized=payload)
+        )
+    fields = {"path": path, "ok": False, **json.loads(payload)}
+    return b"".join(iter_record(fields, fmt=fmt))
+
+
+def parse_file(
+    path: str, fmt: Format = "json", unparsed: UnparsedMode = "inline"
+) -> tuple[bool, bytes]:
+    """Parse one ``.el1`` file.
+
+    :return: whether parsing succeeded, and the result or the error as a serialized
+             record
+    """
+    ok, payload = serialize_file(path, fmt, unparsed)
+    return ok, make_record(path, ok, payload, fmt)
+
+
+def parse_batch(  # noqa: C901, PLR0913
+    paths: Iterable[Path],
+    output: IO[bytes],
+    jobs: int | None = None,
+    *,
+    fmt: Format = "json",
+    unparsed: UnparsedMode = "inline",
+    cache: ParseCache | None = None,
+) -> int:
+    """Parse ``.el1`` files and write a record for each as soon as it's done.
+
+    :param paths: ``.el1`` files, or directories to search for them recursively
+    :param output: the binary stream to write JSON lines or MessagePack records to
+    :param jobs: the number of worker processes, ``None`` for one per CPU, or ``1``
+                 to parse in the current process
+    :param fmt: ``json`` or ``msgpack``
+    :param unparsed: ``inline`` to embed unparsed entries, ``ref`` for offset/size
+    :param cache: reuse results for files with the same content, and store new ones
+    :return: the number of files which failed to parse
+    """
+    failures = 0
+
+    def write(path: str, result: tuple[bool, bytes], key: str | None = None) -> None:
+        nonlocal failures
+        ok, payload = result
+        if cache is not None and key is not None:
+            cache.put(key, ok, payload)
+        output.write(make_record(path, ok, payload, fmt))
+        output.flush()
+        failures += not ok
+
+    def uncached() -> Iterator[tuple[str, str | None]]:
+        """Write cached results, and yield the other paths with their cache keys."""
+        for path in map(str, find_el1_files(paths)):
+            if cache is None:
+                yield path, None
+                continue
+            try:
+                key = cache.key(path, fmt, unparsed)
+            except OSError:
+                yield path, None  # parsing reports the error
+                continue
+            result = cache.get(key)
+            if result is None:
+                yield path, key
+            else:
+                write(path, result)
+
+    if jobs == 1:
+        for path, key in uncached():
+            write(path, serialize_file(path, fmt, unparsed), key)
+        return failures
+
+    # Imported here, since it takes long to import ``multiprocessing``
+    from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        max_pending = PENDING_PER_JOB * jobs
+        pending: dict[Future[tuple[bool, bytes]], tuple[str, str | None]] = {}
+
+        def write_done(done: set[Future[tuple[bool, bytes]]]) -> None:
+            for future in done:
+                path, key = pending.pop(future)
+                write(path, future.result(), key)
+
+        for path, key in uncached():
+            pending[executor.submit(serialize_file, path, fmt, unparsed)] = (path, key)
+            if len(pending) >= max_pending:
+                write_done(wait(pending, return_when=FIRST_COMPLETED).done)
+        while pending:
+            write_done(wait(pending, return_when=FIRST_COMPLETED).done)
+    return failures
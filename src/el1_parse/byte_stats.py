@@ -0,0 +1,351 @@
+"""Per-offset byte statistics of unparsed entries over a corpus of ``.el1`` files.
+
+For each entry, the first ``max_offset`` bytes of every file are added to
+running totals with NumPy: a histogram of byte values at each offset, and sums
+for correlating the little-endian 32-bit integer at each offset with fields
+already known from the parsed entries, like ``num_photos``. The size of the
+entry is correlated with the same fields, which reveals record widths. Memory
+use depends only on ``max_offset`` and the number of known fields, not on the
+number of files.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+from el1_parse.el1_file import El1File
+from el1_parse.numpy_records import read_frames, read_records
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover
+    msg = "Corpus statistics need NumPy, install it with `pip install el1-parse[numpy]`"
+    raise ImportError(msg) from exc
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+DEFAULT_ENTRIES = (
+    "ElpData.dat",
+    "Deflay.dat",
+    "Object.dat",
+    "Memo.dat",
+    "Text.dat",
+    "Calender.dat",
+    "PhotoList.dat",
+)
+DEFAULT_MAX_OFFSET = 4096
+KNOWN_FIELDS = ("num_pages", "num_frames", "num_photos", "num_photo_files")
+MIN_CORRELATION = 0.9  # report correlations at least this strong
+MIN_FILES = 5  # report candidates and fits only over at least this many files
+
+
+def known_fields(el1_file: El1File) -> dict[str, int]:
+    """Read the counts of pages, frames, photos and photo files of an ``.el1`` file."""
+    frames = read_frames(el1_file)
+    return {
+        "num_pages": len(frames.pages),
+        "num_frames": len(frames.frames),
+        "num_photos": len(read_records(el1_file, "Photo.dat")),
+        "num_photo_files": len(read_records(el1_file, "PhotoFile.dat")),
+    }
+
+
+def _correlation(  # noqa: PLR0913, PLR0917
+    n: np.ndarray,
+    sum_x: np.ndarray,
+    sum_x2: np.ndarray,
+    sum_y: np.ndarray,
+    sum_y2: np.ndarray,
+    sum_xy: np.ndarray,
+) -> np.ndarray:
+    """Compute Pearson correlations from running sums, ``nan`` where undefined."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = n * sum_xy - sum_x * sum_y
+        variance = (n * sum_x2 - sum_x**2) * (n * sum_y2 - sum_y**2)
+        return np.where(variance > 0, covariance / np.sqrt(variance), np.nan)
+
+
+def _float(value: np.floating) -> float | None:
+    """Convert a NumPy float to a JSON serializable value."""
+    return None if np.isnan(value) else float(value)
+
+
+def _runs(mask: np.ndarray) -> list[tuple[int, int]]:
+    """Return the ``(start, end)`` of each run of ``True`` values."""
+    edges = np.diff(np.concatenate([[False], mask, [False]]).astype(np.int8))
+    return list(
+        zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1), strict=True)
+    )
+
+
+class EntryStats:
+    """Running per-offset statistics of one entry over many files.
+
+    :param name: the entry name, e.g. ``Deflay.dat``
+    :param max_offset: how many bytes from the start of the entry to analyze
+    """
+
+    def __init__(self, name: str, max_offset: int = DEFAULT_MAX_OFFSET) -> None:
+        """Allocate the running totals."""
+        self.name = name
+        self.max_offset = max_offset
+        self.files = 0
+        self.sizes: Counter[int] = Counter()
+        num_fields = len(KNOWN_FIELDS)
+        self.coverage = np.zeros(max_offset, np.int64)
+        self.histogram = np.zeros((max_offset, 256), np.uint32)
+        # Sums for correlating the uint32 at each offset with each known field
+        self.sum_x = np.zeros(max_offset)
+        self.sum_x2 = np.zeros(max_offset)
+        self.sum_y = np.zeros((num_fields, max_offset))
+        self.sum_y2 = np.zeros((num_fields, max_offset))
+        self.sum_xy = np.zeros((num_fields, max_offset))
+        self.matches = np.zeros((num_fields, max_offset), np.int64)
+        # Sums for correlating the size of the entry with each known field
+        self.size_sums = np.zeros((num_fields, 5))
+
+    def add(self, data: bytes, size: int, fields: dict[str, int]) -> None:
+        """Add the first bytes of the entry in one file.
+
+        :param data: up to ``max_offset`` bytes from the start of the entry
+        :param size: the full size of the entry
+        :param fields: the values of ``KNOWN_FIELDS`` for the file
+        """
+        self.files += 1
+        self.sizes[size] += 1
+        values = np.frombuffer(data, np.uint8, count=min(len(data), self.max_offset))
+        length = len(values)
+        offsets = np.arange(length)
+        self.coverage[:length] += 1
+        # Each offset appears once, so a fancy-indexed increment counts correctly
+        self.histogram.reshape(-1)[offsets * 256 + values] += 1
+        padded = np.concatenate([values, np.zeros(3, np.uint8)]).astype(np.uint32)
+        words = (
+            padded[:length]
+            | padded[1 : length + 1] << 8
+            | padded[2 : length + 2] << 16
+            | padded[3 : length + 3] << 24
+        ).astype(np.float64)
+        self.sum_x[:length] += words
+        self.sum_x2[:length] += words**2
+        known = np.array([fields[name] for name in KNOWN_FIELDS], np.float64)
+        self.sum_y[:, :length] += known[:, np.newaxis]
+        self.sum_y2[:, :length] += known[:, np.newaxis] ** 2
+        self.sum_xy[:, :length] += known[:, np.newaxis] * words
+        self.matches[:, :length] += words == known[:, np.newaxis]
+        self.size_sums += np.stack(
+            [
+                np.ones_like(known),
+                known,
+                known**2,
+                known * size,
+                np.full_like(known, size**2),
+            ],
+            axis=1,
+        )
+
+    def distinct(self) -> np.ndarray:
+        """Return the number of distinct byte values seen at each offset."""
+        return np.count_nonzero(self.histogram, axis=1)
+
+    def correlations(self) -> np.ndarray:
+        """Return correlations of the uint32 at each offset with each known field."""
+        return _correlation(
+            self.coverage, self.sum_x, self.sum_x2, self.sum_y, self.sum_y2, self.sum_xy
+        )
+
+    def size_fits(self) -> list[dict[str, Any]]:
+        """Fit the entry size as ``base + width * field`` for each known field.
+
+        :return: the width, base and correlation for each field which varies
+        """
+        fits = []
+        for name, (n, sum_y, sum_y2, sum_xy, sum_x2) in zip(
+            KNOWN_FIELDS, self.size_sums, strict=True
+        ):
+            sum_x = sum(size * count for size, count in self.sizes.items())
+            y_variance = n * sum_y2 - sum_y**2
+            if y_variance <= 0:
+                continue
+            width = (n * sum_xy - sum_x * sum_y) / y_variance
+            base = (sum_x - width * sum_y) / n
+            correlation = _correlation(n, sum_x, sum_x2, sum_y, sum_y2, sum_xy)
+            fits.append(
+                {
+                    "field": name,
+                    "width": float(width),
+                    "base": float(base),
+                    "correlation": _float(correlation),
+                }
+            )
+        return fits
+
+    def candidates(self) -> list[dict[str, Any]]:
+        """List offsets whose uint32 equals, or correlates strongly with, known fields.
+
+        Only offsets whose own byte varies are listed, since the uint32 at an offset
+        with a constant byte overlaps a field which starts at another offset. Offsets
+        covered by fewer than ``MIN_FILES`` files aren't listed.
+        """
+        correlations = self.correlations()
+        always = (self.matches == self.coverage) & (self.coverage > 0)
+        strong = np.abs(np.nan_to_num(correlations)) >= MIN_CORRELATION
+        enough = (self.distinct() > 1) & (self.coverage >= MIN_FILES)
+        found = []
+        for offset in np.flatnonzero((always | strong).any(axis=0) & enough):
+            found.append(  # noqa: PERF401
+                {
+                    "offset": int(offset),
+                    "files": int(self.coverage[offset]),
+                    "equal": [
+                        name
+                        for index, name in enumerate(KNOWN_FIELDS)
+                        if always[index, offset]
+                    ],
+                    "correlation": {
+                        name: _float(correlations[index, offset])
+                        for index, name in enumerate(KNOWN_FIELDS)
+                        if strong[index, offset]
+                    },
+                }
+            )
+        return found
+
+    def ranges(self) -> list[dict[str, Any]]:
+        """Split the analyzed bytes into runs of constant and of varying offsets.
+
+        The starts of varying runs are candidate field boundaries.
+        """
+        length = int(np.count_nonzero(self.coverage))
+        distinct = self.distinct()[:length]
+        result = []
+        for constant, (start, end) in sorted(
+            [(True, run) for run in _runs(distinct == 1)]
+            + [(False, run) for run in _runs(distinct > 1)],
+            key=lambda item: item[1],
+        ):
+            item: dict[str, Any] = {
+                "start": int(start),
+                "end": int(end),
+                "constant": constant,
+            }
+            if constant:
+                item["value"] = bytes(
+                    self.histogram[start:end].argmax(axis=1).astype(np.uint8)
+                ).hex(" ")
+            else:
+                item["max_distinct"] = int(distinct[start:end].max())
+            result.append(item)
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Summarize the statistics as a JSON serializable dictionary."""
+        length = int(np.count_nonzero(self.coverage))
+        return {
+            "entry": self.name,
+            "files": self.files,
+            "sizes": {str(size): count for size, count in sorted(self.sizes.items())},
+            "size_fits": self.size_fits(),
+            "ranges": self.ranges(),
+            "candidates": self.candidates(),
+            "distinct": self.distinct()[:length].tolist(),
+            "most_common": self.histogram[:length].argmax(axis=1).tolist(),
+        }
+
+    def report(self, width: int = 16) -> str:
+        """Describe the statistics as text, with ``width`` offsets on each row."""
+        sizes = ", ".join(
+            f"{size} ({count})" for size, count in self.sizes.most_common(5)
+        )
+        lines = [f"{self.name}: {self.files} file(s), sizes {sizes}"]
+        for fit in self.size_fits():
+            if (
+                self.files >= MIN_FILES
+                and abs(fit["correlation"] or 0) >= MIN_CORRELATION
+            ):
+                lines.append(  # noqa: PERF401
+                    f"  size = {fit['base']:.0f} + {fit['width']:.1f} * {fit['field']}"
+                    f" (r={fit['correlation']:.2f})"
+                )
+        for candidate in self.candidates():
+            found = [f"= {name}" for name in candidate["equal"]] + [
+                f"r={correlation:.2f} with {name}"
+                for name, correlation in candidate["correlation"].items()
+                if name not in candidate["equal"]
+            ]
+            lines.append(
+                f"  uint32 at 0x{candidate['offset']:04x}: {', '.join(found)}"
+                f" ({candidate['files']} files)"
+            )
+        lines.extend(f"  {line}" for line in self.mask_lines(width))
+        return "\n".join(lines)
+
+    def mask_lines(self, width: int = 16) -> list[str]:
+        """Render constant bytes in hex and varying ones as ``?N``, like a hexdump.
+
+        ``N`` is the number of distinct values seen, or ``?`` for ten or more.
+        Repeated rows are replaced with ``*``.
+        """
+        length = int(np.count_nonzero(self.coverage))
+        distinct = self.distinct()[:length]
+        most_common = self.histogram[:length].argmax(axis=1)
+        cells = [
+            f"{value:02x}" if count == 1 else f"?{count if count < 10 else '?'}"  # noqa: PLR2004
+            for value, count in zip(
+                most_common.tolist(), distinct.tolist(), strict=True
+            )
+        ]
+        lines = []
+        previous = None
+        for start in range(0, length, width):
+            row = " ".join(cells[start : start + width])
+            if row == previous:
+                if lines[-1] != "*":
+                    lines.append("*")
+                continue
+            lines.append(f"{start:07x}  {row}")
+            previous = row
+        return lines
+
+
+class CorpusStats:
+    """Collect ``EntryStats`` for several entries over a corpus in a single pass.
+
+    :param entries: the names of the entries to analyze
+    :param max_offset: how many bytes from the start of each entry to analyze
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[str] = DEFAULT_ENTRIES,
+        max_offset: int = DEFAULT_MAX_OFFSET,
+    ) -> None:
+        """Allocate running totals for each entry."""
+        self.entries = {name: EntryStats(name, max_offset) for name in entries}
+        self.max_offset = max_offset
+
+    def add_file(self, path: str | Path) -> None:
+        """Add the entries of one ``.el1`` file to the totals.
+
+        :raises KeyError: if the file lacks one of the entries, before any of its
+                          entries are added
+        """
+        with El1File.open(path) as el1_file:
+            fields = known_fields(el1_file)
+            entry_table = el1_file.header.entry_table
+            metadatas = [entry_table[el1_file.index(name)] for name in self.entries]
+            for stats, metadata in zip(self.entries.values(), metadatas, strict=True):
+                length = min(metadata.size, self.max_offset)
+                data = el1_file.read(metadata.offset, length)
+                stats.add(data, metadata.size, fields)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Summarize all entries as a JSON serializable dictionary."""
+        return {name: stats.as_dict() for name, stats in self.entries.items()}
+
+    def report(self, width: int = 16) -> str:
+        """Describe all entries as text, with ``width`` offsets on each row."""
+        return "\n\n".join(stats.report(width) for stats in self.entries.values())
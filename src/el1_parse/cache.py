@@ -0,0 +1,214 @@
+"""A persistent cache of serialized parse results, keyed by file content.
+
+Results are stored in an SQLite database in the cache directory. A file is only
+hashed again if its size or modification time has changed since it was last
+seen. The cache key includes ``SCHEMA_VERSION``, a hash of the structure
+definitions and the serializer, so changing e.g. a ``OneOf`` in ``photo.py``
+invalidates all earlier results. The least recently used results are evicted
+when the total size exceeds ``max_size``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from importlib.resources import files
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    import os
+    from os import PathLike
+    from types import TracebackType
+
+    from el1_parse.serialize import Format, UnparsedMode
+
+DEFAULT_MAX_SIZE = 1 << 30  # 1 GiB of serialized results
+HASH_CHUNK_SIZE = 1 << 20
+CACHE_FORMAT = 1  # bump when the layout of the database changes
+
+
+def schema_version() -> str:
+    """Hash the source of ``el1_parse.structures`` and of the serializer.
+
+    Any change to the structure definitions or to the output they're serialized
+    to gives a new version, and thus new cache keys.
+    """
+    digest = hashlib.sha256(f"el1-parse cache {CACHE_FORMAT}".encode())
+    package = files("el1_parse")
+    structures = (package / "structures").iterdir()
+    sources = [
+        package / "serialize.py",
+        *sorted(
+            (path for path in structures if path.name.endswith(".py")),
+            key=lambda path: path.name,
+        ),
+    ]
+    for source in sources:
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+SCHEMA_VERSION = schema_version()
+
+
+def file_digest(path: str | PathLike[str]) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Store and look up serialized parse results by file content.
+
+    Not safe to share between processes writing at the same time, so only the
+    main process of a batch uses it. Threads may share it if they hold a lock
+    while calling its methods.
+
+    :param directory: where to keep the ``cache.sqlite`` database
+    :param max_size: the total size of stored results to evict down to, in bytes
+    """
+
+    def __init__(
+        self, directory: str | PathLike[str], max_size: int = DEFAULT_MAX_SIZE
+    ) -> None:
+        """Open or create the cache database."""
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(
+            Path(directory) / "cache.sqlite", check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                ok INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+            """
+        )
+        self._total_size = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        """Commit and close the database."""
+        self._db.commit()
+        self._db.close()
+
+    def __enter__(self) -> Self:
+        """Return the cache itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the database."""
+        self.close()
+
+    def digest(self, path: str | PathLike[str]) -> str:
+        """Return the content digest of a file, rehashing only if it has changed."""
+        stat = Path(path).stat()
+        digest = self.stored_digest(path, stat)
+        if digest is None:
+            digest = file_digest(path)
+            self.store_digest(path, stat, digest)
+        return digest
+
+    def stored_digest(
+        self, path: str | PathLike[str], stat: os.stat_result
+    ) -> str | None:
+        """Return the stored digest of a file if its size and mtime are unchanged."""
+        row = self._db.execute(
+            "SELECT digest FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        return row[0] if row else None
+
+    def store_digest(
+        self, path: str | PathLike[str], stat: os.stat_result, digest: str
+    ) -> None:
+        """Remember the digest of a file with the given size and mtime."""
+        self._db.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+            (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns, digest),
+        )
+        self._db.commit()
+
+    def key(
+        self,
+        path: str | PathLike[str],
+        fmt: Format = "json",
+        unparsed: UnparsedMode = "inline",
+    ) -> str:
+        """Return the cache key for a file's content parsed and serialized as given."""
+        return f"{self.digest(path)}:{SCHEMA_VERSION}:{fmt}:{unparsed}"
+
+    def get(self, key: str) -> tuple[bool, bytes] | None:
+        """Look up a result and mark it as recently used.
+
+        :return: whether parsing succeeded and the serialized result or error, or
+                 ``None`` if the key isn't in the cache
+        """
+        row = self._db.execute(
+            "SELECT ok, payload FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute(
+            "UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+        self._db.commit()
+        return bool(row[0]), row[1]
+
+    def put(self, key: str, ok: bool, payload: bytes) -> None:  # noqa: FBT001
+        """Store a result, and evict the least recently used ones if over size."""
+        old_size = self._db.execute(
+            "SELECT size FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            (key, ok, payload, len(payload), time.time()),
+        )
+        self._total_size += len(payload) - (old_size[0] if old_size else 0)
+        self._evict()
+        self._db.commit()
+
+    def _evict(self) -> None:
+        while self._total_size > self.max_size:
+            row = self._db.execute(
+                "SELECT key, size FROM results ORDER BY last_used LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM results WHERE key = ?", (row[0],))
+            self._total_size -= row[1]
+
+    def stats(self) -> str:
+        """Describe the hits and misses since the cache was opened."""
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0
+        return f"cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)"
@@ -0,0 +1,209 @@
+"""Compare ``.el1`` files entry by entry.
+
+Each entry in the entry table is hashed first, and entries with equal hashes are
+skipped without parsing them. Structured entries which differ are parsed and
+compared field by field. Unparsed entries, and structured entries whose fields are
+equal but whose padding differs, are compared as row-aligned hexdumps.
+
+To compare one file against many, ``ReferenceFile`` hashes the entries of the
+reference file once, and parses each of its entries at most once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from construct import ConstructError
+
+from el1_parse.el1_file import El1File
+from el1_parse.structures.el1 import entry_structs
+from el1_parse.structures.hexdump_norepeat import HexDumpRepeatSuppress, hexdump_line
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from os import PathLike
+    from types import TracebackType
+    from typing import Self
+
+DIGEST_SIZE = 16
+DEFAULT_WIDTH = 16
+
+
+def entry_digests(el1_file: El1File) -> dict[str, bytes]:
+    """Hash the raw bytes of each entry of an ``.el1`` file."""
+    digests = {}
+    for name in el1_file.names:
+        with el1_file.view(name) as data:
+            digests[name] = hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+    return digests
+
+
+def is_structured(name: str) -> bool:
+    """Tell whether the entry called ``name`` is parsed into fields."""
+    return name in entry_structs and not isinstance(
+        entry_structs[name], HexDumpRepeatSuppress
+    )
+
+
+def hexdump_width(name: str) -> int:
+    """Return the row width used for hexdumps of the entry called ``name``."""
+    entry_struct = entry_structs.get(name)
+    if isinstance(entry_struct, HexDumpRepeatSuppress):
+        return entry_struct.width
+    return DEFAULT_WIDTH
+
+
+class FieldChange(NamedTuple):
+    """A field whose value differs, or which exists in only one of the files."""
+
+    path: str
+    old: Any
+    new: Any
+
+    def __str__(self) -> str:
+        """Show the path of the field with the old and new values."""
+        return f"{self.path}: {self.old!r} -> {self.new!r}"
+
+
+class _Missing:
+    """The value of a field or list item which only one of the entries has."""
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+def diff_fields(old: Any, new: Any, path: str = "") -> Iterator[FieldChange]:  # noqa: ANN401
+    """Yield the leaf fields which differ between two parsed entries.
+
+    Containers are compared key by key, skipping private keys like ``_io``, and
+    lists item by item. Paths look like ``pages[0].frames[1].left``.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in {**old, **new}:
+            if isinstance(key, str) and key.startswith("_"):
+                continue
+            yield from diff_fields(
+                old.get(key, MISSING),
+                new.get(key, MISSING),
+                f"{path}.{key}" if path else key,
+            )
+    elif isinstance(old, list) and isinstance(new, list):
+        for index in range(max(len(old), len(new))):
+            yield from diff_fields(
+                old[index] if index < len(old) else MISSING,
+                new[index] if index < len(new) else MISSING,
+                f"{path}[{index}]",
+            )
+    elif old != new:
+        yield FieldChange(path, old, new)
+
+
+def diff_bytes(
+    old: bytes | memoryview, new: bytes | memoryview, width: int = DEFAULT_WIDTH
+) -> Iterator[str]:
+    """Yield hexdump rows which differ, ``-`` for old and ``+`` for new bytes.
+
+    Rows are aligned by offset, so inserted bytes show as changes in every row
+    after them. Runs of equal rows between changed rows are shown as ``*``.
+    """
+    old, new = bytes(old), bytes(new)
+    skipped = False
+    for offset in range(0, max(len(old), len(new)), width):
+        old_row = old[offset : offset + width]
+        new_row = new[offset : offset + width]
+        if old_row == new_row:
+            skipped = True
+            continue
+        if skipped and offset:
+            yield "*"
+        skipped = False
+        if old_row:
+            yield "-" + hexdump_line(old_row, offset, width)
+        if new_row:
+            yield "+" + hexdump_line(new_row, offset, width)
+
+
+class ReferenceFile:
+    """An ``.el1`` file to compare other files against.
+
+    The entries of the reference file are hashed when it's opened, and parsed
+    only when another file has a differing entry, at most once each.
+    """
+
+    def __init__(self, path: str | PathLike[str]) -> None:
+        """Open, memory-map and hash the entries of the reference file."""
+        self.path = path
+        self._el1_file = El1File.open(path, use_mmap=True)
+        self.digests = entry_digests(self._el1_file)
+        self._parsed: dict[str, Any] = {}
+
+    def close(self) -> None:
+        """Close the reference file."""
+        self._el1_file.close()
+
+    def __enter__(self) -> Self:
+        """Return the ``ReferenceFile`` itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the reference file."""
+        self.close()
+
+    def _entry(self, name: str) -> Any:  # noqa: ANN401
+        if name not in self._parsed:
+            self._parsed[name] = self._el1_file.entry(name)
+        return self._parsed[name]
+
+    def diff(self, path: str | PathLike[str]) -> dict[str, list[str]]:
+        """Compare another ``.el1`` file against the reference file.
+
+        :return: the lines describing the differences of each entry which differs,
+                 in the order of the reference file's entry table. The dictionary
+                 is empty if all entries are identical.
+        """
+        with El1File.open(path, use_mmap=True) as other:
+            digests = entry_digests(other)
+            names = self._el1_file.names + [
+                name for name in other.names if name not in self.digests
+            ]
+            differences = {}
+            for name in names:
+                if name not in digests:
+                    differences[name] = [f"only in {self.path}"]
+                elif name not in self.digests:
+                    differences[name] = [f"only in {path}"]
+                elif digests[name] != self.digests[name]:
+                    differences[name] = self._diff_entry(other, name)
+        return differences
+
+    def _diff_entry(self, other: El1File, name: str) -> list[str]:
+        """Compare fields of structured entries, or else the bytes of the entry."""
+        lines = []
+        if is_structured(name):
+            try:
+                changes = diff_fields(self._entry(name), other.entry(name))
+                lines = [str(change) for change in changes]
+            except ConstructError as exc:
+                lines = [f"could not parse: {exc}"]
+            else:
+                if lines:
+                    return lines
+        with self._el1_file.view(name) as old, other.view(name) as new:
+            return lines + list(diff_bytes(old, new, hexdump_width(name)))
+
+
+def diff_files(
+    old: str | PathLike[str], new: str | PathLike[str]
+) -> dict[str, list[str]]:
+    """Compare two ``.el1`` files entry by entry, see ``ReferenceFile.diff()``."""
+    with ReferenceFile(old) as reference:
+        return reference.diff(new)
@@ -0,0 +1,219 @@
+"""Random access to entries in ``.el1`` files."""
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Self
+
+from construct import Container, StreamError, Struct
+
+from el1_parse.structures.el1 import el1_header
+from el1_parse.structures.entry_metadata import entry_metadata
+
+if TYPE_CHECKING:
+    from os import PathLike
+    from types import TracebackType
+
+fixed_header_struct = Struct(*el1_header.subcons[:-1])  # everything but the table
+HEADER_SIZE = fixed_header_struct.sizeof()
+ENTRY_METADATA_SIZE = entry_metadata.sizeof()
+
+
+class El1File:
+    """Read the header and entry table of an ``.el1`` file, and entries on demand.
+
+    Only the fixed-size header and the entry table are read when the object is
+    created. Each entry is read by seeking to its ``offset`` and reading ``size``
+    bytes, and then parsed with the struct for that entry.
+
+    :param source: a binary file object opened for reading, or a bytes-like object
+                   such as ``bytes``, ``memoryview`` or ``mmap.mmap``
+    """
+
+    def __init__(self, source: IO[bytes] | bytes | memoryview | mmap.mmap) -> None:
+        """Read and validate the header and the entry table."""
+        self._file: IO[bytes] | None = None
+        self._buffer: memoryview | None = None
+        self._close: list[Any] = []
+        self._fileno: int | None = None
+        if hasattr(source, "read") and not isinstance(source, mmap.mmap):
+            self._file = source
+        else:
+            self._buffer = memoryview(source)
+        fixed_header = self.read(0, HEADER_SIZE)
+        num_entries = fixed_header_struct.parse(fixed_header).num_entries
+        entry_table = self.read(HEADER_SIZE, num_entries * ENTRY_METADATA_SIZE)
+        self.header: Container = el1_header.parse(fixed_header + entry_table)
+        self.names: list[str] = [metadata.name for metadata in self.header.entry_table]
+
+    @classmethod
+    def open(cls, path: str | PathLike[str], *, use_mmap: bool = False) -> Self:
+        """Open an ``.el1`` file for random access, optionally memory-mapping it."""
+        file = Path(path).open("rb")  # noqa: SIM115
+        try:
+            if use_mmap:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                el1_file = cls(mapped)
+                el1_file._close.append(mapped)
+            else:
+                el1_file = cls(file)
+        except:
+            file.close()
+            raise
+        el1_file._close.append(file)
+        el1_file._fileno = file.fileno()
+        return el1_file
+
+    def close(self) -> None:
+        """Close the file and memory map if they were opened by ``El1File.open()``."""
+        if self._buffer is not None:
+            self._buffer.release()
+        for resource in self._close:
+            resource.close()
+        self._close = []
+
+    def __enter__(self) -> Self:
+        """Return the ``El1File`` itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the file."""
+        self.close()
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Read ``size`` bytes at ``offset`` from the underlying file or buffer."""
+        if self._buffer is not None:
+            data = bytes(self._buffer[offset : offset + size])
+        else:
+            self._file.seek(offset)
+            data = self._file.read(size)
+        if len(data) != size:
+            msg = f"could not read {size} bytes at offset {offset}, got {len(data)}"
+            raise StreamError(msg)
+        return data
+
+    def index(self, name: str) -> int:
+        """Return the position of the entry called ``name`` in the entry table."""
+        try:
+            return self.names.index(name)
+        except ValueError:
+            msg = f"No entry {name!r} in the .el1 file"
+            raise KeyError(msg) from None
+
+    def raw(self, name: str) -> bytes:
+        """Read the raw bytes of the entry called ``name``."""
+        metadata = self.header.entry_table[self.index(name)]
+        return self.read(metadata.offset, metadata.size)
+
+    def view(self, name: str) -> memoryview:
+        """Return the raw bytes of the entry called ``name`` as a ``memoryview``.
+
+        For a memory-mapped file or a buffer this is a slice of the buffer, so no
+        bytes are copied. Release the view before closing the ``El1File``.
+        """
+        metadata = self.header.entry_table[self.index(name)]
+        if self._buffer is None:
+            return memoryview(self.read(metadata.offset, metadata.size))
+        if metadata.offset + metadata.size > len(self._buffer):
+            msg = (
+                f"could not read {metadata.size} bytes at offset {metadata.offset},"
+                f" got {max(len(self._buffer) - metadata.offset, 0)}"
+            )
+            raise StreamError(msg)
+        return self._buffer[metadata.offset : metadata.offset + metadata.size]
+
+    def copy_to(self, name: str, output: IO[bytes]) -> None:
+        """Write the raw bytes of the entry called ``name`` to a binary file.
+
+        If the ``.el1`` file was opened with ``El1File.open()`` and ``output`` is a
+        real file, the bytes are copied by the kernel with ``os.copy_file_range()``
+        or ``os.sendfile()``. Otherwise a ``memoryview`` of the entry is written.
+        """
+        metadata = self.header.entry_table[self.index(name)]
+        try:
+            output_fileno = output.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            output_fileno = None
+        if self._fileno is not None and output_fileno is not None:
+            output.flush()
+            if _copy_range(self._fileno, output_fileno, metadata.offset, metadata.size):
+                return
+        with self.view(name) as data:
+            output.write(data)
+
+    def context(self, name: str) -> Container:
+        """Return the context for parsing the entry called ``name`` on its own.
+
+        The entry structs refer to the entry table through ``ctx._._._``, like they
+        do when the whole file is parsed.
+        """
+        index = self.index(name)
+        entry_context = Container(_=self.header, _index=index, name=name)
+        return Container(_=entry_context, _index=index)
+
+    def entry(self, name: str, *, lazy: bool = False) -> Any:  # noqa: ANN401
+        """Read and parse the entry called ``name`` with its dedicated struct.
+
+        :param lazy: decode page, photo and photo file records only when accessed
+        """
+        from el1_parse.structures.el1 import (  # noqa: PLC0415
+            el1_fast,
+            lazy_entry_structs,
+        )
+
+        context = self.context(name)
+        if lazy:
+            entry_struct = lazy_entry_structs.get(name)
+            return (
+                entry_struct.parse(self.raw(name), **context) if entry_struct else None
+            )
+        return el1_fast.parse_entry(name, self.raw(name), context)
+
+
+def _copy_range(source: int, destination: int, offset: int, size: int) -> bool:
+    """Copy bytes between file descriptors in the kernel.
+
+    :return: ``False`` if nothing was copied because the platform or the file types
+             don't support it
+    """
+    copied = 0
+    for copy in _KERNEL_COPIES:
+        try:
+            while copied < size:
+                count = copy(destination, source, offset + copied, size - copied)
+                if not count:
+                    msg = f"unexpected end of file at offset {offset + copied}"
+                    raise StreamError(msg)
+                copied += count
+        except OSError:
+            if copied:
+                raise
+            continue
+        return True
+    return False
+
+
+def _copy_file_range(destination: int, source: int, offset: int, size: int) -> int:
+    return os.copy_file_range(source, destination, size, offset)
+
+
+def _sendfile(destination: int, source: int, offset: int, size: int) -> int:
+    return os.sendfile(destination, source, offset, size)
+
+
+_KERNEL_COPIES = [
+    copy
+    for copy, function in [
+        (_copy_file_range, "copy_file_range"),
+        (_sendfile, "sendfile"),
+    ]
+    if hasattr(os, function)
+]
@@ -0,0 +1,125 @@
+"""Extract the raw ``.dat`` entries of ``.el1`` files to a directory or an archive.
+
+The input files are memory-mapped, and each entry is written from a
+``memoryview`` slice of the map or copied by the kernel, so memory use doesn't
+grow with the size of the files.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import IO, TYPE_CHECKING, Literal
+
+from el1_parse.el1_file import El1File
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ArchiveFormat = Literal["tar", "zip"]
+ARCHIVE_FORMATS: tuple[ArchiveFormat, ...] = ("tar", "zip")
+
+
+def _selected(el1_file: El1File, names: Sequence[str] | None) -> list[str]:
+    if names is None:
+        return el1_file.names
+    for name in names:
+        el1_file.index(name)  # raise ``KeyError`` early for a missing entry
+    return list(names)
+
+
+def extract_to_directory(
+    input_file: Path, directory: Path | None = None, names: Sequence[str] | None = None
+) -> list[Path]:
+    """Write entries of an ``.el1`` file into a directory as ``.dat`` files.
+
+    :param directory: where to write the entries, by default a directory named
+                      after the ``.el1`` file next to it
+    :param names: the entries to extract, by default all of them
+    :return: the paths of the written files
+    """
+    if directory is None:
+        directory = input_file.parent / input_file.stem
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    with El1File.open(input_file, use_mmap=True) as el1_file:
+        for name in _selected(el1_file, names):
+            output_path = directory / name
+            with output_path.open("wb") as output:
+                el1_file.copy_to(name, output)
+            logger.info("Extracted %s to %s", name, output_path)
+            paths.append(output_path)
+    return paths
+
+
+def write_tar(
+    input_files: Iterable[Path],
+    output: IO[bytes],
+    names: Sequence[str] | None = None,
+) -> None:
+    """Write entries of ``.el1`` files as a tar stream, in ``<stem>/<entry>`` paths.
+
+    The tar headers are built with ``tarfile``, but the entries are written to
+    ``output`` directly instead of being buffered by a ``tarfile`` stream, so the
+    output doesn't need to be seekable.
+
+    :param names: the entries to extract from each file, by default all of them
+    """
+    import tarfile  # noqa: PLC0415
+
+    written = 0
+    for input_file in input_files:
+        mtime = int(input_file.stat().st_mtime)
+        with El1File.open(input_file, use_mmap=True) as el1_file:
+            for name in _selected(el1_file, names):
+                info = tarfile.TarInfo(f"{input_file.stem}/{name}")
+                info.size = el1_file.header.entry_table[el1_file.index(name)].size
+                info.mtime = mtime
+                header = info.tobuf(tarfile.PAX_FORMAT)
+                padding = -info.size % tarfile.BLOCKSIZE
+                output.write(header)
+                el1_file.copy_to(name, output)
+                output.write(bytes(padding))
+                written += len(header) + info.size + padding
+    end = 2 * tarfile.BLOCKSIZE
+    output.write(bytes(end + -(written + end) % tarfile.RECORDSIZE))
+    output.flush()
+
+
+def write_zip(
+    input_files: Iterable[Path],
+    output: IO[bytes],
+    names: Sequence[str] | None = None,
+) -> None:
+    """Write entries of ``.el1`` files as an uncompressed zip stream.
+
+    ``zipfile`` writes data descriptors after each entry when ``output`` isn't
+    seekable, so it can be e.g. a pipe.
+
+    :param names: the entries to extract from each file, by default all of them
+    """
+    import zipfile  # noqa: PLC0415
+
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as archive:
+        for input_file in input_files:
+            date_time = time.localtime(input_file.stat().st_mtime)[:6]
+            with El1File.open(input_file, use_mmap=True) as el1_file:
+                for name in _selected(el1_file, names):
+                    info = zipfile.ZipInfo(f"{input_file.stem}/{name}", date_time)
+                    with el1_file.view(name) as data:
+                        archive.writestr(info, data)
+    output.flush()
+
+
+def write_archive(
+    input_files: Iterable[Path],
+    output: IO[bytes],
+    fmt: ArchiveFormat,
+    names: Sequence[str] | None = None,
+) -> None:
+    """Write entries of ``.el1`` files as a tar or zip stream."""
+    writer = {"tar": write_tar, "zip": write_zip}[fmt]
+    writer(input_files, output, names)
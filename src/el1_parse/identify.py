@@ -0,0 +1,302 @@
+"""Identify the format variant of ``.el1`` files from their headers.
+
+The structures in ``el1_parse.structures`` require constants like the number of
+entries, the ``mystery_pointer`` and the ``data_array_type`` of each entry, so a
+file of another format version only fails deep inside a full parse.
+
+``identify()`` reads only the file header, the entry table and the Data Array
+Manager header at the start of each entry, a few kilobytes in all, and checks no
+constants. ``match_variant()`` compares this ``Fingerprint`` to the constants of
+each registered ``Variant``, and ``parse()`` parses a file with the parser of the
+variant it matches. Parsers for other structure sets are added with
+``register_variant(variant_from_structures(...))``.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, NamedTuple
+
+from construct import (
+    Array,
+    Bytes,
+    Const,
+    Construct,
+    ConstructError,
+    Int32ul,
+    Padding,
+    Struct,
+)
+
+from el1_parse.el1_file import HEADER_SIZE
+from el1_parse.structures import el1 as el1_structures
+from el1_parse.structures.fast_parser import LimitExceededError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+    from os import PathLike
+
+    from construct import Container
+
+MAX_ENTRIES = 1024
+
+file_header = Struct(
+    "magic" / Bytes(0x20),
+    "unknown1" / Int32ul,
+    "unknown2" / Int32ul,
+    "num_entries" / Int32ul,
+)
+entry_metadata = Struct(
+    "entry_type" / Int32ul,
+    "offset" / Int32ul,
+    "size" / Int32ul,
+    "name" / Bytes(0x104),
+)
+data_array_header = Struct(
+    "magic" / Bytes(0x20),
+    Padding(8),
+    "num_records" / Int32ul,
+    Padding(4),
+    "mystery_pointer" / Int32ul,
+    "software" / Bytes(0x64),
+    Padding(8),
+    "data_array_type" / Bytes(0x20),
+)
+DATA_ARRAY_HEADER_SIZE = data_array_header.sizeof()
+
+HEADER_FIELDS = ("magic", "unknown1", "unknown2", "num_entries")
+ENTRY_FIELDS = ("magic", "mystery_pointer", "software", "data_array_type")
+
+
+class UnknownVariantError(ConstructError):
+    """No registered variant matches the fingerprint of a file."""
+
+
+class EntryFingerprint(NamedTuple):
+    """The entry table row and Data Array Manager header of an entry.
+
+    The header fields are ``None`` if the entry is too short to have a header.
+    """
+
+    name: str
+    entry_type: int
+    offset: int
+    size: int
+    magic: str | None = None
+    num_records: int | None = None
+    mystery_pointer: int | None = None
+    software: str | None = None
+    data_array_type: str | None = None
+
+
+class Fingerprint(NamedTuple):
+    """The file header and the headers of all entries of an ``.el1`` file."""
+
+    magic: str
+    unknown1: int
+    unknown2: int
+    num_entries: int
+    entries: tuple[EntryFingerprint, ...]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fingerprint as a JSON-serializable dictionary."""
+        return {
+            **self._asdict(),
+            "entries": [entry._asdict() for entry in self.entries],
+        }
+
+
+class Variant(NamedTuple):
+    """A format variant, with the header values its parser requires.
+
+    :param name: the name of the variant
+    :param header: the required values of the fields in ``HEADER_FIELDS``
+    :param entries: the required values of the fields in ``ENTRY_FIELDS`` for each
+                    entry, in the order of the entry table
+    :param parse: a function which parses the contents of a file of this variant
+    """
+
+    name: str
+    header: Mapping[str, Any]
+    entries: Mapping[str, Mapping[str, Any]]
+    parse: Callable[[bytes], Container]
+
+    def mismatches(self, fingerprint: Fingerprint) -> list[str]:
+        """Describe how a fingerprint differs from the values this variant requires.
+
+        :return: an empty list if the fingerprint matches
+        """
+        problems = [
+            f"{field} {getattr(fingerprint, field)!r}, expected {value!r}"
+            for field, value in self.header.items()
+            if getattr(fingerprint, field) != value
+        ]
+        names = [entry.name for entry in fingerprint.entries]
+        if names != list(self.entries):
+            problems.append(f"entries {names}, expected {list(self.entries)}")
+            return problems
+        for entry in fingerprint.entries:
+            if entry.magic is None and self.entries[entry.name]:
+                problems.append(f"{entry.name}: no Data Array Manager header")
+                continue
+            problems.extend(
+                f"{entry.name}: {field} {getattr(entry, field)!r}, expected {value!r}"
+                for field, value in self.entries[entry.name].items()
+                if getattr(entry, field) != value
+            )
+        return problems
+
+
+def _text(data: bytes) -> str:
+    """Decode a null-terminated ASCII string, whatever bytes it contains."""
+    return data.split(b"\x00", 1)[0].decode("ascii", "backslashreplace")
+
+
+def _read_at(source: IO[bytes] | bytes | memoryview) -> Callable[[int, int], bytes]:
+    """Return a function which reads at most ``size`` bytes at an offset."""
+    if hasattr(source, "read"):
+
+        def read(offset: int, size: int) -> bytes:
+            source.seek(offset)
+            return source.read(size)
+
+        return read
+    buffer = memoryview(source)
+    return lambda offset, size: bytes(buffer[offset : offset + size])
+
+
+def identify(source: IO[bytes] | bytes | memoryview) -> Fingerprint:
+    """Read the fingerprint of an ``.el1`` file without parsing any records.
+
+    :param source: a seekable binary file object, or the contents of the file
+    :raises ConstructError: if the file header or the entry table is truncated, or
+                            the entry table claims more than ``MAX_ENTRIES`` entries
+    """
+    read = _read_at(source)
+    header = file_header.parse(read(0, HEADER_SIZE))
+    if header.num_entries > MAX_ENTRIES:
+        msg = f"num_entries {header.num_entries} exceeds the limit {MAX_ENTRIES}"
+        raise LimitExceededError(msg)
+    table = Array(header.num_entries, entry_metadata).parse(
+        read(HEADER_SIZE, header.num_entries * entry_metadata.sizeof())
+    )
+    entries = []
+    for metadata in table:
+        entry = EntryFingerprint(
+            _text(metadata.name), metadata.entry_type, metadata.offset, metadata.size
+        )
+        data = read(metadata.offset, min(metadata.size, DATA_ARRAY_HEADER_SIZE))
+        if len(data) == DATA_ARRAY_HEADER_SIZE:
+            array_header = data_array_header.parse(data)
+            entry = entry._replace(
+                magic=_text(array_header.magic),
+                num_records=array_header.num_records,
+                mystery_pointer=array_header.mystery_pointer,
+                software=_text(array_header.software),
+                data_array_type=_text(array_header.data_array_type),
+            )
+        entries.append(entry)
+    return Fingerprint(
+        _text(header.magic),
+        header.unknown1,
+        header.unknown2,
+        header.num_entries,
+        tuple(entries),
+    )
+
+
+def identify_file(path: str | PathLike[str]) -> Fingerprint:
+    """Read the fingerprint of the ``.el1`` file at ``path``."""
+    with Path(path).open("rb") as file:
+        return identify(file)
+
+
+def _constants(struct: Construct, fields: tuple[str, ...]) -> dict[str, Any]:
+    """Return the values of the named ``Const`` fields of a struct."""
+    return {
+        subcon.name: subcon.subcon.value
+        for subcon in getattr(struct, "subcons", ())
+        if subcon.name in fields and isinstance(subcon.subcon, Const)
+    }
+
+
+def variant_from_structures(
+    name: str,
+    header: Struct,
+    entry_structs: Mapping[str, Construct],
+    parse: Callable[[bytes], Container],
+) -> Variant:
+    """Create a variant which requires the constants of a set of structures.
+
+    :param header: the struct for the file header, like ``el1_header``
+    :param entry_structs: the structs for the entries, in the order of the entry
+                          table, like ``entry_structs``
+    """
+    return Variant(
+        name,
+        _constants(header, HEADER_FIELDS),
+        {
+            entry_name: _constants(entry_struct, ENTRY_FIELDS)
+            for entry_name, entry_struct in entry_structs.items()
+        },
+        parse,
+    )
+
+
+VARIANTS: dict[str, Variant] = {}
+
+
+def register_variant(variant: Variant) -> Variant:
+    """Add a variant, or replace the variant with the same name."""
+    VARIANTS[variant.name] = variant
+    return variant
+
+
+def match_variant(fingerprint: Fingerprint) -> Variant | None:
+    """Return the first registered variant which matches a fingerprint."""
+    for variant in VARIANTS.values():
+        if not variant.mismatches(fingerprint):
+            return variant
+    return None
+
+
+def closest_variant(fingerprint: Fingerprint) -> tuple[Variant, list[str]]:
+    """Return the registered variant with the fewest mismatches, and the mismatches."""
+    return min(
+        ((variant, variant.mismatches(fingerprint)) for variant in VARIANTS.values()),
+        key=lambda item: len(item[1]),
+    )
+
+
+def parse(data: bytes) -> Container:
+    """Identify the variant of ``.el1`` file contents and parse them with its parser.
+
+    :raises UnknownVariantError: if no registered variant matches the file
+    """
+    fingerprint = identify(data)
+    variant = match_variant(fingerprint)
+    if variant is None:
+        closest, problems = closest_variant(fingerprint)
+        msg = f"unknown variant, differs from {closest.name}: {'; '.join(problems)}"
+        raise UnknownVariantError(msg)
+    return variant.parse(data)
+
+
+def parse_file(path: str | PathLike[str]) -> Container:
+    """Read and parse an ``.el1`` file with the parser of its variant."""
+    return parse(Path(path).read_bytes())
+
+
+def _parse_easy_layoutprint(data: bytes) -> Container:
+    """Parse a file with ``el1_fast``, which is only generated when first used."""
+    return el1_structures.el1_fast.parse(data)
+
+
+DEFAULT_VARIANT = register_variant(
+    variant_from_structures(
+        "easy-layoutprint",
+        el1_structures.el1_header,
+        el1_structures.entry_structs,
+        _parse_easy_layoutprint,
+    )
+)
@@ -0,0 +1,388 @@
+"""A queryable SQLite index of the pages, frames and photo files of ``.el1`` files.
+
+Answering questions like "which layouts use this original photo?" would otherwise
+mean parsing every file in an archive. The index stores a row for each file,
+page, frame and ``PhotoFile.dat`` record, with indexes on the paths and filenames
+of photo files, so that lookups take milliseconds.
+
+The index is updated incrementally. A file whose size and modification time are
+unchanged isn't read, and one whose content digest is unchanged isn't parsed
+again. Files which no longer exist in the indexed directories are removed.
+
+Windows paths are compared case-insensitively, and directory paths are stored
+without a trailing backslash.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, Self
+
+from construct import ConstructError
+
+from el1_parse.batch import find_el1_files
+from el1_parse.cache import file_digest
+from el1_parse.el1_file import El1File
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from os import PathLike
+    from types import TracebackType
+
+INDEX_FORMAT = 1  # bump when the tables change, to rebuild older indexes
+COMMIT_INTERVAL = 1000  # how many changed files to write in one transaction
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    file_id INTEGER NOT NULL REFERENCES files ON DELETE CASCADE,
+    page_index INTEGER NOT NULL,
+    page_num INTEGER NOT NULL,
+    num_frames INTEGER NOT NULL,
+    PRIMARY KEY (file_id, page_index)
+);
+CREATE TABLE IF NOT EXISTS frames (
+    file_id INTEGER NOT NULL REFERENCES files ON DELETE CASCADE,
+    page_index INTEGER NOT NULL,
+    frame_index INTEGER NOT NULL,
+    left INTEGER NOT NULL,
+    top INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    PRIMARY KEY (file_id, page_index, frame_index)
+);
+CREATE TABLE IF NOT EXISTS photo_files (
+    file_id INTEGER NOT NULL REFERENCES files ON DELETE CASCADE,
+    photo_file_id INTEGER NOT NULL,
+    origin_dir_path TEXT NOT NULL COLLATE NOCASE,
+    origin_filename TEXT NOT NULL COLLATE NOCASE,
+    cache_dir_path TEXT NOT NULL COLLATE NOCASE,
+    cache_filename TEXT NOT NULL COLLATE NOCASE,
+    cache_dir_path2 TEXT NOT NULL COLLATE NOCASE,
+    cache_filename2 TEXT NOT NULL COLLATE NOCASE,
+    timestamp TEXT NOT NULL,
+    filesize INTEGER NOT NULL,
+    PRIMARY KEY (file_id, photo_file_id)
+);
+CREATE INDEX IF NOT EXISTS photo_files_origin_filename
+    ON photo_files (origin_filename);
+CREATE INDEX IF NOT EXISTS photo_files_origin_dir_path
+    ON photo_files (origin_dir_path);
+CREATE INDEX IF NOT EXISTS photo_files_cache_filename ON photo_files (cache_filename);
+CREATE INDEX IF NOT EXISTS photo_files_cache_filename2
+    ON photo_files (cache_filename2);
+CREATE INDEX IF NOT EXISTS photo_files_cache_dir_path ON photo_files (cache_dir_path);
+CREATE INDEX IF NOT EXISTS photo_files_cache_dir_path2
+    ON photo_files (cache_dir_path2);
+"""
+PHOTO_FILE_COLUMNS = (
+    "photo_file_id",
+    "origin_dir_path",
+    "origin_filename",
+    "cache_dir_path",
+    "cache_filename",
+    "cache_dir_path2",
+    "cache_filename2",
+    "timestamp",
+    "filesize",
+)
+# Each search criterion of ``PhotoIndex.find()`` matches any of these columns
+CRITERIA = {
+    "origin_filename": ("origin_filename",),
+    "origin_dir": ("origin_dir_path",),
+    "cache_filename": ("cache_filename", "cache_filename2"),
+    "cache_dir": ("cache_dir_path", "cache_dir_path2"),
+}
+
+
+class FileRows(NamedTuple):
+    """The rows to store for one ``.el1`` file, extracted in a worker process.
+
+    ``changed`` is ``False`` if the content digest was the known one, and the
+    file wasn't parsed.
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    digest: str
+    changed: bool
+    error: str | None = None
+    pages: Sequence[tuple[int, ...]] = ()
+    frames: Sequence[tuple[int, ...]] = ()
+    photo_files: Sequence[tuple[Any, ...]] = ()
+
+
+class IndexUpdate(NamedTuple):
+    """The number of files in each state after updating the index."""
+
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0
+
+    def __str__(self) -> str:
+        """List the counts, like ``3 added, 0 updated, ...``."""
+        return ", ".join(f"{count} {state}" for state, count in self._asdict().items())
+
+
+def strip_dir(path: str) -> str:
+    """Remove trailing backslashes and slashes from a directory path."""
+    return path.rstrip("\\/")
+
+
+def extract_rows(path: str, known_digest: str | None = None) -> FileRows:
+    """Hash an ``.el1`` file and extract its pages, frames and photo files.
+
+    :param known_digest: the digest of the indexed content; if it's unchanged,
+                         the file isn't parsed
+    """
+    stat = Path(path).stat()
+    digest = file_digest(path)
+    if digest == known_digest:
+        return FileRows(path, stat.st_size, stat.st_mtime_ns, digest, changed=False)
+    try:
+        with El1File.open(path) as el1_file:
+            page_dat = el1_file.entry("Page.dat")
+            photo_file_dat = el1_file.entry("PhotoFile.dat")
+    except (ConstructError, KeyError) as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        return FileRows(
+            path, stat.st_size, stat.st_mtime_ns, digest, changed=True, error=error
+        )
+    pages = [
+        (index, page.page_num, page.num_frames)
+        for index, page in enumerate(page_dat.pages)
+    ]
+    frames = [
+        (index, frame_index, frame.left, frame.top, frame.width, frame.height)
+        for index, page in enumerate(page_dat.pages)
+        for frame_index, frame in enumerate(page.frames)
+    ]
+    photo_files = [
+        (
+            record.photo_file_id,
+            strip_dir(record.origin_dir_path),
+            record.origin_filename,
+            strip_dir(record.cache_dir_path),
+            record.cache_filename,
+            strip_dir(record.cache_dir_path2),
+            record.cache_filename2,
+            record.timestamp.isoformat(),
+            record.filesize,
+        )
+        for record in photo_file_dat.photo_files
+    ]
+    return FileRows(
+        path,
+        stat.st_size,
+        stat.st_mtime_ns,
+        digest,
+        changed=True,
+        pages=pages,
+        frames=frames,
+        photo_files=photo_files,
+    )
+
+
+def _extract_rows(args: tuple[str, str | None]) -> FileRows | OSError:
+    """Extract rows in a worker process, returning instead of raising I/O errors."""
+    try:
+        return extract_rows(*args)
+    except OSError as exc:
+        return exc
+
+
+def _extract_all(
+    items: list[tuple[str, str | None]], jobs: int | None
+) -> Iterator[FileRows | OSError]:
+    """Extract the rows of files in worker processes, yielding them as they're done."""
+    if jobs == 1 or len(items) <= 1:
+        yield from map(_extract_rows, items)
+        return
+    # Imported here, since it takes long to import ``multiprocessing``
+    from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        yield from executor.map(_extract_rows, items, chunksize=16)
+
+
+def _like_pattern(value: str) -> str:
+    """Convert a value with ``*`` wildcards to a ``LIKE`` pattern escaped with ``!``."""
+    for char in "!%_":
+        value = value.replace(char, f"!{char}")
+    return value.replace("*", "%")
+
+
+class PhotoIndex:
+    """Build, update and query an SQLite index of ``.el1`` files.
+
+    Not safe to update from several processes at the same time.
+
+    :param path: the database file, created if it doesn't exist
+    :param read_only: open an existing index only for queries
+    """
+
+    def __init__(self, path: str | PathLike[str], *, read_only: bool = False) -> None:
+        """Open or create the index database."""
+        if read_only:
+            uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+            self._db = sqlite3.connect(uri, uri=True)
+            return
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("PRAGMA foreign_keys = ON")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_FORMAT:
+            self._db.executescript(
+                "DROP TABLE IF EXISTS frames; DROP TABLE IF EXISTS pages;"
+                " DROP TABLE IF EXISTS photo_files; DROP TABLE IF EXISTS files;"
+                f" PRAGMA user_version = {INDEX_FORMAT};"
+            )
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Commit and close the database."""
+        self._db.commit()
+        self._db.close()
+
+    def __enter__(self) -> Self:
+        """Return the index itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the database."""
+        self.close()
+
+    def update(self, paths: Iterable[Path], jobs: int | None = None) -> IndexUpdate:
+        """Index new and changed ``.el1`` files, and remove deleted ones.
+
+        :param paths: ``.el1`` files, or directories to search for them recursively
+        :param jobs: the number of worker processes, ``None`` for one per CPU, or
+                     ``1`` to hash and parse in the current process
+        :return: the number of files added, updated, unchanged, removed and failed
+        """
+        roots = [str(path.resolve()) for path in paths]
+        known = {
+            path: (size, mtime_ns, digest)
+            for path, size, mtime_ns, digest in self._db.execute(
+                "SELECT path, size, mtime_ns, digest FROM files"
+            )
+        }
+        counts = dict.fromkeys(IndexUpdate._fields, 0)
+        seen = set()
+        to_extract = []
+        for el1_path in find_el1_files(map(Path, roots)):
+            path = str(el1_path)
+            try:
+                stat = el1_path.stat()
+            except OSError:
+                counts["failed"] += path not in known  # else removed below
+                continue
+            seen.add(path)
+            size, mtime_ns, digest = known.get(path, (None, None, None))
+            if (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                counts["unchanged"] += 1
+            else:
+                to_extract.append((path, digest))
+        for done, rows in enumerate(_extract_all(to_extract, jobs), 1):
+            if isinstance(rows, OSError):
+                counts["failed"] += 1
+                continue
+            state = self._store(rows, known=rows.path in known)
+            counts["failed" if rows.error else state] += 1
+            if done % COMMIT_INTERVAL == 0:
+                self._db.commit()
+        for path in known.keys() - seen:
+            if any(path == root or path.startswith(root + os.sep) for root in roots):
+                self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+                counts["removed"] += 1
+        self._db.commit()
+        return IndexUpdate(**counts)
+
+    def _store(self, rows: FileRows, *, known: bool) -> str:
+        """Write the rows of one file, returning whether it was added or updated."""
+        if not rows.changed:
+            self._db.execute(
+                "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                (rows.size, rows.mtime_ns, rows.path),
+            )
+            return "unchanged"
+        self._db.execute("DELETE FROM files WHERE path = ?", (rows.path,))
+        file_id = self._db.execute(
+            "INSERT INTO files (path, size, mtime_ns, digest, error)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (rows.path, rows.size, rows.mtime_ns, rows.digest, rows.error),
+        ).lastrowid
+        self._db.executemany(
+            "INSERT INTO pages VALUES (?, ?, ?, ?)",
+            ((file_id, *page) for page in rows.pages),
+        )
+        self._db.executemany(
+            "INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((file_id, *frame) for frame in rows.frames),
+        )
+        self._db.executemany(
+            "INSERT INTO photo_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((file_id, *photo_file) for photo_file in rows.photo_files),
+        )
+        return "updated" if known else "added"
+
+    def find(self, **criteria: str) -> list[dict[str, Any]]:
+        """Find photo file records, with the paths of the ``.el1`` files using them.
+
+        Criteria are given as ``origin_filename``, ``origin_dir``, ``cache_filename``
+        and ``cache_dir``, and all given ones must match. The cache criteria match
+        either of the two cache paths of a record. Values are compared
+        case-insensitively, and may contain ``*`` wildcards.
+
+        :return: a dictionary for each record, with the ``.el1`` file as ``path``
+        """
+        conditions = []
+        params = []
+        for name, value in criteria.items():
+            if name not in CRITERIA:
+                msg = (
+                    f"unknown criterion {name!r}, expected one of {', '.join(CRITERIA)}"
+                )
+                raise ValueError(msg)
+            if name.endswith("_dir"):
+                value = strip_dir(value)  # noqa: PLW2901
+            if "*" in value:
+                matches = [f"{column} LIKE ? ESCAPE '!'" for column in CRITERIA[name]]
+                value = _like_pattern(value)  # noqa: PLW2901
+            else:
+                matches = [f"{column} = ?" for column in CRITERIA[name]]
+            conditions.append(f"({' OR '.join(matches)})")
+            params.extend([value] * len(matches))
+        columns = ", ".join(f"photo_files.{column}" for column in PHOTO_FILE_COLUMNS)
+        cursor = self._db.execute(
+            f"SELECT files.path, {columns} FROM photo_files"  # noqa: S608
+            " JOIN files ON files.id = photo_files.file_id"
+            f" WHERE {' AND '.join(conditions) or '1'}"
+            " ORDER BY files.path, photo_files.photo_file_id",
+            params,
+        )
+        names = [description[0] for description in cursor.description]
+        return [dict(zip(names, row, strict=True)) for row in cursor]
+
+    def execute(self, sql: str) -> tuple[list[str], list[tuple[Any, ...]]]:
+        """Run an SQL query, returning the column names and the rows."""
+        cursor = self._db.execute(sql)
+        names = [description[0] for description in cursor.description or ()]
+        return names, cursor.fetchall()
@@ -0,0 +1,184 @@
+"""A compact object model for the layout in ``.el1`` files.
+
+Parsed ``.el1`` files are deep trees of ``construct`` containers, which are
+dictionaries. The slotted dataclasses in this module keep only the fields of
+pages, frames, photos and photo files whose values vary. Fields which the
+structures check with ``Const`` or which are checked to repeat another field are
+dropped, since parsing has already validated them. Counts are implied by the
+length of the tuples. Values which repeat within a layout, like coordinates and
+sizes, are stored once, and strings like directory paths, which also repeat
+across layouts, are interned with ``sys.intern()``.
+
+A ``Layout`` takes an order of magnitude less memory than the parsed entries it
+is built from, and holding many of them doesn't keep the unparsed entries of the
+files in memory at all.
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Self
+
+from el1_parse.el1_file import El1File
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from os import PathLike
+
+    from construct import Container
+
+LAYOUT_ENTRIES = ("Page.dat", "Photo.dat", "PhotoFile.dat")
+
+
+class _Interner(dict):
+    """Share one object for equal values, e.g. the same large ``int`` in records."""
+
+    def __call__(self, value: Any) -> Any:  # noqa: ANN401
+        if isinstance(value, str):
+            return sys.intern(value)
+        return self.setdefault(value, value)
+
+
+def _from_container(
+    cls: type, obj: Container, intern: _Interner, **values: object
+) -> Any:  # noqa: ANN401
+    """Build a dataclass from the interned fields of the same names in a container."""
+    return cls(
+        *(
+            values[name] if name in values else intern(obj[name])
+            for name in cls.__slots__
+        )
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class Frame:
+    """A frame for a photo on a page, without its all-zero arrays."""
+
+    page_frame_unknown1: int
+    left: int
+    top: int
+    width: int
+    height: int
+    page_frame_unknown3: int
+    page_frame_unknown4: int
+    page_frame_unknown5: int
+    page_frame_unknown7: int
+    page_frame_unknown8: int
+
+    @classmethod
+    def from_container(cls, obj: Container, intern: _Interner) -> Self:
+        """Convert a parsed frame."""
+        return _from_container(cls, obj, intern)
+
+
+@dataclass(slots=True, frozen=True)
+class Page:
+    """A page with its frames."""
+
+    page_num: int
+    page_num_: int
+    page_unknown2: int
+    page_unknown3: int
+    mystery_pointer: int
+    frames: tuple[Frame, ...]
+
+    @classmethod
+    def from_container(cls, obj: Container, intern: _Interner) -> Self:
+        """Convert a parsed page."""
+        frames = tuple(Frame.from_container(frame, intern) for frame in obj.frames)
+        return _from_container(cls, obj, intern, frames=frames)
+
+
+@dataclass(slots=True, frozen=True)
+class Photo:
+    """A photo's size, cropping and unknown non-constant values."""
+
+    photo_id: int
+    photo_unknown0: int
+    photo_unknown1: int
+    photo_unknown2: int
+    photo_unknown4: int
+    photo_unknown7: int
+    photo_unknown8: int
+    photo_unknown12: int
+    width_px: int
+    height_px: int
+    crop_left: int
+    crop_top: int
+    photo_unknown13: int
+    photo_unknown16: int
+    photo_unknown18: str
+    photo_unknown20: int
+
+    @classmethod
+    def from_container(cls, obj: Container, intern: _Interner) -> Self:
+        """Convert a parsed photo."""
+        return _from_container(cls, obj, intern)
+
+
+@dataclass(slots=True, frozen=True)
+class PhotoFile:
+    """The cached and original paths and the metadata of a photo file."""
+
+    photo_file_id: int
+    cache_dir_path: str
+    cache_filename: str
+    origin_dir_path: str
+    origin_filename: str
+    timestamp: datetime
+    filesize: int
+    cache_dir_path2: str
+    cache_filename2: str
+    photo_file_unknown2: int
+    more_images: int
+
+    @classmethod
+    def from_container(cls, obj: Container, intern: _Interner) -> Self:
+        """Convert a parsed photo file."""
+        return _from_container(cls, obj, intern)
+
+
+@dataclass(slots=True, frozen=True)
+class Layout:
+    """The pages, photos and photo files of an ``.el1`` file."""
+
+    num_pages: int
+    photo_dat_unknown3: int
+    photo_file_dat_unknown3: int
+    pages: tuple[Page, ...]
+    photos: tuple[Photo, ...]
+    photo_files: tuple[PhotoFile, ...]
+
+    @classmethod
+    def from_entries(
+        cls, page_dat: Container, photo_dat: Container, photo_file_dat: Container
+    ) -> Self:
+        """Convert parsed ``Page.dat``, ``Photo.dat`` and ``PhotoFile.dat`` entries."""
+        intern = _Interner()
+        return cls(
+            num_pages=intern(page_dat.num_pages),
+            photo_dat_unknown3=intern(photo_dat.photo_dat_unknown3),
+            photo_file_dat_unknown3=intern(photo_file_dat.photo_file_dat_unknown3),
+            pages=tuple(Page.from_container(page, intern) for page in page_dat.pages),
+            photos=tuple(
+                Photo.from_container(photo, intern) for photo in photo_dat.photos
+            ),
+            photo_files=tuple(
+                PhotoFile.from_container(photo_file, intern)
+                for photo_file in photo_file_dat.photo_files
+            ),
+        )
+
+    @classmethod
+    def from_parsed(cls, parsed: Container) -> Self:
+        """Convert a whole file parsed with e.g. ``el1_fast.parse()``."""
+        entries = {entry.name: entry.data for entry in parsed.entries}
+        return cls.from_entries(*(entries[name] for name in LAYOUT_ENTRIES))
+
+    @classmethod
+    def load(cls, path: str | PathLike[str]) -> Self:
+        """Read and convert only the layout entries of an ``.el1`` file."""
+        with El1File.open(path) as el1_file:
+            return cls.from_entries(*map(el1_file.entry, LAYOUT_ENTRIES))
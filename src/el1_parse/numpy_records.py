@@ -0,0 +1,374 @@
+"""Decode page frames, photos and photo files into NumPy structured arrays.
+
+The record structs in ``el1_parse.structures`` are fixed-size, so their bytes can
+be viewed as a structured array with ``np.frombuffer()`` instead of parsing each
+record. The dtypes are derived from the structs. Numbers become NumPy columns,
+and strings and raw bytes are kept as ``void`` columns which can be decoded with
+``decode_field()``.
+
+``Const``, ``OneOf`` and ``Check`` constraints are still enforced, but for a whole
+column at a time. Errors report the index of the offending record.
+
+NumPy is an optional dependency: ``pip install el1-parse[numpy]``.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+from construct import (
+    Array,
+    Check,
+    CheckError,
+    Const,
+    ConstError,
+    ConstructError,
+    Container,
+    FormatField,
+    Padded,
+    PaddingError,
+    Renamed,
+    StreamError,
+    Struct,
+    Subconstruct,
+    ValidationError,
+    Validator,
+    evaluate,
+)
+
+from el1_parse.structures.el1 import entry_structs
+from el1_parse.structures.filetime_adapter import (
+    MAX_FILETIME_TICKS,
+    WINDOWS_TICKS,
+    WINDOWS_TICKS_TO_POSIX_EPOCH_TICKS,
+)
+
+try:
+    import numpy as np
+except ImportError as exc:
+    msg = "NumPy record decoding requires the numpy package: pip install numpy"
+    raise ImportError(msg) from exc
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from construct import Construct
+
+    from el1_parse.el1_file import El1File
+
+# ``struct`` format characters and their standard sizes as NumPy type codes
+FORMAT_DTYPES = {
+    "B": "u1",
+    "b": "i1",
+    "H": "u2",
+    "h": "i2",
+    "I": "u4",
+    "i": "i4",
+    "L": "u4",
+    "l": "i4",
+    "Q": "u8",
+    "q": "i8",
+    "e": "f2",
+    "f": "f4",
+    "d": "f8",
+    "?": "b1",
+}
+MAX_REPORTED_INDICES = 10
+
+
+class FrameRecords(NamedTuple):
+    """Pages of a ``Page.dat`` entry, and the frames of all pages in one array."""
+
+    pages: np.ndarray
+    frames: np.ndarray
+    page_index: np.ndarray  # the position of the page for each frame
+
+
+def field_dtype(subcon: Construct) -> np.dtype:
+    """Return the dtype for the raw bytes of a fixed-size field.
+
+    Integers and floats map to NumPy numbers, and fixed-count arrays of them to
+    subarrays. ``Const``, ``OneOf`` and adapters are looked through, so e.g. a
+    ``FileTime`` is stored as the raw integer. Anything else, like strings and
+    bytes, becomes a ``void`` field of the same size.
+    """
+    inner = subcon
+    while isinstance(inner, Subconstruct) and not isinstance(inner, Array):
+        inner = inner.subcon
+    if isinstance(inner, FormatField):
+        byteorder, code = inner.fmtstr[0], inner.fmtstr[1:]
+        if byteorder not in "<>":
+            byteorder = "="
+        return np.dtype(f"{byteorder}{FORMAT_DTYPES[code]}")
+    if isinstance(inner, Array) and isinstance(inner.count, int):
+        return np.dtype((field_dtype(inner.subcon), (inner.count,)))
+    return np.dtype(f"V{subcon.sizeof()}")
+
+
+def record_dtype(
+    struct: Struct, *, until: str | None = None, itemsize: int | None = None
+) -> np.dtype:
+    """Return a structured dtype which mirrors a fixed-size ``Struct``.
+
+    Unnamed fields like ``Padding`` leave gaps between the named ones.
+
+    :param until: the name of the first field to leave out, with all that follow it
+    :param itemsize: the size of one record if it's padded, e.g. by ``Padded``
+    """
+    names, formats, offsets = [], [], []
+    offset = 0
+    for subcon in struct.subcons:
+        if until is not None and subcon.name == until:
+            break
+        if subcon.name:
+            names.append(subcon.name)
+            formats.append(field_dtype(subcon))
+            offsets.append(offset)
+        offset += subcon.sizeof()
+    return np.dtype(
+        {
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": itemsize or offset,
+        }
+    )
+
+
+def _parses(subcon: Construct, data: bytes) -> bool:
+    try:
+        subcon.parse(data)
+    except ConstructError:
+        return False
+    return True
+
+
+def _valid_mask(subcon: Construct, columns: Container, num_records: int) -> np.ndarray:
+    """Check the constraint of one field for all records at once."""
+    if isinstance(subcon, Check):
+        result = evaluate(subcon.func, columns)
+        return np.broadcast_to(np.asarray(result, dtype=bool), (num_records,))
+    column = columns[subcon.name]
+    node = subcon.subcon if isinstance(subcon, Renamed) else subcon
+    if isinstance(node, Const) and (
+        column.dtype.kind != "V" or isinstance(node.value, bytes)
+    ):
+        expected = np.asarray(node.value, dtype=column.dtype.base)
+        return (column == expected).reshape(num_records, -1).all(axis=1)
+    # Parse each distinct value with the field itself, e.g. to validate strings
+    values, inverse = np.unique(
+        column, axis=0 if column.ndim > 1 else None, return_inverse=True
+    )
+    valid = np.array([_parses(node, value.tobytes()) for value in values], dtype=bool)
+    return valid[inverse.reshape(-1)]
+
+
+def iter_violations(
+    struct: Struct,
+    records: np.ndarray,
+    context: Container | None = None,
+    *,
+    until: str | None = None,
+) -> Iterator[tuple[Construct, np.ndarray]]:
+    """Yield each constraint of ``struct`` which some ``records`` violate.
+
+    ``Check`` expressions are evaluated with the columns decoded so far in the
+    context, and with ``_index`` holding the record indices.
+
+    :param context: the parent context, available as ``_`` in ``Check`` lambdas
+    :return: the violated ``Const``, ``OneOf`` or ``Check`` field, and the indices of
+             the offending records
+    """
+    num_records = len(records)
+    columns = Container(_=context, _index=np.arange(num_records))
+    for subcon in struct.subcons:
+        if until is not None and subcon.name == until:
+            break
+        if subcon.name:
+            columns[subcon.name] = records[subcon.name]
+        node = subcon.subcon if isinstance(subcon, Renamed) else subcon
+        if num_records and isinstance(node, Const | Validator | Check):
+            (invalid,) = np.nonzero(~_valid_mask(subcon, columns, num_records))
+            if invalid.size:
+                yield subcon, invalid
+
+
+def _reported(indices: np.ndarray) -> str:
+    """List the first ``MAX_REPORTED_INDICES`` record indices."""
+    reported = ", ".join(map(str, indices[:MAX_REPORTED_INDICES].tolist()))
+    more = ", ..." if indices.size > MAX_REPORTED_INDICES else ""
+    return f"[{reported}{more}]"
+
+
+def _violation_error(
+    subcon: Construct, indices: np.ndarray, path: Callable[[int], str]
+) -> ConstructError:
+    first = int(indices[0])
+    message = f"{indices.size} record(s) failed the constraint: {_reported(indices)}"
+    if isinstance(subcon, Check):
+        return CheckError(message, path=path(first))
+    path_ = f"{path(first)} -> {subcon.name}"
+    if isinstance(subcon.subcon, Const):
+        return ConstError(message, path=path_)
+    return ValidationError(message, path=path_)
+
+
+def validate_records(
+    struct: Struct,
+    records: np.ndarray,
+    context: Container | None = None,
+    *,
+    until: str | None = None,
+    path: Callable[[int], str] = "(parsing) -> [{}]".format,
+) -> None:
+    """Raise an error for the first constraint which some ``records`` violate.
+
+    :param path: a function returning the error path for a record index
+    :raises ConstError: if a ``Const`` field has an unexpected value
+    :raises ValidationError: if a ``OneOf`` field has an unexpected value
+    :raises CheckError: if a ``Check`` fails
+    """
+    for subcon, indices in iter_violations(struct, records, context, until=until):
+        raise _violation_error(subcon, indices, path)
+
+
+def decode_records(  # noqa: PLR0913
+    struct: Struct,
+    data: bytes,
+    count: int,
+    offset: int = 0,
+    *,
+    context: Container | None = None,
+    path: Callable[[int], str] = "(parsing) -> [{}]".format,
+) -> np.ndarray:
+    """Decode and validate ``count`` consecutive fixed-size records.
+
+    :param offset: the position of the first record in ``data``
+    :raises StreamError: if ``data`` is too short
+    """
+    dtype = record_dtype(struct)
+    try:
+        records = np.frombuffer(data, dtype, count=count, offset=offset)
+    except ValueError as exc:
+        message = f"{count} records of {dtype.itemsize} bytes don't fit: {exc}"
+        raise StreamError(message, path=path(0)) from exc
+    validate_records(struct, records, context, path=path)
+    return records
+
+
+def _read_entry(el1_file: El1File, name: str) -> tuple[Container, bytes, Array, int]:
+    """Read an entry, and parse and validate everything before its record array."""
+    entry_struct = entry_structs[name]
+    *header_subcons, records_subcon = entry_struct.subcons
+    header_struct = Struct(*header_subcons)
+    data = el1_file.raw(name)
+    header = header_struct.parse(data, **el1_file.context(name))
+    return header, data, records_subcon, header_struct.sizeof()
+
+
+def read_records(el1_file: El1File, name: str = "Photo.dat") -> np.ndarray:
+    """Decode the photo records of ``Photo.dat`` or ``PhotoFile.dat`` in bulk.
+
+    The header of the entry is parsed and validated with ``construct`` as usual.
+    """
+    header, data, records_subcon, offset = _read_entry(el1_file, name)
+    return decode_records(
+        records_subcon.subcon.subcon,
+        data,
+        evaluate(records_subcon.subcon.count, header),
+        offset,
+        context=header,
+        path=f"(parsing) -> {records_subcon.name} -> [{{}}]".format,
+    )
+
+
+def read_frames(el1_file: El1File) -> FrameRecords:
+    """Decode the pages of ``Page.dat``, and the frames of all pages, in bulk.
+
+    Each page is padded to a fixed size, so the frames are read from a strided
+    view with room for the maximum number of frames on each page.
+    """
+    header, data, records_subcon, offset = _read_entry(el1_file, "Page.dat")
+    padded: Padded = records_subcon.subcon.subcon
+    page_struct: Struct = padded.subcon
+    frames_subcon = next(sc for sc in page_struct.subcons if sc.name == "frames")
+    frame_struct: Struct = frames_subcon.subcon.subcon
+    page_dtype = record_dtype(page_struct, until="frames", itemsize=padded.length)
+    num_pages = evaluate(records_subcon.subcon.count, header)
+    try:
+        pages = np.frombuffer(data, page_dtype, count=num_pages, offset=offset)
+    except ValueError as exc:
+        message = f"{num_pages} pages of {padded.length} bytes don't fit: {exc}"
+        raise StreamError(message, path="(parsing) -> pages") from exc
+    validate_records(
+        page_struct,
+        pages,
+        header,
+        until="frames",
+        path="(parsing) -> pages -> [{}]".format,
+    )
+
+    frames_offset = record_dtype(page_struct, until="frames").itemsize
+    max_frames = (padded.length - frames_offset) // frame_struct.sizeof()
+    (overflowing,) = np.nonzero(pages["num_frames"] > max_frames)
+    if overflowing.size:
+        message = f"more than {max_frames} frames don't fit in a page"
+        raise PaddingError(message, path=f"(parsing) -> pages -> [{overflowing[0]}]")
+    frame_dtype = record_dtype(frame_struct)
+    all_frames = np.ndarray(
+        (num_pages, max_frames),
+        frame_dtype,
+        buffer=data,
+        offset=offset + frames_offset,
+        strides=(padded.length, frame_dtype.itemsize),
+    )
+    present = np.arange(max_frames) < pages["num_frames"][:, np.newaxis]
+    page_index, frame_index = np.nonzero(present)
+    frames = all_frames[present]
+    validate_records(
+        frame_struct,
+        frames,
+        path=lambda index: (
+            f"(parsing) -> pages -> [{page_index[index]}]"
+            f" -> frames -> [{frame_index[index]}]"
+        ),
+    )
+    return FrameRecords(pages, frames, page_index)
+
+
+def decode_field(struct: Struct, records: np.ndarray, name: str) -> np.ndarray:
+    """Decode a column with the struct's own field, e.g. a string, once per value.
+
+    :return: an object array with the same values as parsing with ``construct``
+    """
+    subcon = next(sc for sc in struct.subcons if sc.name == name)
+    values, inverse = np.unique(records[name], return_inverse=True)
+    decoded = np.empty(len(values), dtype=object)
+    decoded[:] = [subcon.parse(value.tobytes()) for value in values]
+    return decoded[inverse.reshape(-1)]
+
+
+def filetime_to_datetime64(
+    ticks: np.ndarray, *, path: Callable[[int], str] = "(parsing) -> [{}]".format
+) -> np.ndarray:
+    """Convert raw Windows FILETIME integers to ``datetime64[us]`` in bulk.
+
+    Ticks are rounded to the nearest microsecond, half to even, like ``FileTime``.
+
+    :param path: a function returning the error path for a record index
+    :raises ValidationError: for ticks after ``MAX_FILETIME``, which ``FileTime``
+                             rejects too
+    """
+    (invalid,) = np.nonzero((ticks < 0) | (ticks > MAX_FILETIME_TICKS))
+    if invalid.size:
+        message = (
+            f"{invalid.size} record(s) have a FILETIME out of the range of datetime:"
+            f" {_reported(invalid)}"
+        )
+        raise ValidationError(message, path=path(int(invalid[0])))
+    ticks_per_us = WINDOWS_TICKS // 1_000_000
+    posix_ticks = ticks.astype(np.int64) - WINDOWS_TICKS_TO_POSIX_EPOCH_TICKS
+    microseconds, remainder = np.divmod(posix_ticks, ticks_per_us)
+    half = ticks_per_us / 2
+    microseconds += (remainder > half) | ((remainder == half) & (microseconds % 2 == 1))
+    return microseconds.astype("datetime64[us]")
@@ -0,0 +1,109 @@
+"""Render ``.el1`` files as HTML fragments, one entry at a time.
+
+The web app appends each fragment to the page as soon as it's rendered, instead
+of building the whole page first. Entries which aren't parsed into fields are
+rendered as collapsed ``<details>`` elements without content, and their
+hexdumps are only rendered with ``HtmlRenderer.hexdump()`` when expanded.
+
+Files are parsed with the limits for untrusted files, since they're uploaded by
+users. An entry which can't be parsed is rendered as an error, and the other
+entries are still rendered.
+"""
+
+from __future__ import annotations
+
+import html
+from typing import TYPE_CHECKING
+
+from el1_parse.diff import hexdump_width, is_structured
+from el1_parse.el1_file import El1File
+from el1_parse.structures.hexdump_norepeat import hexdump_repeat_suppressed
+from el1_parse.untrusted import DEFAULT_LIMITS, LimitExceededError, limited_parser
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from el1_parse.structures.fast_parser import ParseLimits
+
+
+class HtmlRenderer:
+    """Render the header and entries of an ``.el1`` file as HTML fragments.
+
+    :param data: the contents of the file, e.g. a ``memoryview`` of a buffer
+                 transferred from JavaScript, which is copied once, when it enters
+                 Python, and not again
+    :param limits: the limits for parsing each entry
+    :raises LimitExceededError: if the file is larger than ``limits`` allow
+    """
+
+    def __init__(
+        self, data: bytes | memoryview, limits: ParseLimits = DEFAULT_LIMITS
+    ) -> None:
+        """Read the header and entry table of the file."""
+        if len(data) > limits.max_size:
+            msg = (
+                f"the file is {len(data)} bytes,"
+                f" more than the limit of {limits.max_size}"
+            )
+            raise LimitExceededError(msg)
+        self.el1_file = El1File(data)
+        self.parser = limited_parser(limits)
+
+    def __iter__(self) -> Iterator[str]:
+        """Yield the header, and then each entry in the order of the entry table."""
+        yield self.header()
+        for name in self.el1_file.names:
+            yield self.entry(name)
+
+    def header(self) -> str:
+        """Render the entry table as an HTML table."""
+        rows = "".join(
+            f"<tr><td>{html.escape(metadata.name)}</td><td>{metadata.entry_type}</td>"
+            f"<td>{metadata.offset}</td><td>{metadata.size}</td></tr>"
+            for metadata in self.el1_file.header.entry_table
+        )
+        return (
+            '<table class="entry-table"><thead><tr><th>Entry</th><th>Type</th>'
+            f"<th>Offset</th><th>Size</th></tr></thead><tbody>{rows}</tbody></table>"
+        )
+
+    def entry(self, name: str) -> str:
+        """Render an entry, with its hexdump left out if it isn't parsed into fields.
+
+        The ``<details>`` element of an unparsed entry has the class ``hexdump``
+        and the name of the entry in ``data-entry``.
+        """
+        metadata = self.el1_file.header.entry_table[self.el1_file.index(name)]
+        summary = f"<summary>{html.escape(name)} ({metadata.size} bytes)</summary>"
+        if not is_structured(name):
+            return (
+                f'<details class="entry hexdump" data-entry="{html.escape(name)}">'
+                f"{summary}</details>"
+            )
+        try:
+            parsed = self.parser.parse_entry(
+                name, self.el1_file.raw(name), self.el1_file.context(name)
+            )
+        except Exception as exc:  # noqa: BLE001
+            # Anything the parser raises only spoils this entry, not the page
+            error = html.escape(f"{type(exc).__name__}: {exc}")
+            return (
+                f'<details class="entry error" open>{summary}'
+                f"<pre>{error}</pre></details>"
+            )
+        return (
+            f'<details class="entry" open>{summary}'
+            f"<pre>{html.escape(str(parsed))}</pre></details>"
+        )
+
+    def hexdump(self, name: str) -> str:
+        """Render the hexdump of an entry, with repeated rows suppressed."""
+        dump = hexdump_repeat_suppressed(self.el1_file.raw(name), hexdump_width(name))
+        return f"<pre>{html.escape(dump)}</pre>"
+
+
+def iter_html(
+    data: bytes | memoryview, limits: ParseLimits = DEFAULT_LIMITS
+) -> Iterator[str]:
+    """Yield HTML fragments for the header and each entry of an ``.el1`` file."""
+    yield from HtmlRenderer(data, limits)
@@ -0,0 +1,219 @@
+"""Serialize parsed ``.el1`` structures as JSON or MessagePack.
+
+The ``iter_*()`` functions convert and emit one entry at a time, so the whole
+output never needs to be held in memory. Entries which haven't been reverse
+engineered yet can be embedded as raw bytes (base64 in JSON) or referenced by
+their offset and size in the ``.el1`` file.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import IO, TYPE_CHECKING, Any, Literal
+
+from el1_parse.structures.hexdump_norepeat import (
+    HexDumpRepeatSuppressedBytes,
+    HexDumpRepeatSuppressedDict,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+FORMATS = ("json", "msgpack", "text")
+UNPARSED_MODES = ("inline", "ref")
+
+Format = Literal["json", "msgpack", "text"]
+UnparsedMode = Literal["inline", "ref"]
+
+
+def to_builtins(obj: Any, *, binary: bool = False) -> Any:  # noqa: ANN401
+    """Convert a parsed structure to dicts, lists, strings and numbers.
+
+    Private ``construct`` keys like ``_io`` are dropped and datetimes become ISO
+    8601 strings.
+
+    :param binary: keep raw bytes as ``bytes`` instead of encoding them as base64
+    """
+    if isinstance(obj, HexDumpRepeatSuppressedBytes | HexDumpRepeatSuppressedDict):
+        obj = obj.data
+    if isinstance(obj, Mapping):
+        return {
+            key: to_builtins(value, binary=binary)
+            for key, value in obj.items()
+            if not key.startswith("_")
+        }
+    if isinstance(obj, bytes | bytearray | memoryview):
+        return bytes(obj) if binary else base64.b64encode(obj).decode("ascii")
+    if isinstance(obj, str | int | float | bool) or obj is None:
+        return obj
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Sequence):
+        return [to_builtins(item, binary=binary) for item in obj]
+    msg = f"Can't convert {type(obj).__name__} to a plain Python object"
+    raise TypeError(msg)
+
+
+def entry_to_builtins(
+    entry: Mapping,
+    metadata: Mapping,
+    *,
+    unparsed: UnparsedMode = "inline",
+    binary: bool = False,
+) -> dict[str, Any]:
+    """Convert one item of ``entries``, referencing unparsed data if requested.
+
+    :param metadata: the entry table record for the entry
+    """
+    data = entry["data"]
+    if unparsed == "ref" and isinstance(data, HexDumpRepeatSuppressedBytes):
+        return {
+            "name": entry["name"],
+            "data": {"offset": metadata["offset"], "size": metadata["size"]},
+        }
+    return to_builtins(entry, binary=binary)
+
+
+def _items(
+    parsed: Mapping, *, unparsed: UnparsedMode, binary: bool
+) -> Iterator[tuple[str, Any]]:
+    """Yield converted top-level items, with ``entries`` as a lazy iterator."""
+    for key, value in parsed.items():
+        if key.startswith("_"):
+            continue
+        if key == "entries":
+            entry_table = parsed["entry_table"]
+            yield (
+                key,
+                (
+                    entry_to_builtins(
+                        entry, entry_table[index], unparsed=unparsed, binary=binary
+                    )
+                    for index, entry in enumerate(value)
+                ),
+            )
+        else:
+            yield key, to_builtins(value, binary=binary)
+
+
+def iter_json(parsed: Mapping, *, unparsed: UnparsedMode = "inline") -> Iterator[str]:
+    """Yield a parsed ``.el1`` file as chunks of JSON text, one entry at a time."""
+    yield "{"
+    for index, (key, value) in enumerate(
+        _items(parsed, unparsed=unparsed, binary=False)
+    ):
+        yield f"{', ' if index else ''}{json.dumps(key)}: "
+        if key != "entries":
+            yield json.dumps(value)
+            continue
+        yield "["
+        for entry_index, entry in enumerate(value):
+            yield f"{', ' if entry_index else ''}{json.dumps(entry)}"
+        yield "]"
+    yield "}"
+
+
+def _msgpack_packer() -> Any:  # noqa: ANN401
+    try:
+        import msgpack  # noqa: PLC0415
+    except ImportError as exc:
+        msg = "MessagePack output requires the msgpack package: pip install msgpack"
+        raise ImportError(msg) from exc
+    return msgpack.Packer()
+
+
+def iter_msgpack(
+    parsed: Mapping, *, unparsed: UnparsedMode = "inline"
+) -> Iterator[bytes]:
+    """Yield a parsed ``.el1`` file as chunks of MessagePack, one entry at a time."""
+    packer = _msgpack_packer()
+    items = list(_items(parsed, unparsed=unparsed, binary=True))
+    yield packer.pack_map_header(len(items))
+    for key, value in items:
+        yield packer.pack(key)
+        if key != "entries":
+            yield packer.pack(value)
+            continue
+        yield packer.pack_array_header(len(parsed["entries"]))
+        for entry in value:
+            yield packer.pack(entry)
+
+
+def iter_serialized(
+    parsed: Mapping, fmt: Format = "json", *, unparsed: UnparsedMode = "inline"
+) -> Iterator[bytes]:
+    """Yield a parsed ``.el1`` file as encoded chunks in the given format."""
+    if fmt == "json":
+        for chunk in iter_json(parsed, unparsed=unparsed):
+            yield chunk.encode("utf-8")
+    elif fmt == "msgpack":
+        yield from iter_msgpack(parsed, unparsed=unparsed)
+    elif fmt == "text":
+        yield str(parsed).encode("utf-8")
+    else:
+        msg = f"Unknown output format {fmt!r}, expected one of {FORMATS}"
+        raise ValueError(msg)
+
+
+def iter_record(
+    fields: Mapping[str, Any],
+    parsed: Mapping | None = None,
+    fmt: Format = "json",
+    *,
+    unparsed: UnparsedMode = "inline",
+    serialized: bytes | None = None,
+) -> Iterator[bytes]:
+    """Yield a record of plain ``fields`` and an optional parsed file as ``result``.
+
+    Used for one line of batch output. JSON records end with a newline.
+
+    :param serialized: a result already serialized in ``fmt``, used instead of
+                       ``parsed``, e.g. from a cache
+    """
+    if fmt not in ("json", "msgpack"):
+        msg = f"Records can only be written as JSON or MessagePack, not {fmt!r}"
+        raise ValueError(msg)
+    if serialized is not None:
+        result: Iterable[bytes] | None = [serialized]
+    elif parsed is not None:
+        result = iter_serialized(parsed, fmt, unparsed=unparsed)
+    else:
+        result = None
+    if fmt == "msgpack":
+        packer = _msgpack_packer()
+        yield packer.pack_map_header(len(fields) + (result is not None))
+        for key, value in fields.items():
+            yield packer.pack(key)
+            yield packer.pack(value)
+        if result is not None:
+            yield packer.pack("result")
+            yield from result
+    else:
+        if result is None:
+            yield json.dumps(fields).encode("utf-8")
+        else:
+            head = json.dumps(fields)[:-1]
+            yield f'{head}{", " if fields else ""}"result": '.encode()
+            yield from result
+            yield b"}"
+        yield b"\n"
+
+
+def dump(
+    parsed: Mapping,
+    stream: IO[bytes],
+    fmt: Format = "json",
+    *,
+    unparsed: UnparsedMode = "inline",
+) -> None:
+    """Write a parsed ``.el1`` file to a binary stream in the given format.
+
+    JSON and text output are terminated with a newline.
+    """
+    for chunk in iter_serialized(parsed, fmt, unparsed=unparsed):
+        stream.write(chunk)
+    if fmt != "msgpack":
+        stream.write(b"\n")
@@ -0,0 +1,397 @@
+"""A long-lived local service which parses ``.el1`` files over HTTP.
+
+Running ``el1-parse`` as a subprocess for each file pays for starting the
+interpreter, importing ``construct`` and generating the parsers every time. The
+service pays for them once, and keeps worker processes with the parsers built.
+
+Requests are answered over HTTP on a localhost port or a Unix socket:
+
+``POST /parse``
+    Parse the ``.el1`` file in the request body.
+``GET /parse?path=PATH``
+    Parse a file on the machine running the service.
+``GET /stats``
+    Return counters of requests, cache hits and latency as JSON.
+
+Both ``/parse`` requests take the ``format`` (``json`` or ``msgpack``) and
+``unparsed`` (``inline`` or ``ref``) query parameters, like the command line.
+Results are kept in an in-memory LRU cache keyed by the SHA-256 digest of the
+content, and concurrent requests for the same content wait for a single parse.
+Files which fail to parse get status 422, and files which can't be read 404,
+both with the error type and message as JSON.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import socket
+import socketserver
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from construct import ConstructError
+
+from el1_parse.batch import error_payload, serialize_bytes
+from el1_parse.serialize import UNPARSED_MODES
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from os import PathLike
+    from types import TracebackType
+    from typing import Self
+
+    from el1_parse.serialize import Format, UnparsedMode
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_CACHE_SIZE = 256 << 20  # 256 MiB of serialized results
+LATENCY_WINDOW = 1000  # how many recent requests the latency percentiles cover
+CONTENT_TYPES = {"json": "application/json", "msgpack": "application/msgpack"}
+
+
+def _warm_up() -> None:
+    """Build the parser in a worker process before the first request."""
+    from el1_parse.structures.el1 import el1_fast  # noqa: F401, PLC0415
+
+
+class ParseService:
+    """Parse ``.el1`` contents on a worker pool, with an LRU cache of results.
+
+    Safe to call from the threads of a threaded server.
+
+    :param jobs: the number of worker processes, ``None`` for one per CPU, or ``1``
+                 to parse in a thread of the current process
+    :param cache_size: the total size of cached results to evict down to, in bytes
+    """
+
+    def __init__(
+        self, jobs: int | None = None, cache_size: int = DEFAULT_CACHE_SIZE
+    ) -> None:
+        """Start the worker pool."""
+        self.cache_size = cache_size
+        self._executor: Executor
+        if jobs == 1:
+            self._executor = ThreadPoolExecutor(max_workers=1, initializer=_warm_up)
+        else:
+            # Imported here, since it takes long to import ``multiprocessing``
+            from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=jobs or os.cpu_count() or 1, initializer=_warm_up
+            )
+        # Reentrant, since a parse which is already done stores its result when
+        # the callback is added
+        self._lock = threading.RLock()
+        self._results: OrderedDict[str, tuple[bool, bytes]] = OrderedDict()
+        self._results_size = 0
+        self._pending: dict[str, Future[tuple[bool, bytes]]] = {}
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._started = time.monotonic()
+        self.requests = self.hits = self.coalesced = self.parses = 0
+        self.failures = self.bytes_parsed = 0
+        self.total_latency = self.max_latency = 0.0
+
+    def close(self) -> None:
+        """Wait for running parses and shut down the worker pool."""
+        self._executor.shutdown()
+
+    def __enter__(self) -> Self:
+        """Return the service itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Shut down the worker pool."""
+        self.close()
+
+    def parse(
+        self, data: bytes, fmt: Format = "json", unparsed: UnparsedMode = "inline"
+    ) -> tuple[bool, bytes]:
+        """Parse and serialize ``.el1`` file contents, or return a cached result.
+
+        :return: like ``el1_parse.batch.serialize_file()``
+        """
+        start = time.perf_counter()
+        key = f"{hashlib.sha256(data).hexdigest()}:{fmt}:{unparsed}"
+        future = None
+        with self._lock:
+            self.requests += 1
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                result = self._results[key]
+            elif key in self._pending:
+                self.coalesced += 1
+                future = self._pending[key]
+            else:
+                self.parses += 1
+                self.bytes_parsed += len(data)
+                future = self._executor.submit(serialize_bytes, data, fmt, unparsed)
+                self._pending[key] = future
+                future.add_done_callback(lambda done: self._store(key, done))
+        if future is not None:
+            try:
+                result = future.result()
+            except Exception:
+                with self._lock:
+                    self.failures += 1
+                raise
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.failures += not result[0]
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self._latencies.append(latency)
+        return result
+
+    def _store(self, key: str, future: Future[tuple[bool, bytes]]) -> None:
+        """Move a finished parse from the pending parses to the cache."""
+        with self._lock:
+            del self._pending[key]
+            if future.exception() is not None:
+                return
+            self._results[key] = future.result()
+            self._results_size += len(self._results[key][1])
+            while self._results_size > self.cache_size and self._results:
+                _, (_, evicted) = self._results.popitem(last=False)
+                self._results_size -= len(evicted)
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters of requests, cache hits, throughput and latency."""
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            latencies = sorted(self._latencies)
+            percentiles = (
+                statistics.quantiles(latencies, n=100, method="inclusive")
+                if len(latencies) > 1
+                else latencies * 99
+            )
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "parses": self.parses,
+                "failures": self.failures,
+                "bytes_parsed": self.bytes_parsed,
+                "cached_results": len(self._results),
+                "cached_bytes": self._results_size,
+                "uptime_s": uptime,
+                "requests_per_s": self.requests / uptime if uptime else 0.0,
+                "latency_ms": {
+                    "mean": 1000 * self.total_latency / max(self.requests, 1),
+                    "max": 1000 * self.max_latency,
+                    "p50": 1000 * percentiles[49] if percentiles else 0.0,
+                    "p99": 1000 * percentiles[98] if percentiles else 0.0,
+                },
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answer ``/parse`` and ``/stats`` requests with the server's service."""
+
+    server: _HTTPServer | _UnixHTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Parse a local file, or return the counters."""
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            self._reply(200, json.dumps(self.server.service.stats()).encode())
+        elif url.path == "/parse":
+            self._parse(parse_qs(url.query), None)
+        else:
+            self._reply(404, error_payload(FileNotFoundError(url.path)))
+
+    def do_POST(self) -> None:
+        """Parse the file in the request body."""
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if url.path == "/parse":
+            self._parse(parse_qs(url.query), body)
+        else:
+            self._reply(404, error_payload(FileNotFoundError(url.path)))
+
+    def _parse(self, query: dict[str, list[str]], body: bytes | None) -> None:
+        fmt = query.get("format", ["json"])[-1]
+        unparsed = query.get("unparsed", ["inline"])[-1]
+        if fmt not in CONTENT_TYPES or unparsed not in UNPARSED_MODES:
+            error = ValueError(f"unsupported format={fmt} or unparsed={unparsed}")
+            self._reply(400, error_payload(error))
+            return
+        if body is None:
+            if "path" not in query:
+                self._reply(400, error_payload(ValueError("no path given")))
+                return
+            try:
+                body = Path(query["path"][-1]).read_bytes()
+            except OSError as exc:
+                self._reply(404, error_payload(exc))
+                return
+        try:
+            ok, payload = self.server.service.parse(body, fmt, unparsed)
+        except ConstructError as exc:
+            self._reply(422, error_payload(exc))
+            return
+        except Exception as exc:  # noqa: BLE001
+            # e.g. a missing optional serializer, or a worker process which died
+            self._reply(500, error_payload(exc))
+            return
+        self._reply(200 if ok else 422, payload, CONTENT_TYPES[fmt] if ok else None)
+
+    def _reply(
+        self, status: int, payload: bytes, content_type: str | None = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type or CONTENT_TYPES["json"])
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self) -> str:
+        """Return the client address, which is empty for Unix sockets."""
+        return self.client_address[0] if self.client_address else "unix socket"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        """Only log requests if the server is verbose."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    service: ParseService
+    verbose = False
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    service: ParseService
+    verbose = False
+
+
+def make_server(
+    service: ParseService,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = 0,
+    unix_socket: str | PathLike[str] | None = None,
+    verbose: bool = False,
+) -> socketserver.BaseServer:
+    """Create a threaded HTTP server for the service, on a port or a Unix socket.
+
+    Call ``serve_forever()`` on the server to answer requests.
+
+    :param port: the TCP port on ``host``, or ``0`` to pick a free one
+    :param unix_socket: listen on this Unix socket instead of a TCP port
+    :param verbose: log each request
+    """
+    server: _HTTPServer | _UnixHTTPServer
+    if unix_socket is None:
+        server = _HTTPServer((host, port), _Handler)
+    else:
+        server = _UnixHTTPServer(os.fspath(unix_socket), _Handler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+class ServiceError(Exception):
+    """A request to the parse service failed."""
+
+    def __init__(self, status: int, payload: bytes) -> None:
+        """Keep the HTTP status and the error type and message from the service."""
+        self.status = status
+        self.error: dict[str, str] = json.loads(payload)
+        super().__init__(f"{status} {self.error['error']}: {self.error['message']}")
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, unix_socket: str) -> None:
+        super().__init__("localhost")
+        self.unix_socket = unix_socket
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_socket)
+
+
+class ParseClient:
+    """A minimal client for the parse service, keeping one connection open.
+
+    :param address: ``(host, port)``, or the path of a Unix socket
+    """
+
+    def __init__(self, address: tuple[str, int] | str | PathLike[str]) -> None:
+        """Connect to the service when the first request is made."""
+        self._connection = (
+            http.client.HTTPConnection(*address)
+            if isinstance(address, tuple)
+            else _UnixHTTPConnection(os.fspath(address))
+        )
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._connection.close()
+
+    def __enter__(self) -> Self:
+        """Return the client itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the connection."""
+        self.close()
+
+    def parse_bytes(
+        self, data: bytes, fmt: Format = "json", unparsed: UnparsedMode = "inline"
+    ) -> bytes:
+        """Parse ``.el1`` file contents and return the serialized result.
+
+        :raises ServiceError: if the file couldn't be parsed
+        """
+        query = urlencode({"format": fmt, "unparsed": unparsed})
+        return self._request("POST", f"/parse?{query}", data)
+
+    def parse_path(
+        self,
+        path: str | PathLike[str],
+        fmt: Format = "json",
+        unparsed: UnparsedMode = "inline",
+    ) -> bytes:
+        """Have the service read and parse a file, and return the serialized result.
+
+        :raises ServiceError: if the file couldn't be read or parsed
+        """
+        query = urlencode(
+            {"path": os.fspath(path), "format": fmt, "unparsed": unparsed}
+        )
+        return self._request("GET", f"/parse?{query}")
+
+    def stats(self) -> dict[str, Any]:
+        """Return the counters of the service."""
+        return json.loads(self._request("GET", "/stats"))
+
+    def _request(self, method: str, url: str, body: bytes | None = None) -> bytes:
+        self._connection.request(method, url, body)
+        response = self._connection.getresponse()
+        payload = response.read()
+        if response.status != 200:  # noqa: PLR2004
+            raise ServiceError(response.status, payload)
+        return payload
@@ -0,0 +1,189 @@
+"""Parse ``.el1`` files incrementally from non-seekable streams.
+
+Parsing the whole file with ``el1`` seeks to the offset of each entry, so the
+whole file has to be in memory first. The entries are laid out one after the
+other in the order of the entry table, though, so the header and entry table can
+be parsed as soon as their bytes arrive, and then each entry as soon as its
+``size`` bytes have arrived. Only the bytes of one entry are buffered at a time.
+
+``StreamingParser`` is fed chunks of bytes and returns the entries completed by
+each chunk. ``iter_entries()`` reads chunks from a binary file object like
+``sys.stdin.buffer`` and ``aiter_entries()`` from an async iterable of chunks like
+an upload body. Streams whose entry offsets go backwards can't be parsed this way
+and raise ``EntryOrderError``.
+"""
+
+from __future__ import annotations
+
+from typing import IO, TYPE_CHECKING, Any, NamedTuple
+
+from construct import ConstructError, Container, StreamError
+
+from el1_parse.el1_file import ENTRY_METADATA_SIZE, HEADER_SIZE, fixed_header_struct
+from el1_parse.structures.el1 import el1_header
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator, Collection, Iterator
+
+    from el1_parse.structures.fast_parser import FastEl1Parser
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+class EntryOrderError(ConstructError):
+    """An entry starts before the end of the previous entry in the stream."""
+
+
+class StreamedEntry(NamedTuple):
+    """An entry parsed from a stream, in the order of the entry table."""
+
+    index: int
+    name: str
+    data: Any
+
+
+class StreamingParser:
+    """Parse an ``.el1`` file from chunks of bytes as they arrive.
+
+    Bytes between the entry table and the first entry, or between entries, are
+    skipped, as are entries not in ``names``, without buffering them.
+
+    :param names: only parse the entries with these names (default: all)
+    :param parser: the parser for each entry (default: ``el1_fast``), e.g.
+                   ``el1_parse.untrusted.limited_parser()`` for untrusted streams
+    """
+
+    def __init__(
+        self,
+        names: Collection[str] | None = None,
+        parser: FastEl1Parser | None = None,
+    ) -> None:
+        """Start parsing a new stream."""
+        if parser is None:
+            from el1_parse.structures.el1 import el1_fast  # noqa: PLC0415
+
+            parser = el1_fast
+        self.names = names
+        self.parser = parser
+        self.header: Container | None = None
+        self.position = 0  # offset of the first buffered byte in the stream
+        self._buffer = bytearray()
+        self._index = 0
+
+    @property
+    def done(self) -> bool:
+        """Tell whether all entries have been parsed."""
+        return self.header is not None and self._index == len(self.header.entry_table)
+
+    def feed(self, chunk: bytes) -> list[StreamedEntry]:
+        """Add bytes from the stream and parse the entries they complete.
+
+        :raises EntryOrderError: if the offsets in the entry table go backwards
+        :raises StreamError: if there are bytes after the last entry
+        """
+        self._buffer += chunk
+        entries = []
+        if self.header is None and not self._parse_header():
+            return entries
+        while not self.done:
+            metadata = self.header.entry_table[self._index]
+            self._skip(metadata.offset - self.position)
+            if self.position < metadata.offset:
+                break
+            wanted = self.names is None or metadata.name in self.names
+            if not wanted:
+                self._skip(metadata.offset + metadata.size - self.position)
+                if self.position < metadata.offset + metadata.size:
+                    break
+            elif len(self._buffer) < metadata.size:
+                break
+            else:
+                entries.append(self._parse_entry(metadata.name, metadata.size))
+            self._index += 1
+        if self.done and self._buffer:
+            msg = f"unexpected bytes after the last entry at offset {self.position}"
+            raise StreamError(msg)
+        return entries
+
+    def close(self) -> None:
+        """Check that the stream ended after the last entry.
+
+        :raises StreamError: if the stream ended early
+        """
+        if self.header is None:
+            msg = f"stream ended at offset {self.position + len(self._buffer)}"
+            raise StreamError(msg + " inside the header")
+        if not self.done:
+            name = self.header.entry_table[self._index].name
+            msg = f"stream ended at offset {self.position + len(self._buffer)}"
+            raise StreamError(msg + f" before the end of {name}")
+
+    def _parse_header(self) -> bool:
+        if len(self._buffer) < HEADER_SIZE:
+            return False
+        fixed_header = fixed_header_struct.parse(self._buffer)
+        size = HEADER_SIZE + fixed_header.num_entries * ENTRY_METADATA_SIZE
+        if len(self._buffer) < size:
+            return False
+        self.header = el1_header.parse(bytes(self._buffer[:size]))
+        self._consume(size)
+        end = size
+        for metadata in self.header.entry_table:
+            if metadata.offset < end:
+                msg = (
+                    f"{metadata.name} starts at offset {metadata.offset}, before the"
+                    f" end of the previous entry or the entry table at {end}"
+                )
+                raise EntryOrderError(msg)
+            end = metadata.offset + metadata.size
+        return True
+
+    def _parse_entry(self, name: str, size: int) -> StreamedEntry:
+        data = bytes(self._buffer[:size])
+        self._consume(size)
+        entry_context = Container(_=self.header, _index=self._index, name=name)
+        context = Container(_=entry_context, _index=self._index)
+        return StreamedEntry(
+            self._index, name, self.parser.parse_entry(name, data, context)
+        )
+
+    def _skip(self, count: int) -> None:
+        """Drop up to ``count`` bytes which have arrived."""
+        self._consume(min(count, len(self._buffer)))
+
+    def _consume(self, count: int) -> None:
+        del self._buffer[:count]
+        self.position += count
+
+
+def iter_entries(
+    file: IO[bytes],
+    names: Collection[str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    parser: FastEl1Parser | None = None,
+) -> Iterator[StreamedEntry]:
+    """Read an ``.el1`` file from a binary file object and yield its entries.
+
+    Each entry is yielded as soon as its bytes have been read. See
+    ``StreamingParser`` for the other parameters.
+    """
+    streaming_parser = StreamingParser(names, parser)
+    while chunk := file.read(chunk_size):
+        yield from streaming_parser.feed(chunk)
+    streaming_parser.close()
+
+
+async def aiter_entries(
+    chunks: AsyncIterable[bytes],
+    names: Collection[str] | None = None,
+    parser: FastEl1Parser | None = None,
+) -> AsyncIterator[StreamedEntry]:
+    """Read an ``.el1`` file from an async iterable of chunks and yield its entries.
+
+    See ``StreamingParser`` for the parameters.
+    """
+    streaming_parser = StreamingParser(names, parser)
+    async for chunk in chunks:
+        for entry in streaming_parser.feed(chunk):
+            yield entry
+    streaming_parser.close()
@@ -1,4 +1,13 @@
-"""Data structure for ``.el1`` files."""
+"""Data structure for ``.el1`` files.
+
+The parsers for whole files, ``el1``, ``el1_fast``, ``el1_validator``,
+``el1_lazy`` and ``el1_dat_extract``, and the ``lazy_entry_structs``, are only
+built when first accessed, since generating the code for the fast parser and the
+validator takes a large part of the startup time of short-lived processes.
+"""
+
+from collections.abc import Callable
+from typing import Any
 
 from construct import (
     Array,
@@ -17,7 +26,9 @@ from construct import (
 )
 
 from el1_parse.structures.entry_metadata import entry_metadata
+from el1_parse.structures.fast_parser import FastEl1Parser, FastEl1Validator
 from el1_parse.structures.hexdump_norepeat import HexDumpRepeatSuppress
+from el1_parse.structures.lazy_array import with_lazy_records
 from el1_parse.structures.page import page
 from el1_parse.structures.photo import photo
 from el1_parse.structures.photo_file import photo_file
@@ -31,14 +42,19 @@ def hexdump_unparsed(width: int = 16) -> Construct:
     )
 
 
+el1_header = Struct(
+    "magic" / Const("File Catalog Manager", PaddedString(0x20, "ascii")),
+    "unknown1" / Const(2, Int32ul),
+    "unknown2" / Const(0, Int32ul),
+    "num_entries" / Const(13, Int32ul),
+    "entry_table" / Array(this.num_entries, entry_metadata),
+)
+
+
 def make_parser(entry_struct: Construct) -> Struct:
     """Create a parser for the ``.el1`` file format."""
     return Struct(
-        "magic" / Const("File Catalog Manager", PaddedString(0x20, "ascii")),
-        "unknown1" / Const(2, Int32ul),
-        "unknown2" / Const(0, Int32ul),
-        "num_entries" / Const(13, Int32ul),
-        "entry_table" / Array(this.num_entries, entry_metadata),
+        *el1_header.subcons,
         "entries"
         / Array(
             this.num_entries,
@@ -59,24 +75,66 @@ def make_parser(entry_struct: Construct) -> Struct:
     )
 
 
-el1 = make_parser(
-    Switch(
+entry_structs = {
+    "ElpData.dat": hexdump_unparsed(32),
+    "CurrentBase.dat": hexdump_unparsed(32),
+    "Deflay.dat": hexdump_unparsed(84),
+    "Page.dat": page,
+    "Object.dat": hexdump_unparsed(88),
+    "Photo.dat": photo,
+    "Memo.dat": hexdump_unparsed(293),
+    "Text.dat": hexdump_unparsed(28),
+    "Calender.dat": hexdump_unparsed(37),
+    "CalenderBase.dat": hexdump_unparsed(37),
+    "PhotoList.dat": hexdump_unparsed(36),
+    "PhotoFile.dat": photo_file,
+    "ExpImg.dat": hexdump_unparsed(32),
+}
+
+
+def switch_entries(structs: dict[str, Construct]) -> Switch:
+    """Choose the struct for each entry by its name in the entry table."""
+    return Switch(
         lambda ctx: ctx._._["entry_table"][ctx._index].name,  # noqa: SLF001
-        {
-            "ElpData.dat": hexdump_unparsed(32),
-            "CurrentBase.dat": hexdump_unparsed(32),
-            "Deflay.dat": hexdump_unparsed(84),
-            "Page.dat": page,
-            "Object.dat": hexdump_unparsed(88),
-            "Photo.dat": photo,
-            "Memo.dat": hexdump_unparsed(293),
-            "Text.dat": hexdump_unparsed(28),
-            "Calender.dat": hexdump_unparsed(37),
-            "CalenderBase.dat": hexdump_unparsed(37),
-            "PhotoList.dat": hexdump_unparsed(36),
-            "PhotoFile.dat": photo_file,
-            "ExpImg.dat": hexdump_unparsed(32),
-        },
+        structs,
     )
-)
-el1_dat_extract = make_parser(hexdump_unparsed(32))
+
+
+def make_lazy_entry_structs(cache_size: int = 0) -> dict[str, Construct]:
+    """Create entry structs which decode page, photo and photo file records lazily.
+
+    :param cache_size: how many decoded records to keep for each array
+    """
+    return {
+        **entry_structs,
+        "Page.dat": with_lazy_records(page, "pages", cache_size),
+        "Photo.dat": with_lazy_records(photo, "photos", cache_size),
+        "PhotoFile.dat": with_lazy_records(photo_file, "photo_files", cache_size),
+    }
+
+
+def make_lazy_parser(cache_size: int = 0) -> Struct:
+    """Create a parser which decodes page and photo records only when accessed."""
+    return make_parser(switch_entries(make_lazy_entry_structs(cache_size)))
+
+
+_BUILDERS: dict[str, Callable[[], Any]] = {
+    "el1": lambda: make_parser(switch_entries(entry_structs)),
+    "el1_dat_extract": lambda: make_parser(hexdump_unparsed(32)),
+    "el1_fast": lambda: FastEl1Parser(
+        el1_header, entry_structs, reference=__getattr__("el1")
+    ),
+    "el1_validator": lambda: FastEl1Validator(el1_header, entry_structs),
+    "lazy_entry_structs": make_lazy_entry_structs,
+    "el1_lazy": lambda: make_parser(switch_entries(__getattr__("lazy_entry_structs"))),
+}
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Build a parser on first access and keep it as a module attribute."""
+    if name not in _BUILDERS:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    if name not in globals():
+        globals()[name] = _BUILDERS[name]()
+    return globals()[name]
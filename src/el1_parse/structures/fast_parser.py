@@ -0,0 +1,844 @@
+"""Code-generating fast path for parsing ``.el1`` files.
+
+The declarative structures in this package use context lambdas, ``OneOf``,
+``Const`` and ``Check`` validators and a ``Switch`` on the entry name, so
+``construct``'s own ``.compile()`` can't handle them. This module walks the same
+``construct`` trees and generates plain Python functions which read each
+fixed-size stretch of fields with a single precomputed ``struct.unpack_from()``
+call and then run the same validators on the unpacked values.
+
+Whenever the fast path rejects its input, the reference ``construct`` parser is
+run instead, so error types and messages are exactly those of ``el1.parse()``.
+
+Parsers generated with ``ParseLimits`` also check each array count, like
+``num_frames``, against a maximum and against the bytes left in the buffer before
+reading any records, and can stop when a time budget runs out.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+import threading
+import time
+from itertools import count
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from construct import (
+    Adapter,
+    Array,
+    Bytes,
+    Check,
+    Const,
+    Construct,
+    ConstructError,
+    Container,
+    FixedSized,
+    FormatField,
+    ListContainer,
+    NullStripped,
+    Padded,
+    Pass,
+    Renamed,
+    Struct,
+)
+from construct.core import (
+    GreedyBytes,
+    SizeofError,
+    StringEncoded,
+    Validator,
+    evaluate,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    ParseFunction = Callable[[bytes, int, Container], tuple[Any, int]]
+    FieldPath = tuple[str, ...]
+
+
+class FastPathError(Exception):
+    """Raised by generated code when the input needs the reference parser."""
+
+
+class LimitExceededError(ConstructError):
+    """Raised when parsing a file would exceed one of its ``ParseLimits``."""
+
+
+class ParseLimits(NamedTuple):
+    """Resource limits for parsing files from untrusted sources.
+
+    :param max_size: the largest file to parse, in bytes
+    :param max_records: the largest count of records in any array, e.g. of frames
+                        on a page. Counts are also checked against the bytes left
+                        in the file before any records are read.
+    :param timeout: the time budget for parsing a file in seconds, or ``None``
+    """
+
+    max_size: int = 32 * 1024 * 1024
+    max_records: int = 100_000
+    timeout: float | None = None
+
+
+class _Budget(threading.local):
+    """The deadline for the parse running in the current thread."""
+
+    deadline = math.inf
+
+
+CHECK_OPS = ("const", "validate")
+# The message of ``construct.Validator``, for validators which don't define their
+# own ``message`` with a ``%s`` for the value
+VALIDATION_MESSAGE = "object failed validation: %s"
+FALLBACK_ERRORS = (
+    ConstructError,
+    FastPathError,
+    IndexError,
+    KeyError,
+    UnicodeDecodeError,
+    struct.error,
+)
+
+
+def _message(node: Validator) -> str:
+    """Return the message format for values which fail a validator."""
+    return getattr(node, "message", VALIDATION_MESSAGE)
+
+
+def strip_pad(data: bytes, pad: bytes) -> bytes:
+    """Strip trailing padding like ``construct.NullStripped`` does."""
+    unit = len(pad)
+    if unit == 1:
+        return data.rstrip(pad)
+    if pad.count(pad[:1]) == unit:
+        # Strip bytes in bulk, then keep the unit holding the last non-pad byte
+        end = len(data.rstrip(pad[:1]))
+        return data[: min(len(data), end + -end % unit)]
+    end = len(data)
+    tailunit = end % unit
+    if tailunit and data[-tailunit:] == pad[:tailunit]:
+        end -= tailunit
+    while end - unit >= 0 and data[end - unit : end] == pad:
+        end -= unit
+    return data[:end]
+
+
+class _Simple:
+    """A fixed-size field which can be read as part of a combined struct format."""
+
+    def __init__(self, fmt: str, num_values: int, ops: list[tuple[str, Any]]) -> None:
+        self.fmt = fmt
+        self.num_values = num_values
+        self.ops = ops
+
+
+def _simple(node: Construct) -> _Simple | None:  # noqa: C901, PLR0911
+    """Describe ``node`` as a fixed-size format with post-processing, if possible."""
+    if isinstance(node, FormatField) and node.fmtstr[0] == "<":
+        return _Simple(node.fmtstr[1:], 1, [])
+    if isinstance(node, Bytes) and isinstance(node.length, int):
+        return _Simple(f"{node.length}s", 1, [])
+    if (
+        isinstance(node, Array)
+        and isinstance(node.count, int)
+        and not node.discard
+        and isinstance(node.subcon, FormatField)
+        and node.subcon.fmtstr[0] == "<"
+    ):
+        return _Simple(f"{node.count}{node.subcon.fmtstr[1:]}", node.count, [("list",)])
+    if (
+        isinstance(node, Padded)
+        and node.subcon is Pass
+        and isinstance(node.length, int)
+    ):
+        return _Simple(f"{node.length}x", 0, [])
+    if isinstance(node, Const):
+        inner = _simple(node.subcon)
+        if inner:
+            inner.ops.append(("const", node.value))
+        return inner
+    if isinstance(node, StringEncoded):
+        fixed = node.subcon
+        if (
+            isinstance(fixed, FixedSized)
+            and isinstance(fixed.length, int)
+            and isinstance(fixed.subcon, NullStripped)
+            and fixed.subcon.subcon is GreedyBytes
+        ):
+            ops = [("strip", fixed.subcon.pad), ("decode", node.encoding)]
+            return _Simple(f"{fixed.length}s", 1, ops)
+        return None
+    if isinstance(node, Validator):
+        inner = _simple(node.subcon)
+        if inner:
+            inner.ops.append(("validate", node._validate, _message(node)))  # noqa: SLF001
+        return inner
+    if isinstance(node, Adapter):
+        inner = _simple(node.subcon)
+        if inner:
+            inner.ops.append(("adapt", node._decode))  # noqa: SLF001
+        return inner
+    return None
+
+
+class _Compiler:
+    """Generate Python source for parsing ``construct`` trees.
+
+    :param validate: generate functions which report constraint violations through
+                     a ``report(path, offset, message)`` callback and carry on,
+                     instead of raising ``FastPathError``. Unless ``collect`` is
+                     set when a function is generated, its arrays aren't collected
+                     and its unconstrained values aren't decoded.
+    :param profile: generate functions which add the calls, wall time and bytes of
+                    each named field to counters in ``stats``, keyed by the path of
+                    field names below ``prefix`` when a function is generated
+    :param limits: generate functions which raise ``LimitExceededError`` for array
+                   counts over the limit or larger than the rest of the buffer, and
+                   with a ``timeout``, when ``budget.deadline`` has passed
+    """
+
+    def __init__(
+        self,
+        *,
+        validate: bool = False,
+        profile: bool = False,
+        limits: ParseLimits | None = None,
+    ) -> None:
+        self.validate = validate
+        self.profile = profile
+        self.limits = limits
+        self.budget = _Budget()
+        self.collect = True
+        self.prefix: FieldPath = ()
+        self.stats: dict[FieldPath, list[float]] = {}
+        self._stat_names: dict[FieldPath, str] = {}
+        self.namespace: dict[str, Any] = {
+            "Container": Container,
+            "ListContainer": ListContainer,
+            "FastPathError": FastPathError,
+            "evaluate": evaluate,
+            "strip_pad": strip_pad,
+            "clock": time.perf_counter,
+            "LimitExceededError": LimitExceededError,
+            "budget": self.budget,
+        }
+        self.chunks: list[str] = []
+        self._counter = count()
+        self._functions: dict[int, str] = {}
+
+    def constant(self, value: Any, prefix: str) -> str:  # noqa: ANN401
+        """Store ``value`` in the generated module namespace and return its name."""
+        name = f"_{prefix}{next(self._counter)}"
+        self.namespace[name] = value
+        return name
+
+    def variable(self, prefix: str = "v") -> str:
+        """Return a fresh local variable name."""
+        return f"{prefix}{next(self._counter)}"
+
+    def function(self, node: Construct) -> str:
+        """Generate a ``(buf, pos, context) -> (obj, pos)`` function for ``node``.
+
+        In validate mode, the signature is ``(buf, pos, context, path, report)``.
+        """
+        key = (id(node), self.collect)
+        if key not in self._functions:
+            name = f"parse_{type(node).__name__.lower()}_{next(self._counter)}"
+            self._functions[key] = name
+            params = (
+                "buf, pos, context, path, report"
+                if self.validate
+                else ("buf, pos, context")
+            )
+            lines = [f"def {name}({params}):"]
+            if isinstance(node, Struct):
+                lines.extend(self._struct(node, "    "))
+            else:
+                var = self._node(node, lines, "    ", "context", "path")
+                lines.append(f"    return {var}, pos")
+            self.chunks.append("\n".join(lines))
+        return self._functions[key]
+
+    def _call(self, function: str, ctx: str, path: str) -> str:
+        if self.validate:
+            return f"{function}(buf, pos, {ctx}, {path}, report)"
+        return f"{function}(buf, pos, {ctx})"
+
+    def _start(self, lines: list[str], indent: str) -> str:
+        """In validate mode, keep the current position for reporting offsets."""
+        start = self.variable("start")
+        if self.validate:
+            lines.append(f"{indent}{start} = pos")
+        return start
+
+    def _stat(self, name: str) -> str:
+        """Return the name of the ``[calls, seconds, bytes]`` counters for a field."""
+        path = (*self.prefix, name)
+        if path not in self._stat_names:
+            self.stats[path] = [0, 0.0, 0]
+            self._stat_names[path] = self.constant(self.stats[path], "stat")
+        return self._stat_names[path]
+
+    def _tic(self, lines: list[str], indent: str) -> tuple[str, str]:
+        """In profile mode, keep the current time and position."""
+        clock = self.variable("clock")
+        start = self.variable("start")
+        lines.append(f"{indent}{clock} = clock()")
+        lines.append(f"{indent}{start} = pos")
+        return clock, start
+
+    def _toc(
+        self, lines: list[str], indent: str, stat: str, tic: tuple[str, str]
+    ) -> None:
+        """In profile mode, add a call and the time and bytes since ``_tic()``."""
+        clock, start = tic
+        lines.append(f"{indent}{stat}[0] += 1")
+        lines.append(f"{indent}{stat}[1] += clock() - {clock}")
+        lines.append(f"{indent}{stat}[2] += pos - {start}")
+
+    def _fail(
+        self, lines: list[str], indent: str, where: tuple[str, str] | None, message: str
+    ) -> None:
+        """Emit the body of a failed check: raise, or report the violation."""
+        if self.validate and where:
+            lines.append(f"{indent}    report({where[0]}, {where[1]}, {message})")
+        else:
+            lines.append(f"{indent}    raise FastPathError")
+
+    def _struct(self, node: Struct, indent: str) -> list[str]:
+        lines = [
+            f"{indent}ctx = Container()",
+            f'{indent}ctx["_"] = context',
+            f'{indent}ctx["_index"] = context.get("_index")',
+        ]
+        run: list[tuple[str | None, _Simple | Check]] = []
+        for subcon in node.subcons:
+            name = subcon.name
+            field = subcon.subcon if isinstance(subcon, Renamed) else subcon
+            simple = field if isinstance(field, Check) else _simple(field)
+            if simple is not None:
+                run.append((name, simple))
+                continue
+            self._run(run, lines, indent)
+            run = []
+            path = f"path + ({name!r},)" if name else "path"
+            profiled = self.profile and name
+            if profiled:
+                stat = self._stat(name)
+                tic = self._tic(lines, indent)
+            prefix = self.prefix
+            self.prefix = (*prefix, name) if name else prefix
+            var = self._node(field, lines, indent, "ctx", path)
+            self.prefix = prefix
+            if profiled:
+                self._toc(lines, indent, stat, tic)
+            if name:
+                lines.append(f'{indent}ctx["{name}"] = {var}')
+        self._run(run, lines, indent)
+        lines.extend(
+            [
+                f'{indent}del ctx["_"]',
+                f'{indent}del ctx["_index"]',
+                f"{indent}return ctx, pos",
+            ]
+        )
+        return lines
+
+    def _run(
+        self,
+        run: list[tuple[str | None, _Simple | Check]],
+        lines: list[str],
+        indent: str,
+    ) -> None:
+        """Read consecutive fixed-size fields with one ``struct.unpack_from()``."""
+        fmt = "<" + "".join(item.fmt for _, item in run if isinstance(item, _Simple))
+        start = self._start(lines, indent)
+        if fmt != "<":
+            unpack = self.constant(struct.Struct(fmt).unpack_from, "unpack")
+            lines.append(f"{indent}t = {unpack}(buf, pos)")
+            lines.append(f"{indent}pos += {struct.calcsize(fmt)}")
+        index = 0
+        offset = 0
+        for name, item in run:
+            if isinstance(item, Check):
+                func = self.constant(item.func, "check")
+                lines.append(f"{indent}if not evaluate({func}, ctx):")
+                message = repr("check failed during parsing")
+                self._fail(lines, indent, ("path", f"{start} + {offset}"), message)
+                continue
+            where = (f"path + ({name!r},)", f"{start} + {offset}")
+            size = struct.calcsize("<" + item.fmt)
+            offset += size
+            if not item.num_values:
+                continue
+            if item.ops and item.ops[0][0] == "list":
+                value = f"t[{index}:{index + item.num_values}]"
+                if not self.validate:
+                    value = f"ListContainer({value})"
+            else:
+                value = f"t[{index}]"
+            index += item.num_values
+            if self.profile and name:
+                # The fields of a run are unpacked together, so only the time to
+                # post-process and check each value is counted for the field
+                stat = self._stat(name)
+                clock = self.variable("clock")
+                lines.append(f"{indent}{clock} = clock()")
+            var = self._ops(item.ops, value, lines, indent, "ctx", where)
+            if self.profile and name:
+                lines.append(f"{indent}{stat}[0] += 1")
+                lines.append(f"{indent}{stat}[1] += clock() - {clock}")
+                lines.append(f"{indent}{stat}[2] += {size}")
+            if name:
+                lines.append(f'{indent}ctx["{name}"] = {var}')
+
+    def _ops(  # noqa: PLR0913, PLR0917
+        self,
+        ops: list[tuple[str, Any]],
+        value: str,
+        lines: list[str],
+        indent: str,
+        ctx: str,
+        where: tuple[str, str] | None = None,
+    ) -> str:
+        """Emit post-processing and checks for a value read from the buffer.
+
+        :param where: expressions for the path and offset of the value, used when
+                      reporting violations in validate mode
+        """
+        var = self.variable()
+        lines.append(f"{indent}{var} = {value}")
+        as_tuple = self.validate and bool(ops) and ops[0][0] == "list"
+        if self.validate and not self.collect:
+            # Values which aren't checked are still decoded to catch invalid text,
+            # but padding isn't stripped (it decodes without errors) and adapters,
+            # which only convert values for the result, aren't run.
+            last_check = max(
+                (i for i, (op, *_) in enumerate(ops) if op in CHECK_OPS), default=-1
+            )
+            ops = [
+                (op, *args)
+                for i, (op, *args) in enumerate(ops)
+                if i < last_check or op not in ("strip", "adapt")
+            ]
+        for op, *args in ops:
+            if op == "strip":
+                lines.append(f"{indent}{var} = strip_pad({var}, {args[0]!r})")
+            elif op == "decode":
+                lines.append(f"{indent}{var} = {var}.decode({args[0]!r})")
+            elif op == "const":
+                const = self.constant(args[0], "const")
+                if as_tuple:
+                    expected = self.constant(tuple(args[0]), "const")
+                    lines.append(f"{indent}if {var} != {expected}:")
+                    parsed = f"list({var})"
+                else:
+                    lines.append(f"{indent}if {var} != {const}:")
+                    parsed = var
+                message = f'"parsing expected %r but parsed %r" % ({const}, {parsed})'
+                self._fail(lines, indent, where, message)
+            elif op == "validate":
+                validate = self.constant(args[0], "validate")
+                lines.append(f"{indent}if not {validate}({var}, {ctx}, None):")
+                message = f"{args[1]!r} % ({var},)"
+                self._fail(lines, indent, where, message)
+            elif op == "adapt":
+                decode = self.constant(args[0], "decode")
+                lines.append(f"{indent}{var} = {decode}({var}, {ctx}, None)")
+        return var
+
+    def _node(
+        self, node: Construct, lines: list[str], indent: str, ctx: str, path: str
+    ) -> str:
+        """Emit code parsing ``node`` at ``pos`` and return the result variable.
+
+        :param path: an expression for the path of the node, used in validate mode
+        """
+        simple = _simple(node)
+        if simple is not None:
+            start = self._start(lines, indent)
+            unpack = self.constant(
+                struct.Struct("<" + simple.fmt).unpack_from, "unpack"
+            )
+            lines.append(f"{indent}t = {unpack}(buf, pos)")
+            lines.append(f"{indent}pos += {struct.calcsize('<' + simple.fmt)}")
+            value = "t[0]"
+            if simple.ops and simple.ops[0][0] == "list":
+                value = "t" if self.validate else "ListContainer(t)"
+            return self._ops(simple.ops, value, lines, indent, ctx, (path, start))
+        var = self.variable()
+        if isinstance(node, Struct):
+            call = self._call(self.function(node), ctx, path)
+            lines.append(f"{indent}{var}, pos = {call}")
+        elif isinstance(node, Array) and not node.discard:
+            self._array(node, var, lines, indent, ctx, path)
+        elif isinstance(node, Padded):
+            start = self.variable("start")
+            length = self.constant(node.length, "length")
+            lines.append(f"{indent}{start} = pos")
+            value = self._node(node.subcon, lines, indent, ctx, path)
+            lines.extend(
+                [
+                    f"{indent}{var} = {value}",
+                    f"{indent}if pos > {start} + evaluate({length}, {ctx}):",
+                    f"{indent}    raise FastPathError",
+                    f"{indent}pos = {start} + evaluate({length}, {ctx})",
+                    f"{indent}if pos > len(buf):",
+                    f"{indent}    raise FastPathError",
+                ]
+            )
+        elif isinstance(node, Bytes):
+            length = self.constant(node.length, "length")
+            num = self.variable("n")
+            lines.extend(
+                [
+                    f"{indent}{num} = evaluate({length}, {ctx})",
+                    f"{indent}if {num} < 0 or pos + {num} > len(buf):",
+                    f"{indent}    raise FastPathError",
+                    f"{indent}{var} = buf[pos : pos + {num}]",
+                    f"{indent}pos += {num}",
+                ]
+            )
+        elif isinstance(node, Adapter):
+            start = self._start(lines, indent)
+            value = self._node(node.subcon, lines, indent, ctx, path)
+            if isinstance(node, Validator):
+                ops = [("validate", node._validate, _message(node))]  # noqa: SLF001
+            else:
+                ops = [("adapt", node._decode)]  # noqa: SLF001
+            return self._ops(ops, value, lines, indent, ctx, (path, start))
+        elif isinstance(node, Const):
+            start = self._start(lines, indent)
+            value = self._node(node.subcon, lines, indent, ctx, path)
+            where = (path, start)
+            return self._ops([("const", node.value)], value, lines, indent, ctx, where)
+        else:
+            msg = f"Can't generate a fast parser for {node!r}"
+            raise NotImplementedError(msg)
+        return var
+
+    def _array(  # noqa: PLR0913, PLR0917
+        self,
+        node: Array,
+        var: str,
+        lines: list[str],
+        indent: str,
+        ctx: str,
+        path: str,
+    ) -> None:
+        """Emit a loop parsing the items of an array into ``var``."""
+        num = self.variable("n")
+        item = self.variable("item")
+        size = self.constant(node.count, "count")
+        collect = self.collect or not self.validate
+        lines.extend(
+            [
+                f"{indent}{num} = evaluate({size}, {ctx})",
+                f"{indent}if {num} < 0:",
+                f"{indent}    raise FastPathError",
+                f"{indent}{var} = ListContainer()"
+                if collect
+                else (f"{indent}{var} = None"),
+            ]
+        )
+        if self.limits is not None:
+            self._limit_count(node, num, lines, indent)
+        lines.extend(
+            [
+                f"{indent}for i in range({num}):",
+                f'{indent}    {ctx}["_index"] = i',
+            ]
+        )
+        if self.limits is not None and self.limits.timeout is not None:
+            message = repr(f"parsing took over {self.limits.timeout} seconds")
+            lines.append(f"{indent}    if clock() > budget.deadline:")
+            lines.append(f"{indent}        raise LimitExceededError({message})")
+        value = self._node(node.subcon, lines, indent + "    ", ctx, f"{path} + (i,)")
+        if collect:
+            lines.append(f"{indent}    {item} = {value}")
+            lines.append(f"{indent}    {var}.append({item})")
+
+    def _limit_count(
+        self, node: Array, num: str, lines: list[str], indent: str
+    ) -> None:
+        """Emit checks of an array count against the limit and the rest of ``buf``."""
+        field = "/".join(map(str, self.prefix))
+        max_records = self.limits.max_records
+        lines.append(f"{indent}if {num} > {max_records}:")
+        message = f"{field}: %d records is more than the limit of {max_records}"
+        lines.append(f"{indent}    raise LimitExceededError({message!r} % {num})")
+        try:
+            size = node.subcon.sizeof()
+        except SizeofError:
+            return
+        if size:
+            lines.append(f"{indent}if {num} * {size} > len(buf) - pos:")
+            message = (
+                f"{field}: %d records of {size} bytes don't fit in the remaining"
+                " %d bytes"
+            )
+            values = f"({num}, len(buf) - pos)"
+            lines.append(
+                f"{indent}    raise LimitExceededError({message!r} % {values})"
+            )
+
+    def source(self) -> str:
+        """Return the source code of all generated functions."""
+        return "\n\n\n".join(self.chunks) + "\n"
+
+
+class FastEl1Parser:
+    """Parse ``.el1`` files using code generated from the ``construct`` structures.
+
+    :param header: the struct for the file header and the entry table
+    :param entry_structs: structs for entries, keyed by entry name
+    :param reference: the ``construct`` parser to use when the fast path fails
+    :param profile: count the calls, wall time and bytes of the header, each entry
+                    and each named field in ``stats``. Parsers without it run no
+                    instrumentation code at all.
+    :param limits: raise ``LimitExceededError`` instead of parsing files or arrays
+                   larger than these limits, or for longer than their ``timeout``
+    """
+
+    def __init__(
+        self,
+        header: Struct,
+        entry_structs: dict[str, Construct],
+        reference: Construct,
+        *,
+        profile: bool = False,
+        limits: ParseLimits | None = None,
+    ) -> None:
+        """Generate parsing functions for the header and each entry type."""
+        compiler = _Compiler(profile=profile, limits=limits)
+        compiler.prefix = ("header",)
+        header_name = compiler.function(header)
+        entry_names = {}
+        for name, entry_struct in entry_structs.items():
+            compiler.prefix = (name,)
+            entry_names[name] = compiler.function(entry_struct)
+        self.source = compiler.source()
+        namespace = compiler.namespace
+        exec(compile(self.source, "<el1_fast>", "exec"), namespace)  # noqa: S102
+        self._header: ParseFunction = namespace[header_name]
+        self._entries: dict[str, ParseFunction] = {
+            name: namespace[function_name]
+            for name, function_name in entry_names.items()
+        }
+        self.stats: dict[FieldPath, list[float]] | None = None
+        if profile:
+            self.stats = compiler.stats
+            self._header = self._timed(self._header, ("header",))
+            self._entries = {
+                name: self._timed(function, (name,))
+                for name, function in self._entries.items()
+            }
+        self.entry_structs = entry_structs
+        self.reference = reference
+        self.limits = limits
+        self._budget = compiler.budget
+
+    def _timed(self, function: ParseFunction, path: FieldPath) -> ParseFunction:
+        """Wrap a generated function to count its calls, wall time and bytes."""
+        stat = self.stats.setdefault(path, [0, 0.0, 0])
+
+        def timed(buf: bytes, pos: int, context: Container) -> tuple[Any, int]:
+            start = time.perf_counter()
+            result, end = function(buf, pos, context)
+            stat[0] += 1
+            stat[1] += time.perf_counter() - start
+            stat[2] += end - pos
+            return result, end
+
+        return timed
+
+    def parse(self, data: bytes) -> Container:
+        """Parse ``.el1`` file contents, with the same result as ``el1.parse()``.
+
+        :raises LimitExceededError: if the parser has ``limits`` and the file
+                                    exceeds them
+        """
+        if self.limits is not None:
+            return self._parse_limited(data)
+        try:
+            return self._parse(data)
+        except FALLBACK_ERRORS:
+            if self.stats is None:
+                return self.reference.parse(data)
+            # Count files which need the reference parser, since they're slow
+            stat = self.stats.setdefault(("(reference parser)",), [0, 0.0, 0])
+            start = time.perf_counter()
+            try:
+                return self.reference.parse(data)
+            finally:
+                stat[0] += 1
+                stat[1] += time.perf_counter() - start
+                stat[2] += len(data)
+
+    def _parse_limited(self, data: bytes) -> Container:
+        """Parse within ``limits``, falling back only if the fast path passed them.
+
+        The reference parser reads fields in the same order as the fast path, so it
+        fails at the same field, and all arrays before it have been checked. The
+        time budget only covers the fast path.
+        """
+        if len(data) > self.limits.max_size:
+            msg = (
+                f"the file is {len(data)} bytes,"
+                f" more than the limit of {self.limits.max_size}"
+            )
+            raise LimitExceededError(msg)
+        if self.limits.timeout is not None:
+            self._budget.deadline = time.perf_counter() + self.limits.timeout
+        try:
+            return self._parse(data)
+        except LimitExceededError:
+            raise
+        except FALLBACK_ERRORS:
+            return self.reference.parse(data)
+        finally:
+            self._budget.deadline = math.inf
+
+    def parse_entry(self, name: str, data: bytes, context: Container) -> Any:  # noqa: ANN401
+        """Parse the raw bytes of a single entry.
+
+        :param name: the entry name, as in the entry table
+        :param data: the ``size`` bytes of the entry
+        :param context: the context for the entry, with ``_`` pointing to a context
+                        whose ``_`` is the parsed header, and ``_index`` set to the
+                        position of the entry in the entry table
+        :raises LimitExceededError: if the parser has ``limits`` and the entry
+                                    exceeds them, with the ``timeout`` applying
+                                    to this entry alone
+        """
+        if name not in self._entries:
+            return None
+        if self.limits is not None and self.limits.timeout is not None:
+            self._budget.deadline = time.perf_counter() + self.limits.timeout
+        try:
+            return self._entries[name](data, 0, context)[0]
+        except LimitExceededError:
+            raise
+        except FALLBACK_ERRORS:
+            return self.entry_structs[name].parse(data, **context)
+        finally:
+            self._budget.deadline = math.inf
+
+    def _parse(self, data: bytes) -> Container:
+        result, pos = self._header(data, 0, Container())
+        entries = ListContainer()
+        for index, metadata in enumerate(result.entry_table):
+            result["_index"] = index
+            name = metadata.name.strip("\x00")
+            entry_context = Container(_=result, _index=index, name=name)
+            data_context = Container(_=entry_context, _index=index)
+            parse_entry = self._entries.get(metadata.name)
+            if parse_entry is None:
+                entry_data, pos = None, metadata.offset
+            else:
+                entry_data, pos = parse_entry(data, metadata.offset, data_context)
+            entries.append(Container(name=name, data=entry_data))
+        result.pop("_index", None)
+        if pos != len(data):
+            raise FastPathError
+        result["entries"] = entries
+        result["end"] = None
+        return result
+
+
+class FastEl1Validator:
+    """Check ``.el1`` files against all constraints without building the result.
+
+    The generated functions run the same ``Const``, ``OneOf`` and ``Check``
+    validators as ``FastEl1Parser``, but report violations and carry on instead
+    of raising. Only the header and the entry table are kept. In addition, the
+    entries must follow each other without gaps and end at the end of the file.
+
+    :param header: the struct for the file header and the entry table
+    :param entry_structs: structs for entries, keyed by entry name
+    """
+
+    def __init__(self, header: Struct, entry_structs: dict[str, Construct]) -> None:
+        """Generate validating functions for the header and each entry type."""
+        compiler = _Compiler(validate=True)
+        header_name = compiler.function(header)
+        compiler.collect = False
+        entry_names = {
+            name: compiler.function(entry_struct)
+            for name, entry_struct in entry_structs.items()
+        }
+        self.source = compiler.source()
+        namespace = compiler.namespace
+        exec(compile(self.source, "<el1_validate>", "exec"), namespace)  # noqa: S102
+        self._header = namespace[header_name]
+        self._entries = {
+            name: namespace[function_name]
+            for name, function_name in entry_names.items()
+        }
+        *fixed_subcons, table_subcon = header.subcons
+        self._table_offset = Struct(*fixed_subcons).sizeof()
+        self._metadata_size = table_subcon.subcon.subcon.sizeof()
+        self.header = header
+        self.entry_structs = entry_structs
+
+    def validate(self, data: bytes, report: Callable[[tuple, int, str], None]) -> None:
+        """Call ``report(path, offset, message)`` for each violation in ``data``.
+
+        ``path`` is a tuple of field names and array indices, starting with the
+        entry name for fields inside entries. If an entry can't be read at all,
+        e.g. because it's truncated, the error from ``construct`` is reported at
+        the start of the entry and validation continues with the next entry.
+
+        :param data: the file contents, as any buffer ``struct`` can read from
+        """
+        try:
+            header, _ = self._header(data, 0, Container(), (), report)
+        except FALLBACK_ERRORS as exc:
+            report((), 0, self._reference_error(self.header, data, Container(), exc))
+            return
+        end = None
+        for index, metadata in enumerate(header.entry_table):
+            table_path = ("entry_table", index)
+            table_offset = self._table_offset + index * self._metadata_size
+            if end is not None and metadata.offset != end:
+                message = f"entry starts at {metadata.offset}, not right after the"
+                report(
+                    (*table_path, "offset"),
+                    table_offset + 4,
+                    f"{message} previous entry at {end}",
+                )
+            end = metadata.offset + metadata.size
+            if end > len(data):
+                message = f"entry ends at {end}, after the end of the file"
+                report((*table_path, "size"), table_offset + 8, message)
+                continue
+            validate_entry = self._entries.get(metadata.name)
+            if validate_entry is None:
+                continue
+            name = metadata.name.strip("\x00")
+            header["_index"] = index
+            entry_context = Container(_=header, _index=index, name=name)
+            data_context = Container(_=entry_context, _index=index)
+            try:
+                validate_entry(data, metadata.offset, data_context, (name,), report)
+            except FALLBACK_ERRORS as exc:
+                message = self._reference_error(
+                    self.entry_structs[metadata.name],
+                    bytes(data[metadata.offset : end]),
+                    data_context,
+                    exc,
+                )
+                report((name,), metadata.offset, message)
+        if end is not None and end < len(data):
+            report(("end",), end, f"expected end of file, got {len(data) - end} bytes")
+
+    @staticmethod
+    def _reference_error(
+        struct_: Construct, data: bytes, context: Container, exc: Exception
+    ) -> str:
+        """Describe why ``construct`` can't parse what the fast path couldn't read."""
+        try:
+            struct_.parse(data, **context)
+        except ConstructError as error:
+            return str(error).replace("\n", ": ")
+        return f"could not read the data: {exc!r}"
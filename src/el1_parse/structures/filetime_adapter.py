@@ -2,7 +2,14 @@
 
 from datetime import UTC, datetime
 
-from construct import Adapter, Container, Int64ul, Subconstruct, ValidationError
+from construct import (
+    Adapter,
+    Container,
+    Int64ul,
+    Subconstruct,
+    ValidationError,
+    Validator,
+)
 
 WINDOWS_TICKS = 10_000_000  # 100 nanoseconds or .1 microseconds
 WINDOWS_EPOCH = datetime(1601, 1, 1, 0, 0, 0, tzinfo=UTC)
@@ -14,6 +21,11 @@ WINDOWS_TICKS_TO_POSIX_EPOCH_TICKS = int(EPOCH_DIFF_SECS * WINDOWS_TICKS)
 
 FILETYPE_SIZE_BYTES = 8
 
+# ``datetime.fromtimestamp()`` goes through a float, so stay a second clear of
+# ``datetime.max`` to leave room for its rounding
+MAX_FILETIME = datetime(9999, 12, 31, 23, 59, 59, tzinfo=UTC)
+MAX_FILETIME_TICKS = int((MAX_FILETIME - WINDOWS_EPOCH).total_seconds()) * WINDOWS_TICKS
+
 
 class FileTimeAdapter(Adapter):
     """Convert between Windows FILETIME and Python ``datetime``.
@@ -69,4 +81,23 @@ class FileTimeAdapter(Adapter):
         return round(seconds_since_win_epoch * WINDOWS_TICKS)
 
 
-FileTime = FileTimeAdapter(Int64ul)
+class FileTimeRange(Validator):
+    """Check that a FILETIME is in the range ``FileTimeAdapter`` can decode.
+
+    Validate-only parsers skip adapters, but run validators, so they check the
+    range too, and report it with ``message``.
+    """
+
+    message = "FILETIME %s is out of the range of datetime"
+
+    def _validate(self, obj: int, context: Container, path: str) -> bool:  # noqa: ARG002
+        return 0 <= obj <= MAX_FILETIME_TICKS
+
+    def _decode(self, obj: int, context: Container, path: str) -> int:
+        """Return the FILETIME, or raise ``ValidationError`` with ``message``."""
+        if not self._validate(obj, context, path):
+            raise ValidationError(self.message % (obj,), path=path)
+        return obj
+
+
+FileTime = FileTimeAdapter(FileTimeRange(Int64ul))
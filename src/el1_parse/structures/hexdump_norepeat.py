@@ -1,5 +1,6 @@
 """Hexdump adapter for ``construct`` that suppresses repeated lines."""
 
+from collections.abc import Iterator
 from typing import Any
 
 from construct import Container
@@ -21,6 +22,14 @@ class HexDumpRepeatSuppressedBytes:
         """Return a string representation of the bytes object."""
         return hexdump_repeat_suppressed(self.data, width=self._width)
 
+    def __eq__(self, other: object) -> bool:
+        """Compare data and width with another hexdump bytes object."""
+        if not isinstance(other, HexDumpRepeatSuppressedBytes):
+            return NotImplemented
+        return (self.data, self._width) == (other.data, other._width)
+
+    __hash__ = None  # type: ignore[assignment]
+
 
 class HexDumpRepeatSuppressedDict:
     """Dict whose string representation suppresses repeated hexdump lines."""
@@ -36,37 +45,83 @@ class HexDumpRepeatSuppressedDict:
         return hexdump_repeat_suppressed(data, width=self._width)
 
 
-def hexdump_repeat_suppressed(data: bytes, width: int = 16, group: int = 2) -> str:
-    """Produce hexdump, repeated lines as '*', as in the Unix hexdump tool."""
-    lines = []
-    star = False
+# Maps printable ASCII bytes to themselves and everything else to a dot
+ASCII_TABLE = bytes(
+    b if ASCII_PRINTABLE_MIN <= b <= ASCII_PRINTABLE_MAX else ord(".")
+    for b in range(256)
+)
+
+
+def _end_of_repeats(data: bytes, offset: int, width: int) -> int:
+    """Find where a run of rows equal to the row before ``offset`` ends.
+
+    Compares whole blocks of rows against the same block shifted back by one row,
+    doubling the block size while the rows keep repeating and then halving it.
+    """
+
+    def repeats(start: int, end: int) -> bool:
+        return end <= len(data) and data[start:end] == data[start - width : end - width]
+
+    end = offset + width
+    num_rows = 1
+    while repeats(end, end + num_rows * width):
+        end += num_rows * width
+        num_rows *= 2
+    while num_rows > 1:
+        num_rows //= 2
+        if repeats(end, end + num_rows * width):
+            end += num_rows * width
+    return end
+
+
+def hexdump_line(row: bytes, offset: int, width: int = 16, group: int = 2) -> str:
+    """Format one hexdump row of at most ``width`` bytes starting at ``offset``."""
+    hexstr = row.hex(" ", -group).ljust((width // group) * (group * 2 + 1) - 1)
+    asciistr = row.translate(ASCII_TABLE).decode("ascii")
+    return f"{offset:07x}  {hexstr}  {asciistr}"
+
+
+def iter_hexdump_repeat_suppressed(
+    data: bytes | memoryview,
+    width: int = 16,
+    group: int = 2,
+    max_lines: int | None = None,
+) -> Iterator[str]:
+    """Yield hexdump lines, repeated lines as '*', as in the Unix hexdump tool.
+
+    :param max_lines: stop after this many lines, and yield ``"..."`` if the dump
+                      was truncated
+    """
+    data = bytes(data)
+    num_lines = 0
     last_row = None
-    for offset in range(0, len(data), width):
+    offset = 0
+    while offset < len(data):
+        if num_lines == max_lines:
+            yield "..."
+            return
         row = data[offset : offset + width]
         if row == last_row:
-            if not star:
-                lines.append("*")
-                star = True
+            yield "*"
+            num_lines += 1
+            offset = _end_of_repeats(data, offset, width)
             continue
-        star = False
-        # Hex part
-        hexgroups = [
-            "".join(f"{b:02x}" for b in row[i : i + group])
-            for i in range(0, len(row), group)
-        ]
-        hexstr = " ".join(hexgroups)
-        # Pad hexstr to fixed width
-        n_groups = width // group
-        hexstr = hexstr.ljust(n_groups * (group * 2 + 1) - 1)
-        # ASCII part
-        asciistr = "".join(
-            (chr(b) if ASCII_PRINTABLE_MIN <= b <= ASCII_PRINTABLE_MAX else ".")
-            for b in row
-        )
-        # Line with offset, hex, and ascii
-        lines.append(f"{offset:07x}  {hexstr}  {asciistr}")
+        yield hexdump_line(row, offset, width, group)
+        num_lines += 1
         last_row = row
-    return "\n".join(lines)
+        offset += width
+
+
+def hexdump_repeat_suppressed(
+    data: bytes | memoryview,
+    width: int = 16,
+    group: int = 2,
+    max_lines: int | None = None,
+) -> str:
+    """Produce hexdump, repeated lines as '*', as in the Unix hexdump tool."""
+    return "\n".join(
+        iter_hexdump_repeat_suppressed(data, width, group, max_lines=max_lines)
+    )
 
 
 class HexDumpRepeatSuppress(Adapter):
@@ -77,6 +132,11 @@ class HexDumpRepeatSuppress(Adapter):
         super().__init__(subcon)
         self._width = width
 
+    @property
+    def width(self) -> int:
+        """The number of bytes on each row of the hexdump."""
+        return self._width
+
     def _decode(
         self,
         obj: Any,  # noqa: ANN401
@@ -0,0 +1,156 @@
+"""Lazily decoded arrays of fixed-size records for ``construct``."""
+
+from __future__ import annotations
+
+import io
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, overload
+
+from construct import (
+    Construct,
+    Container,
+    ListContainer,
+    RangeError,
+    Renamed,
+    Struct,
+    Subconstruct,
+)
+from construct.core import evaluate, stream_read
+
+
+class LazyRecords(Sequence):
+    """Records which are decoded only when accessed by index.
+
+    Every record is validated by its struct when it's decoded. Decoded records
+    are kept in a least-recently-used cache of ``cache_size`` records.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        subcon: Construct,
+        data: bytes,
+        stride: int,
+        context: Container,
+        *,
+        path: str,
+        cache_size: int = 0,
+    ) -> None:
+        """Initialize the lazy records with the raw bytes of all records."""
+        self._subcon = subcon
+        self._data = data
+        self._stride = stride
+        self._count = len(data) // stride if stride else 0
+        self._context = context
+        self._path = path
+        self._cache_size = cache_size
+        self._cache: OrderedDict[int, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...  # noqa: ANN401
+
+    @overload
+    def __getitem__(self, index: slice) -> ListContainer: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        """Decode and return the record at ``index``, or a list of sliced records."""
+        if isinstance(index, slice):
+            return ListContainer(self[i] for i in range(*index.indices(self._count)))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            msg = "record index out of range"
+            raise IndexError(msg)
+        if index in self._cache:
+            self._cache.move_to_end(index)
+            return self._cache[index]
+        record = self._decode(index)
+        if self._cache_size:
+            self._cache[index] = record
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def _decode(self, index: int) -> Any:  # noqa: ANN401
+        start = index * self._stride
+        stream = io.BytesIO(self._data[start : start + self._stride])
+        context = Container(self._context)
+        context._index = index  # noqa: SLF001
+        return self._subcon._parsereport(  # noqa: SLF001
+            stream, context, f"{self._path} -> [{index}]"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare all decoded records with another sequence of records."""
+        if not isinstance(other, Sequence) or isinstance(other, str | bytes):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other, strict=True)
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return a short description without decoding any records."""
+        return f"<LazyRecords of {self._count} records, {self._stride} bytes each>"
+
+    def __str__(self) -> str:
+        """Decode all records and format them like a ``ListContainer``."""
+        return str(ListContainer(self))
+
+
+class LazyRecordArray(Subconstruct):
+    """Like ``Array``, but records are decoded only when accessed.
+
+    The subcon must have a fixed size so that record *i* can be found at offset
+    ``i * subcon.sizeof()`` from the start of the array.
+    """
+
+    def __init__(self, count: Any, subcon: Construct, cache_size: int = 0) -> None:  # noqa: ANN401
+        """Initialize the lazy array with an element count and record struct."""
+        super().__init__(subcon)
+        self.count = count
+        self.cache_size = cache_size
+
+    def _parse(self, stream: io.BytesIO, context: Container, path: str) -> LazyRecords:
+        count = evaluate(self.count, context)
+        if count < 0:
+            msg = f"invalid count {count}"
+            raise RangeError(msg, path=path)
+        stride = self.subcon._sizeof(context, path)  # noqa: SLF001
+        data = stream_read(stream, count * stride, path)
+        return LazyRecords(
+            self.subcon, data, stride, context, path=path, cache_size=self.cache_size
+        )
+
+    def _build(
+        self, obj: Sequence, stream: io.BytesIO, context: Container, path: str
+    ) -> ListContainer:
+        count = evaluate(self.count, context)
+        if len(obj) != count:
+            msg = f"expected {count} elements, found {len(obj)}"
+            raise RangeError(msg, path=path)
+        result = ListContainer()
+        for index, element in enumerate(obj):
+            context._index = index  # noqa: SLF001
+            result.append(self.subcon._build(element, stream, context, path))  # noqa: SLF001
+        return result
+
+    def _sizeof(self, context: Container, path: str) -> int:
+        return evaluate(self.count, context) * self.subcon._sizeof(context, path)  # noqa: SLF001
+
+
+def with_lazy_records(struct: Struct, name: str, cache_size: int = 0) -> Struct:
+    """Copy ``struct``, replacing its ``name`` ``Array`` with a ``LazyRecordArray``."""
+    subcons = []
+    for subcon in struct.subcons:
+        if subcon.name == name:
+            array = subcon.subcon
+            lazy = LazyRecordArray(array.count, array.subcon, cache_size=cache_size)
+            subcon = Renamed(lazy, newname=name)  # noqa: PLW2901
+        subcons.append(subcon)
+    return Struct(*subcons)
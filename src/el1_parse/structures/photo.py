@@ -59,7 +59,7 @@ photo = Struct(
             "photo_unknown16" / OneOf(Int32ul, [0, 0x70001000]),
             "photo_unknown17" / Const(0, Int32ul),
             "photo_unknown18"
-            / OneOf(PaddedString(0x208, "utf16"), {"frame000_preview.bmp", ""}),
+            / OneOf(PaddedString(0x208, "utf_16_le"), {"frame000_preview.bmp", ""}),
             "photo_unknown19" / Const(0xA78 * b"\0", Bytes(0xA78)),
             "photo_unknown20" / OneOf(Int32ul, {0, 3}),
             "photo_unknown21" / Const(0xC * b"\0", Bytes(0xC)),
@@ -34,15 +34,15 @@ photo_file = Struct(
         Struct(
             "photo_file_id" / Int32ul,
             "num_extra_paths" / Const(2, Int32ul),
-            "cache_dir_path" / PaddedString(0x208, "utf16"),
-            "cache_filename" / PaddedString(0x208, "utf16"),
-            "origin_dir_path" / PaddedString(0x208, "utf16"),
-            "origin_filename" / PaddedString(0x208, "utf16"),
+            "cache_dir_path" / PaddedString(0x208, "utf_16_le"),
+            "cache_filename" / PaddedString(0x208, "utf_16_le"),
+            "origin_dir_path" / PaddedString(0x208, "utf_16_le"),
+            "origin_filename" / PaddedString(0x208, "utf_16_le"),
             "timestamp" / FileTime,
             "photo_file_unknown1" / Const(0, Int32ul),
             "filesize" / Int32ul,
-            "cache_dir_path2" / PaddedString(0x208, "utf16"),
-            "cache_filename2" / PaddedString(0x208, "utf16"),
+            "cache_dir_path2" / PaddedString(0x208, "utf_16_le"),
+            "cache_filename2" / PaddedString(0x208, "utf_16_le"),
             "photo_file_unknown2" / OneOf(Int32ul, {0, 1}),
             "more_images" / Int32ul,
             Check(lambda ctx: this.more_images == this._index < ctx._.num_photos - 1),  # noqa: SLF001
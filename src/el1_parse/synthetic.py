@@ -0,0 +1,135 @@
+"""Generate large synthetic ``.el1`` files for benchmarks and tests.
+
+A real ``.el1`` file is used as a template. Its first frame, photo and photo file
+records are repeated to the requested counts, and ``Page.dat``, ``Photo.dat`` and
+``PhotoFile.dat`` are rebuilt with the structs in ``el1_parse.structures``. The
+other entries are copied as they are, and the entry table is updated with the
+new offsets and sizes.
+"""
+
+from __future__ import annotations
+
+from itertools import takewhile
+
+from construct import Container, ListContainer, Struct
+
+from el1_parse.structures.el1 import el1, el1_header, entry_structs
+from el1_parse.structures.page import page
+
+
+def _max_frames_per_page() -> int:
+    """Return how many frames fit after the fields of a page in its padded record."""
+    padded = page.subcons[-1].subcon.subcon
+    page_struct = padded.subcon
+    frames = next(sc for sc in page_struct.subcons if sc.name == "frames")
+    page_fields = takewhile(lambda sc: sc is not frames, page_struct.subcons)
+    frames_offset = Struct(*page_fields).sizeof()
+    return (padded.length - frames_offset) // frames.subcon.subcon.sizeof()
+
+
+MAX_FRAMES_PER_PAGE = _max_frames_per_page()
+
+
+def _copy(record: Container, **changes: object) -> Container:
+    """Copy a parsed record without ``construct`` internals like ``_io``."""
+    result = Container(
+        (key, value) for key, value in record.items() if not key.startswith("_")
+    )
+    result.update(changes)
+    return result
+
+
+def _pages(entry: Container, num_pages: int, frames_per_page: int) -> Container:
+    template_page = entry.pages[0]
+    frame = _copy(template_page.frames[0])
+    pages = ListContainer(
+        _copy(
+            template_page,
+            page_num=page_num,
+            page_num_=page_num,
+            num_frames=frames_per_page,
+            frames=ListContainer([frame] * frames_per_page),
+        )
+        for page_num in range(1, num_pages + 1)
+    )
+    return _copy(entry, num_entries=num_pages, num_pages=num_pages, pages=pages)
+
+
+def _photos(entry: Container, num_photos: int) -> Container:
+    photos = ListContainer(
+        _copy(entry.photos[0], photo_id=photo_id, photo_id_repeat=photo_id)
+        for photo_id in range(1, num_photos + 1)
+    )
+    return _copy(
+        entry, num_photos=num_photos, photo_dat_unknown3=num_photos, photos=photos
+    )
+
+
+def _photo_files(entry: Container, num_photos: int) -> Container:
+    template = entry.photo_files[0]
+    photo_files = ListContainer(
+        _copy(
+            template,
+            photo_file_id=photo_id,
+            photo_file_id_repeat=photo_id,
+            cache_filename=f"photo{photo_id}.jpg",
+            cache_filename2=f"photo{photo_id}.jpg",
+            origin_filename=f"photo{photo_id}.jpg",
+            more_images=int(photo_id < num_photos),
+        )
+        for photo_id in range(1, num_photos + 1)
+    )
+    return _copy(
+        entry,
+        num_photos=num_photos,
+        photo_file_dat_unknown3=num_photos,
+        photo_files=photo_files,
+    )
+
+
+def generate_el1(
+    template: bytes,
+    num_pages: int = 1,
+    frames_per_page: int = 2,
+    num_photos: int | None = None,
+) -> bytes:
+    """Build a valid ``.el1`` file with the given numbers of pages and photos.
+
+    :param template: the content of an ``.el1`` file with at least one frame, photo
+                     and photo file
+    :param num_photos: the number of photo and photo file records, by default one
+                       for each frame
+    :raises ValueError: if more frames are requested than fit on a page
+    """
+    if frames_per_page > MAX_FRAMES_PER_PAGE:
+        msg = f"At most {MAX_FRAMES_PER_PAGE} frames fit on a page"
+        raise ValueError(msg)
+    if num_photos is None:
+        num_photos = num_pages * frames_per_page
+    parsed = el1.parse(template)
+    replaced = {
+        "Page.dat": lambda entry: _pages(entry, num_pages, frames_per_page),
+        "Photo.dat": lambda entry: _photos(entry, num_photos),
+        "PhotoFile.dat": lambda entry: _photo_files(entry, num_photos),
+    }
+    table_end = len(el1_header.build(parsed))
+    first_offset = min(metadata.offset for metadata in parsed.entry_table)
+    offset = first_offset
+    entry_table = ListContainer()
+    contents = []
+    for index, (metadata, entry) in enumerate(
+        zip(parsed.entry_table, parsed.entries, strict=True)
+    ):
+        if entry.name in replaced:
+            context = Container(_=Container(_=parsed, _index=index), _index=index)
+            data = entry_structs[entry.name].build(
+                replaced[entry.name](entry.data), **context
+            )
+        else:
+            data = entry.data.data
+        contents.append(data)
+        entry_table.append(_copy(metadata, offset=offset, size=len(data)))
+        offset += len(data)
+    header = el1_header.build(_copy(parsed, entry_table=entry_table))
+    # The area between the entry table and the first entry is kept as it is
+    return b"".join([header, template[table_end:first_offset], *contents])
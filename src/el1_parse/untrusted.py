@@ -0,0 +1,63 @@
+"""Parse ``.el1`` files from untrusted sources, like uploads, with bounded resources.
+
+The counts in a crafted file, like ``num_frames``, can claim far more records than
+the file holds, and ``construct`` would read records until it runs out of data.
+The parsers used here check the size of the file, and each count against a limit
+and against the bytes left in the file, before reading any records, and can stop
+when a time budget runs out. They raise ``LimitExceededError``, which is a
+``construct.ConstructError``, so callers handle it like any invalid file.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from el1_parse.structures.fast_parser import (
+    FastEl1Parser,
+    LimitExceededError,
+    ParseLimits,
+)
+
+if TYPE_CHECKING:
+    from os import PathLike
+
+    from construct import Container
+
+__all__ = [
+    "DEFAULT_LIMITS",
+    "LimitExceededError",
+    "ParseLimits",
+    "limited_parser",
+    "parse_untrusted",
+    "parse_untrusted_file",
+]
+
+DEFAULT_LIMITS = ParseLimits()
+
+
+@cache
+def limited_parser(limits: ParseLimits = DEFAULT_LIMITS) -> FastEl1Parser:
+    """Return a parser which enforces ``limits``, generated once for each limits."""
+    from el1_parse.structures.el1 import el1, el1_header, entry_structs  # noqa: PLC0415
+
+    return FastEl1Parser(el1_header, entry_structs, reference=el1, limits=limits)
+
+
+def parse_untrusted(data: bytes, limits: ParseLimits = DEFAULT_LIMITS) -> Container:
+    """Parse ``.el1`` file contents, with the same result as ``el1.parse()``.
+
+    :raises LimitExceededError: if the file is larger, has larger counts or takes
+                                longer to parse than ``limits`` allow
+    """
+    return limited_parser(limits).parse(data)
+
+
+def parse_untrusted_file(
+    path: str | PathLike[str], limits: ParseLimits = DEFAULT_LIMITS
+) -> Container:
+    """Read and parse an ``.el1`` file, reading at most one byte over the limit."""
+    with Path(path).open("rb") as file:
+        data = file.read(limits.max_size + 1)
+    return parse_untrusted(data, limits)
@@ -0,0 +1,106 @@
+"""Check ``.el1`` files against all constraints without parsing them into objects.
+
+``validate()`` verifies every ``Const``, ``OneOf`` and ``Check`` in the structures,
+and that the entries follow each other without gaps up to the end of the file.
+Use it to screen many files quickly, e.g. with ``el1-parse --check``.
+"""
+
+from __future__ import annotations
+
+import mmap
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from el1_parse.batch import find_el1_files
+from el1_parse.structures.el1 import el1_validator
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+CHUNK_SIZE = 16  # files to send to a worker process at a time
+
+
+class Violation(NamedTuple):
+    """A constraint which an ``.el1`` file doesn't satisfy."""
+
+    path: str  # e.g. "Page.dat -> pages -> [0] -> page_unknown2"
+    offset: int  # the position of the offending value in the file
+    message: str
+
+    def __str__(self) -> str:
+        """Describe the violation on one line."""
+        return f"{self.path} at offset {self.offset:#x}: {self.message}"
+
+
+class _FirstViolationError(Exception):
+    """Stops validation after the first violation."""
+
+
+def format_path(path: tuple[str | int, ...]) -> str:
+    """Format field names and array indices like ``construct`` error paths."""
+    if not path:
+        return "(file)"
+    return " -> ".join(f"[{part}]" if isinstance(part, int) else part for part in path)
+
+
+def validate(
+    buffer: bytes | memoryview | mmap.mmap, *, all_violations: bool = False
+) -> list[Violation]:
+    """Check the contents of an ``.el1`` file without building parse results.
+
+    :param buffer: the whole file, e.g. a memory map
+    :param all_violations: report all violations instead of only the first one
+    :return: the violations found, or an empty list if the file is valid
+    """
+    violations: list[Violation] = []
+
+    def report(path: tuple[str | int, ...], offset: int, message: str) -> None:
+        violations.append(Violation(format_path(path), offset, message))
+        if not all_violations:
+            raise _FirstViolationError
+
+    with suppress(_FirstViolationError):
+        el1_validator.validate(buffer, report)
+    return violations
+
+
+def validate_file(path: str, *, all_violations: bool = False) -> list[Violation]:
+    """Memory-map and check an ``.el1`` file.
+
+    Errors reading the file are reported as a violation at offset 0.
+    """
+    try:
+        with Path(path).open("rb") as file:
+            if not Path(path).stat().st_size:
+                return validate(b"", all_violations=all_violations)
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return validate(mapped, all_violations=all_violations)
+    except OSError as exc:
+        return [Violation(format_path(()), 0, str(exc))]
+
+
+def _validate_all(path: str) -> list[Violation]:
+    return validate_file(path, all_violations=True)
+
+
+def validate_files(
+    paths: Iterable[Path], jobs: int | None = 1, *, all_violations: bool = False
+) -> Iterator[tuple[Path, list[Violation]]]:
+    """Check ``.el1`` files, and those found in directories, in order.
+
+    :param jobs: the number of worker processes, ``None`` for one per CPU
+    :return: each file and its violations
+    """
+    files = list(find_el1_files(paths))
+    function = _validate_all if all_violations else validate_file
+    if jobs == 1:
+        for path in files:
+            yield path, function(str(path))
+        return
+    # Imported here, since it takes long to import ``multiprocessing``
+    from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(function, map(str, files), chunksize=CHUNK_SIZE)
+        yield from zip(files, results, strict=True)
@@ -0,0 +1,193 @@
+"""Verify the cached photo files of ``.el1`` files in their ``.el1.Data`` directories.
+
+Each ``PhotoFile.dat`` record names a cached copy of a photo, as
+``cache_filename`` and ``cache_filename2``, and gives its ``filesize``. The copies
+are looked up in the ``<name>.el1.Data`` directory next to the ``.el1`` file, and
+must exist and have that size. Optionally, their content is hashed.
+
+Files are checked on a thread pool, one ``.el1`` file at a time on each thread,
+since the time goes to waiting for slow storage. With a ``ParseCache``, digests
+are stored by path, size and modification time, and files which haven't changed
+since they were last hashed aren't read again. Rehashing them anyway reports
+those whose content changed although their size and modification time didn't.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from construct import ConstructError
+
+from el1_parse.batch import find_el1_files
+from el1_parse.cache import file_digest
+from el1_parse.el1_file import El1File
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+    from el1_parse.cache import ParseCache
+
+DEFAULT_JOBS = 16
+CACHE_FILENAME_FIELDS = ("cache_filename", "cache_filename2")
+
+
+class PhotoCheck(NamedTuple):
+    """The result of checking one cached photo file."""
+
+    photo_file_id: int
+    path: Path
+    expected_size: int
+    size: int | None
+    digest: str | None
+    problem: str | None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Convert to a dictionary with the path as a string, e.g. for JSON."""
+        return {**self._asdict(), "path": str(self.path)}
+
+
+class AlbumReport(NamedTuple):
+    """The results of checking the photo files of one ``.el1`` file."""
+
+    path: Path
+    checks: list[PhotoCheck]
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Tell whether the ``.el1`` file was read and all photo files are fine."""
+        return self.error is None and all(not check.problem for check in self.checks)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Convert to a dictionary, e.g. for JSON."""
+        return {
+            "path": str(self.path),
+            "ok": self.ok,
+            "error": self.error,
+            "checks": [check.as_dict() for check in self.checks],
+        }
+
+
+def data_directory(el1_path: Path) -> Path:
+    """Return the ``.el1.Data`` directory of an ``.el1`` file."""
+    return el1_path.with_name(el1_path.name + ".Data")
+
+
+def cached_photo_files(el1_path: Path) -> list[tuple[int, Path, int]]:
+    """Return the id, cache path and expected size of each cached photo file.
+
+    If ``cache_filename`` and ``cache_filename2`` are the same, the file is only
+    listed once.
+    """
+    with El1File.open(el1_path) as el1_file:
+        photo_file_dat = el1_file.entry("PhotoFile.dat")
+    directory = data_directory(el1_path)
+    photo_files = []
+    for record in photo_file_dat.photo_files:
+        names = dict.fromkeys(record[field] for field in CACHE_FILENAME_FIELDS)
+        photo_files.extend(
+            (record.photo_file_id, directory / name, record.filesize)
+            for name in names
+            if name
+        )
+    return photo_files
+
+
+class _Digests:
+    """Look up and store digests in a ``ParseCache`` shared by threads."""
+
+    def __init__(self, cache: ParseCache | None, *, rehash: bool) -> None:
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._rehash = rehash
+
+    def digest(self, path: Path, stat: os.stat_result) -> tuple[str, str | None]:
+        """Return the digest of a file, and a problem if its content changed."""
+        stored = None
+        if self._cache is not None:
+            with self._lock:
+                stored = self._cache.stored_digest(path, stat)
+        if stored is not None and not self._rehash:
+            return stored, None
+        digest = file_digest(path)
+        if self._cache is not None and stored != digest:
+            with self._lock:
+                self._cache.store_digest(path, stat, digest)
+        if stored is not None and stored != digest:
+            return digest, "content changed without a change in size or mtime"
+        return digest, None
+
+
+def _check_photo(
+    photo_file_id: int, path: Path, expected_size: int, digests: _Digests | None
+) -> PhotoCheck:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return PhotoCheck(photo_file_id, path, expected_size, None, None, "missing")
+    except OSError as exc:
+        return PhotoCheck(photo_file_id, path, expected_size, None, None, str(exc))
+    if stat.st_size != expected_size:
+        problem = f"size is {stat.st_size} bytes, expected {expected_size}"
+        return PhotoCheck(
+            photo_file_id, path, expected_size, stat.st_size, None, problem
+        )
+    digest = problem = None
+    if digests is not None:
+        try:
+            digest, problem = digests.digest(path, stat)
+        except OSError as exc:
+            problem = str(exc)
+    return PhotoCheck(photo_file_id, path, expected_size, stat.st_size, digest, problem)
+
+
+def verify_album(
+    el1_path: Path,
+    *,
+    content: bool = False,
+    cache: ParseCache | None = None,
+    rehash: bool = False,
+) -> AlbumReport:
+    """Check that the cached photo files of an ``.el1`` file exist with their sizes.
+
+    :param content: also hash the content of each file
+    :param cache: store digests, and reuse them for files which haven't changed
+    :param rehash: hash files even if their digests are stored, and report those
+                   whose content changed although their size and mtime didn't
+    """
+    return _verify_album(el1_path, _Digests(cache, rehash=rehash) if content else None)
+
+
+def _verify_album(el1_path: Path, digests: _Digests | None) -> AlbumReport:
+    try:
+        photo_files = cached_photo_files(el1_path)
+    except (ConstructError, OSError) as exc:
+        return AlbumReport(el1_path, [], f"{type(exc).__name__}: {exc}")
+    checks = [_check_photo(*photo_file, digests) for photo_file in photo_files]
+    return AlbumReport(el1_path, checks)
+
+
+def verify_albums(
+    paths: Iterable[Path],
+    jobs: int = DEFAULT_JOBS,
+    *,
+    content: bool = False,
+    cache: ParseCache | None = None,
+    rehash: bool = False,
+) -> Iterator[AlbumReport]:
+    """Check ``.el1`` files, and those found in directories, on a thread pool.
+
+    Reports are yielded in the order of the files. See ``verify_album()`` for the
+    other parameters.
+
+    :param jobs: the number of threads
+    """
+    digests = _Digests(cache, rehash=rehash) if content else None
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(
+            lambda el1_path: _verify_album(el1_path, digests), find_el1_files(paths)
+        )
@@ -0,0 +1,168 @@
+"""Rewrite single entries of ``.el1`` files without rebuilding the whole file.
+
+Only the modified entry is encoded. If its size doesn't change, the bytes which
+changed are overwritten in place. Otherwise the file is written again with the
+entries after it shifted and their ``offset`` fields in the entry table updated,
+and then atomically replaces the original. All other bytes stay exactly as they
+were, including any non-zero bytes in padding and after string terminators.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from el1_parse.el1_file import ENTRY_METADATA_SIZE, HEADER_SIZE, El1File
+from el1_parse.structures.el1 import entry_structs
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from os import PathLike
+
+PHOTO_FILE_DIRS = ("cache_dir_path", "origin_dir_path", "cache_dir_path2")
+OFFSET_FIELD = 4  # position of ``offset`` in ``entry_metadata``
+SIZE_FIELD = 8  # position of ``size`` in ``entry_metadata``
+UINT32 = struct.Struct("<I")
+COMPARE_BLOCK_SIZE = 64
+
+
+def _pwrite(file_descriptor: int, data: bytes, offset: int) -> None:
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(file_descriptor, data, offset)
+            data = data[written:]
+            offset += written
+    else:
+        os.lseek(file_descriptor, offset, os.SEEK_SET)
+        os.write(file_descriptor, data)
+
+
+def changed_ranges(old: bytes, new: bytes) -> Iterator[tuple[int, int]]:
+    """Yield the ``(start, end)`` of each stretch where equal-size bytes differ."""
+    start = None
+    for block in range(0, len(new), COMPARE_BLOCK_SIZE):
+        end = block + COMPARE_BLOCK_SIZE
+        if start is None and old[block:end] == new[block:end]:
+            continue
+        for position in range(block, min(end, len(new))):
+            if old[position] != new[position]:
+                if start is None:
+                    start = position
+            elif start is not None:
+                yield start, position
+                start = None
+    if start is not None:
+        yield start, len(new)
+
+
+def write_entry(
+    path: str | PathLike[str], name: str, data: bytes, old: bytes | None = None
+) -> None:
+    """Replace the raw bytes of the entry called ``name`` in an ``.el1`` file.
+
+    :param old: the entry encoded before it was modified. If given and ``data`` has
+                the same size, only the bytes where they differ are written.
+    :raises KeyError: if the file has no entry called ``name``
+    """
+    with El1File.open(path) as el1_file:
+        index = el1_file.index(name)
+        entry_table = el1_file.header.entry_table
+    metadata = entry_table[index]
+    if len(data) != metadata.size:
+        _rewrite(Path(path), entry_table, index, data)
+        return
+    ranges = [(0, len(data))] if old is None else list(changed_ranges(old, data))
+    if not ranges:
+        return
+    with Path(path).open("r+b") as file:
+        for start, end in ranges:
+            _pwrite(file.fileno(), data[start:end], metadata.offset + start)
+        os.fsync(file.fileno())
+
+
+def _rewrite(path: Path, entry_table: list, index: int, data: bytes) -> None:
+    """Write the file with one entry resized to a temporary file, then replace it."""
+    metadata = entry_table[index]
+    delta = len(data) - metadata.size
+    table_end = HEADER_SIZE + len(entry_table) * ENTRY_METADATA_SIZE
+    with (
+        path.open("rb") as source,
+        tempfile.NamedTemporaryFile(
+            dir=path.parent, prefix=f".{path.name}.", delete=False
+        ) as output,
+    ):
+        try:
+            with (
+                mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+                memoryview(mapped) as view,
+            ):
+                header = bytearray(view[:table_end])
+                for position, other in enumerate(entry_table):
+                    field = HEADER_SIZE + position * ENTRY_METADATA_SIZE
+                    if position == index:
+                        UINT32.pack_into(header, field + SIZE_FIELD, len(data))
+                    elif other.offset > metadata.offset:
+                        offset = other.offset + delta
+                        UINT32.pack_into(header, field + OFFSET_FIELD, offset)
+                output.write(header)
+                output.write(view[table_end : metadata.offset])
+                output.write(data)
+                output.write(view[metadata.offset + metadata.size :])
+            output.flush()
+            os.fsync(output.fileno())
+            shutil.copymode(path, output.name)
+        except:
+            Path(output.name).unlink()
+            raise
+    Path(output.name).replace(path)
+
+
+def update_entry(
+    path: str | PathLike[str], name: str, update: Callable[[Any], object]
+) -> None:
+    """Parse one entry, let ``update`` modify it in place, and write it back.
+
+    If the size of the entry doesn't change, only the fields whose encoding changed
+    are written. Otherwise the whole entry is encoded with its struct, so any
+    non-zero bytes in its padding are written as zeros.
+
+    :param update: a function which receives the parsed entry, e.g. the
+                   ``Container`` of ``PhotoFile.dat``, and modifies it. If it
+                   returns ``False``, the file isn't written.
+    """
+    with El1File.open(path) as el1_file:
+        entry = el1_file.entry(name)
+        context = el1_file.context(name)
+        old = entry_structs[name].build(entry, **context)
+        if update(entry) is False:
+            return
+        data = entry_structs[name].build(entry, **context)
+    write_entry(path, name, data, old)
+
+
+def retarget_photo_files(
+    path: str | PathLike[str], old_prefix: str, new_prefix: str
+) -> int:
+    """Replace a prefix of the directory paths of photo files in ``PhotoFile.dat``.
+
+    :return: the number of paths which were changed
+    """
+    changed = 0
+
+    def retarget(photo_file_dat: Any) -> bool:  # noqa: ANN401
+        nonlocal changed
+        for photo_file in photo_file_dat.photo_files:
+            for field in PHOTO_FILE_DIRS:
+                if photo_file[field].startswith(old_prefix):
+                    suffix = photo_file[field][len(old_prefix) :]
+                    photo_file[field] = new_prefix + suffix
+                    changed += 1
+        return bool(changed)
+
+    update_entry(path, "PhotoFile.dat", retarget)
+    return changed
@@ -0,0 +1,35 @@
+"""Shared fixtures for the tests."""
+
+from pathlib import Path
+
+import pytest
+from construct import Struct
+
+from el1_parse.el1_file import El1File
+from el1_parse.structures.photo_file import photo_file
+
+SAMPLE = Path(__file__).parent.parent / "samples" / "p1-l001-f1one-f2two.el1"
+
+
+def _timestamp_offset() -> int:
+    """Return the offset of the first ``timestamp`` in ``PhotoFile.dat``."""
+    *header_subcons, records_subcon = photo_file.subcons
+    offset = Struct(*header_subcons).sizeof()
+    for subcon in records_subcon.subcon.subcon.subcons:
+        if subcon.name == "timestamp":
+            return offset
+        offset += subcon.sizeof()
+    msg = "no timestamp field in PhotoFile.dat records"
+    raise AssertionError(msg)
+
+
+@pytest.fixture
+def bad_filetime_el1(tmp_path: Path) -> Path:
+    """Create a copy of a sample whose first photo file timestamp is past 9999."""
+    data = SAMPLE.read_bytes()
+    with El1File(data) as el1_file:
+        entry = el1_file.header.entry_table[el1_file.index("PhotoFile.dat")]
+    position = entry.offset + _timestamp_offset()
+    path = tmp_path / "bad-filetime.el1"
+    path.write_bytes(data[:position] + b"\xff" * 8 + data[position + 8 :])
+    return path
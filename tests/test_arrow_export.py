@@ -0,0 +1,125 @@
+"""Tests for exporting ``.el1`` records to Arrow and Parquet."""
+
+import subprocess
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from el1_parse.structures.el1 import el1
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+arrow_export = pytest.importorskip("el1_parse.arrow_export")
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+def test_file_batches_match_parsed_records() -> None:
+    """Each table has the fields of the parsed records, with keys for each row."""
+    batches = arrow_export.file_batches(7, SAMPLE)
+    parsed = el1.parse(SAMPLE.read_bytes())
+    entries = {entry.name: entry.data for entry in parsed.entries}
+    frames = batches["frames"].to_pylist()
+    photo_file = batches["photo_files"].to_pylist()[0]
+    expected_file = entries["PhotoFile.dat"].photo_files[0]
+
+    assert batches["files"].to_pylist() == [
+        {"file_id": 7, "path": str(SAMPLE), "error": None}
+    ]
+    assert [
+        (frame["file_id"], frame["page_index"], frame["frame_index"])
+        for frame in frames
+    ] == [(7, 0, 0), (7, 0, 1)]
+    assert [frame["width"] for frame in frames] == [
+        frame.width for frame in entries["Page.dat"].pages[0].frames
+    ]
+    assert photo_file["origin_filename"] == expected_file.origin_filename
+    assert photo_file["timestamp"] == expected_file.timestamp.replace(tzinfo=UTC)
+    assert batches["photos"].to_pylist()[1]["width_px"] == (
+        entries["Photo.dat"].photos[1].width_px
+    )
+
+
+def test_unparsable_file(tmp_path: Path) -> None:
+    """A file which fails to parse only gets a row with the error."""
+    path = tmp_path / "broken.el1"
+    path.write_bytes(b"not an el1 file")
+
+    batches = arrow_export.file_batches(0, path)
+
+    assert list(batches) == ["files"]
+    assert batches["files"].column("error")[0].as_py().startswith("StreamError: ")
+
+
+def test_out_of_range_filetime(bad_filetime_el1: Path) -> None:
+    """A timestamp past year 9999 is recorded as the file's error, not exported."""
+    batches = arrow_export.file_batches(0, bad_filetime_el1)
+
+    assert list(batches) == ["files"]
+    assert batches["files"].column("error")[0].as_py() == (
+        "ValidationError: Error in path (parsing) -> photo_files -> [0]"
+        " -> timestamp\n1 record(s) have a FILETIME out of the range of datetime: [0]"
+    )
+
+
+def test_batches_are_bounded() -> None:
+    """Batches have at most ``batch_size`` rows, and contain all records."""
+    batches = list(arrow_export.iter_record_batches([SAMPLES_DIR], batch_size=3))
+    rows: dict[str, int] = {}
+    for table, batch in batches:
+        assert batch.schema == arrow_export.schemas()[table]
+        assert batch.num_rows <= 3  # noqa: PLR2004
+        rows[table] = rows.get(table, 0) + batch.num_rows
+
+    assert rows == {
+        "files": 8,
+        "pages": 11,
+        "frames": 22,
+        "photos": 22,
+        "photo_files": 6,
+    }
+
+
+def test_export_parquet(tmp_path: Path) -> None:
+    """Tables are written to Parquet files with a row group per batch."""
+    rows = arrow_export.export_parquet(
+        [SAMPLES_DIR], tmp_path / "export", batch_size=10
+    )
+    frames = pq.ParquetFile(tmp_path / "export" / "frames.parquet")
+    photo_files = pq.read_table(tmp_path / "export" / "photo_files.parquet")
+
+    assert rows["frames"] == frames.metadata.num_rows == 22  # noqa: PLR2004
+    assert frames.metadata.num_row_groups == 3  # noqa: PLR2004
+    assert photo_files.schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+    assert min(photo_files.column("timestamp").to_pylist()) > datetime(
+        2025, 1, 1, tzinfo=UTC
+    )
+
+
+def test_cli(tmp_path: Path) -> None:
+    """``el1-parse export`` writes the Parquet files and reports the row counts."""
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "from el1_parse.__main__ import main; main()",
+            "export",
+            str(tmp_path),
+            str(SAMPLE),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert result.stderr == "1 files, 1 pages, 2 frames, 2 photos, 2 photo_files\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "files.parquet",
+        "frames.parquet",
+        "pages.parquet",
+        "photo_files.parquet",
+        "photos.parquet",
+    ]
@@ -0,0 +1,91 @@
+"""Tests for parsing many ``.el1`` files in a batch."""
+
+import io
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+from el1_parse.__main__ import main
+from el1_parse.batch import find_el1_files, parse_batch
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLES = sorted(SAMPLES_DIR.glob("*.el1"))
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> Path:
+    """Create a directory tree with two valid ``.el1`` files and a broken one."""
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    shutil.copy(SAMPLES[0], tmp_path / "a" / "first.el1")
+    shutil.copy(SAMPLES[1], tmp_path / "a" / "b" / "second.EL1")
+    (tmp_path / "a" / "b" / "broken.el1").write_bytes(b"not an .el1 file")
+    (tmp_path / "a" / "notes.txt").write_text("not parsed")
+    return tmp_path
+
+
+def test_find_el1_files(corpus: Path) -> None:
+    """Directories are searched recursively, and files are passed through."""
+    result = list(find_el1_files([corpus, SAMPLES[0]]))
+
+    assert result == [
+        corpus / "a" / "first.el1",
+        corpus / "a" / "b" / "broken.el1",
+        corpus / "a" / "b" / "second.EL1",
+        SAMPLES[0],
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_batch(corpus: Path, jobs: int) -> None:
+    """Each file gets a JSON line, and a broken file doesn't stop the batch."""
+    output = io.BytesIO()
+
+    failures = parse_batch([corpus], output, jobs=jobs)
+
+    records = {
+        Path(record["path"]).name: record
+        for record in map(json.loads, output.getvalue().splitlines())
+    }
+    assert failures == 1
+    assert sorted(records) == ["broken.el1", "first.el1", "second.EL1"]
+    assert records["broken.el1"]["ok"] is False
+    assert records["broken.el1"]["error"] == "StreamError"
+    assert records["first.el1"]["ok"] is True
+    entries = records["first.el1"]["result"]["entries"]
+    assert [entry["name"] for entry in entries][3] == "Page.dat"
+    assert entries[3]["data"]["num_pages"] == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_batch_out_of_range_filetime(
+    corpus: Path, bad_filetime_el1: Path, jobs: int
+) -> None:
+    """A timestamp past year 9999 fails only its own file."""
+    output = io.BytesIO()
+
+    failures = parse_batch([corpus / "a", bad_filetime_el1], output, jobs=jobs)
+
+    records = {
+        Path(record["path"]).name: record
+        for record in map(json.loads, output.getvalue().splitlines())
+    }
+    assert failures == 2  # noqa: PLR2004
+    assert records["bad-filetime.el1"]["error"] == "ValidationError"
+    assert records["first.el1"]["ok"] is True
+
+
+def test_main_batch_mode(
+    corpus: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    """The CLI writes JSON lines for directories and exits with an error status."""
+    monkeypatch.setattr(sys, "argv", ["el1-parse", "--jobs", "1", str(corpus)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+
+    assert exit_info.value.code == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["ok"] for line in lines] == [True, False, True]
@@ -0,0 +1,132 @@
+"""Tests for per-offset byte statistics over a corpus."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+byte_stats = pytest.importorskip("el1_parse.byte_stats")
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+FIELDS = {"num_pages": 1, "num_frames": 2, "num_photos": 2, "num_photo_files": 2}
+
+
+def make_entry(count: int, variable: int) -> bytes:
+    """Build entry bytes with a magic, a count field and a record per count."""
+    return (
+        b"MAGIC\0\0\0"
+        + count.to_bytes(4, "little")
+        + bytes([variable, 0, 0, 0])
+        + b"\xee" * (10 * count)
+    )
+
+
+def test_constant_varying_and_candidates() -> None:
+    """Constant bytes, fields equal to known counts and record widths are found."""
+    stats = byte_stats.EntryStats("Test.dat", max_offset=64)
+
+    for count in range(1, 8):
+        fields = {**FIELDS, "num_photos": count}
+        data = make_entry(count, variable=count * 37 % 5)
+        stats.add(data, len(data), fields)
+
+    distinct = stats.distinct()
+    assert (distinct[:8] == 1).all()
+    assert distinct[8] == 7  # noqa: PLR2004
+    assert distinct[9] == 1
+    assert stats.files == 7  # noqa: PLR2004
+    assert stats.coverage[0] == 7  # noqa: PLR2004
+    assert stats.coverage[16 + 10 * 7 - 1 :].sum() == 0
+    candidates = {candidate["offset"]: candidate for candidate in stats.candidates()}
+    assert candidates[8]["equal"] == ["num_photos"]
+    assert candidates[8]["correlation"]["num_photos"] == pytest.approx(1)
+    fits = {fit["field"]: fit for fit in stats.size_fits()}
+    assert fits["num_photos"]["width"] == pytest.approx(10)
+    assert fits["num_photos"]["base"] == pytest.approx(16)
+    assert "num_pages" not in fits  # doesn't vary
+    ranges = stats.ranges()
+    assert ranges[0] == {
+        "start": 0,
+        "end": 8,
+        "constant": True,
+        "value": b"MAGIC\0\0\0".hex(" "),
+    }
+    assert ranges[1] == {"start": 8, "end": 9, "constant": False, "max_distinct": 7}
+    report = stats.report()
+    assert "size = 16 + 10.0 * num_photos" in report
+    assert "uint32 at 0x0008: = num_photos" in report
+    assert "0000000  4d 41 47 49 43 00 00 00 ?7 00 00 00 ?5 00 00 00" in report
+
+
+def test_memory_is_bounded() -> None:
+    """Only the first ``max_offset`` bytes are analyzed, however large the entry."""
+    stats = byte_stats.EntryStats("Big.dat", max_offset=16)
+
+    stats.add(bytes(range(256)) * 4, 1024, FIELDS)
+
+    assert stats.histogram.shape == (16, 256)
+    assert stats.coverage.tolist() == [1] * 16
+
+
+def test_corpus_json_is_valid() -> None:
+    """Statistics of the sample files serialize as strict JSON."""
+    stats = byte_stats.CorpusStats(["Object.dat", "Memo.dat"], max_offset=1024)
+
+    for path in sorted(SAMPLES_DIR.glob("*.el1")):
+        stats.add_file(path)
+
+    result = json.loads(json.dumps(stats.as_dict(), allow_nan=False))
+    assert result["Object.dat"]["files"] == 8  # noqa: PLR2004
+    assert result["Object.dat"]["ranges"][0]["constant"]
+    assert len(result["Memo.dat"]["distinct"]) == 1024  # noqa: PLR2004
+
+
+def test_cli() -> None:
+    """``el1-parse stats`` runs as a subcommand next to the positional paths."""
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "from el1_parse.__main__ import main; main()",
+            "stats",
+            "--entry",
+            "Object.dat",
+            str(SAMPLES_DIR),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert result.stdout.startswith("Object.dat: 8 file(s), sizes 924 (6)")
+    assert "size = 572 + 176.0 * num_frames (r=1.00)" in result.stdout
+
+
+def test_cli_unknown_entry() -> None:
+    """An entry missing from a file is an error for the file, and the run fails."""
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "from el1_parse.__main__ import main; main()",
+            "stats",
+            "--entry",
+            "Object.dat",
+            "--entry",
+            "Nothing.dat",
+            str(SAMPLE),
+        ],
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+
+    assert result.returncode == 1
+    assert result.stdout.startswith("Object.dat: 0 file(s)")
+    assert result.stderr == (
+        f"{SAMPLE}: No entry 'Nothing.dat' in the .el1 file\n"
+        "1 file(s) could not be read\n"
+    )
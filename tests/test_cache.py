@@ -0,0 +1,146 @@
+"""Tests for the persistent parse result cache."""
+
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+from el1_parse import cache as cache_module
+from el1_parse.__main__ import main
+from el1_parse.batch import parse_batch
+from el1_parse.cache import ParseCache
+
+SAMPLES = sorted((Path(__file__).parent.parent / "samples").glob("*.el1"))
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> Path:
+    """Copy two sample files and a broken one into a directory."""
+    directory = tmp_path / "corpus"
+    directory.mkdir()
+    shutil.copy(SAMPLES[0], directory / "first.el1")
+    shutil.copy(SAMPLES[1], directory / "second.el1")
+    (directory / "broken.el1").write_bytes(b"not an .el1 file")
+    return directory
+
+
+def run_batch(corpus: Path, cache: ParseCache, jobs: int = 1) -> list[dict]:
+    """Parse the corpus with the cache and return the JSON records."""
+    output = io.BytesIO()
+    parse_batch([corpus], output, jobs=jobs, cache=cache)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_second_run_hits(corpus: Path, tmp_path: Path, jobs: int) -> None:
+    """Unchanged files, including failing ones, are served from the cache."""
+    with ParseCache(tmp_path / "cache") as cache:
+        first = run_batch(corpus, cache, jobs)
+        assert (cache.hits, cache.misses) == (0, 3)
+
+    with ParseCache(tmp_path / "cache") as cache:
+        second = run_batch(corpus, cache, jobs)
+        assert (cache.hits, cache.misses) == (3, 0)
+
+    assert sorted(second, key=lambda record: record["path"]) == sorted(
+        first, key=lambda record: record["path"]
+    )
+    assert [record["ok"] for record in second] == [False, True, True]
+
+
+def test_changed_content_misses(corpus: Path, tmp_path: Path) -> None:
+    """A file is rehashed when its size or modification time changes."""
+    with ParseCache(tmp_path / "cache") as cache:
+        run_batch(corpus, cache)
+        shutil.copy(SAMPLES[2], corpus / "first.el1")
+        stat = (corpus / "first.el1").stat()
+        os.utime(corpus / "first.el1", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        records = run_batch(corpus, cache)
+
+        assert (cache.hits, cache.misses) == (2, 4)
+        assert records[1]["result"]["entries"][3]["data"]["num_pages"] == 1
+
+
+def test_same_content_shares_result(corpus: Path, tmp_path: Path) -> None:
+    """Copies of a file are only parsed once."""
+    shutil.copy(corpus / "first.el1", corpus / "copy.el1")
+    with ParseCache(tmp_path / "cache") as cache:
+        records = run_batch(corpus, cache)
+
+        assert (cache.hits, cache.misses) == (1, 3)
+        assert records[1]["result"] == records[2]["result"]
+
+
+def test_schema_version_in_key(
+    corpus: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Results stored for other structure definitions aren't used."""
+    with ParseCache(tmp_path / "cache") as cache:
+        run_batch(corpus, cache)
+        monkeypatch.setattr(cache_module, "SCHEMA_VERSION", "changed")
+
+        run_batch(corpus, cache)
+
+        assert cache.hits == 0
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    """The least recently used results are evicted when over the size limit."""
+    with ParseCache(tmp_path / "cache", max_size=25) as cache:
+        cache.put("a", True, b"a" * 10)  # noqa: FBT003
+        cache.put("b", True, b"b" * 10)  # noqa: FBT003
+        assert cache.get("a") == (True, b"a" * 10)
+        cache.put("c", True, b"c" * 10)  # noqa: FBT003
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+
+def test_main_single_file(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """The CLI gives the same output from the cache and reports statistics."""
+    argv = ["el1-parse", "--cache-dir", str(tmp_path), str(SAMPLES[0])]
+    monkeypatch.setattr(sys, "argv", argv)
+    caplog.set_level(logging.INFO)
+
+    main()
+    first = capsys.readouterr().out
+    main()
+    second = capsys.readouterr().out
+
+    assert second == first
+    assert "Page.dat" in first
+    assert [record.getMessage() for record in caplog.records] == [
+        "cache: 0 hits, 1 misses (0% hit rate)",
+        "cache: 1 hits, 0 misses (100% hit rate)",
+    ]
+
+
+def test_main_single_file_cached_failure(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    """A failure cached by a batch run fails a single-file run too."""
+    broken = tmp_path / "broken.el1"
+    broken.write_bytes(b"not an .el1 file")
+    cache_dir = str(tmp_path / "cache")
+    for argv in (
+        ["el1-parse", "--jobs", "1", "--cache-dir", cache_dir, str(broken)],
+        ["el1-parse", "-f", "json", "--cache-dir", cache_dir, str(broken)],
+    ):
+        monkeypatch.setattr(sys, "argv", argv)
+        with pytest.raises(SystemExit) as exit_info:
+            main()
+        assert exit_info.value.code == 1
+
+    assert capsys.readouterr().out.count("StreamError") == 1  # only the batch record
@@ -0,0 +1,124 @@
+"""Tests for comparing ``.el1`` files entry by entry."""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from construct import Container, ListContainer
+
+from el1_parse.diff import (
+    MISSING,
+    FieldChange,
+    ReferenceFile,
+    diff_bytes,
+    diff_fields,
+    diff_files,
+)
+from el1_parse.el1_file import El1File
+from el1_parse.writer import retarget_photo_files, write_entry
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+def test_identical_files() -> None:
+    """A file doesn't differ from itself."""
+    assert diff_files(SAMPLE, SAMPLE) == {}
+
+
+def test_diff_fields() -> None:
+    """Changed leaves are reported with their paths, and private keys are skipped."""
+    old = Container(
+        num=1, _io=object(), items=ListContainer([Container(left=1), Container(left=2)])
+    )
+    new = Container(num=1, _io=object(), items=ListContainer([Container(left=3)]))
+
+    assert list(diff_fields(old, new)) == [
+        FieldChange("items[0].left", 1, 3),
+        FieldChange("items[1]", Container(left=2), MISSING),
+    ]
+
+
+def test_diff_bytes_is_row_aligned() -> None:
+    """Only rows which differ are shown, with equal rows in between as ``*``."""
+    old = bytes(64)
+    new = bytes(16) + b"\x01" + bytes(31) + b"\x02" + bytes(19)
+
+    assert list(diff_bytes(old, new)) == [
+        "*",
+        "-0000010  0000 0000 0000 0000 0000 0000 0000 0000  ................",
+        "+0000010  0100 0000 0000 0000 0000 0000 0000 0000  ................",
+        "*",
+        "-0000030  0000 0000 0000 0000 0000 0000 0000 0000  ................",
+        "+0000030  0200 0000 0000 0000 0000 0000 0000 0000  ................",
+        "+0000040  0000 0000                                ....",
+    ]
+
+
+def test_changed_entries(tmp_path: Path) -> None:
+    """Fields of parsed entries and hexdump rows of unparsed entries are compared."""
+    path = tmp_path / SAMPLE.name
+    shutil.copy(SAMPLE, path)
+    retarget_photo_files(path, "Z:\\", "Y:\\")
+    with El1File.open(path) as el1_file:
+        text = bytearray(el1_file.raw("Text.dat"))
+    text[30] ^= 0xFF
+    write_entry(path, "Text.dat", bytes(text))
+
+    differences = diff_files(SAMPLE, path)
+
+    assert list(differences) == ["Text.dat", "PhotoFile.dat"]
+    assert differences["Text.dat"][0] == "*"
+    assert differences["Text.dat"][1].startswith("-000001c  ")
+    assert differences["Text.dat"][2].startswith("+000001c  ")
+    [change] = differences["PhotoFile.dat"]
+    assert change.startswith("photo_files[0].origin_dir_path: 'Z:\\\\home")
+    assert " -> 'Y:\\\\home" in change
+
+
+def test_reference_entries_are_parsed_once() -> None:
+    """Comparing many files parses each differing entry of the reference once."""
+    others = sorted(SAMPLES_DIR.glob("*.el1"))
+    with ReferenceFile(SAMPLE) as reference:
+        with patch.object(
+            El1File, "entry", autospec=True, side_effect=El1File.entry
+        ) as entry:
+            results = [reference.diff(path) for path in others]
+        reference_calls = [
+            call.args[1]
+            for call in entry.call_args_list
+            if call.args[0] is reference._el1_file  # noqa: SLF001
+        ]
+
+    assert sorted(reference_calls) == sorted(set(reference_calls))
+    assert results[others.index(SAMPLE)] == {}
+    assert all(
+        result for path, result in zip(others, results, strict=True) if path != SAMPLE
+    )
+
+
+def test_cli() -> None:
+    """``el1-parse diff`` compares a reference file against a directory."""
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "from el1_parse.__main__ import main; main()",
+            "diff",
+            "--brief",
+            str(SAMPLE),
+            str(SAMPLES_DIR),
+        ],
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+
+    assert result.returncode == 1
+    lines = result.stdout.splitlines()
+    assert len(lines) == len(list(SAMPLES_DIR.glob("*.el1")))
+    assert f"{SAMPLE}: identical" in lines
+    other = SAMPLES_DIR / "p1-l001-f1one-f2empty.el1"
+    assert any(line.startswith(f"{other}: ElpData.dat, Page.dat") for line in lines)
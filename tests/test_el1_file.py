@@ -0,0 +1,79 @@
+"""Tests for random access to ``.el1`` file entries."""
+
+import io
+import mmap
+from pathlib import Path
+
+import pytest
+
+from el1_parse.el1_file import El1File
+from el1_parse.structures.el1 import el1
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+class CountingReader(io.BytesIO):
+    """In-memory file which counts the bytes read from it."""
+
+    bytes_read = 0
+
+    def read(self, size: int | None = -1) -> bytes:
+        """Read bytes and add their count to ``bytes_read``."""
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+@pytest.mark.parametrize(
+    "el1_file", [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+)
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_entries_match_full_parse(el1_file: str, use_mmap: bool) -> None:  # noqa: FBT001
+    """Every entry read on demand equals the entry from a full parse."""
+    expected = el1.parse(Path(el1_file).read_bytes())
+
+    with El1File.open(el1_file, use_mmap=use_mmap) as reader:
+        assert reader.header.entry_table == expected.entry_table
+        for index, name in enumerate(reader.names):
+            assert reader.entry(name) == expected.entries[index].data
+
+
+def test_reads_only_header_and_requested_entry() -> None:
+    """Reading one entry only reads the header, entry table and that entry."""
+    data = SAMPLE.read_bytes()
+    file = CountingReader(data)
+
+    reader = El1File(file)
+    photo_files = reader.entry("PhotoFile.dat")
+
+    assert photo_files.num_photos == 2  # noqa: PLR2004
+    metadata = reader.header.entry_table[reader.index("PhotoFile.dat")]
+    assert file.bytes_read == 44 + 13 * 272 + metadata.size
+    assert file.bytes_read < len(data) // 10
+
+
+def test_bytes_source() -> None:
+    """An ``El1File`` can read from an in-memory buffer."""
+    data = SAMPLE.read_bytes()
+    expected = el1.parse(data)
+
+    reader = El1File(memoryview(data))
+
+    assert reader.raw("ExpImg.dat") == expected.entries[12].data.data
+
+
+def test_mmap_source() -> None:
+    """An ``El1File`` can read from a caller-provided memory map."""
+    with SAMPLE.open("rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        reader = El1File(mapped)
+        assert reader.entry("Page.dat").num_pages == 1
+        reader.close()
+        mapped.close()
+
+
+def test_unknown_entry() -> None:
+    """Asking for an entry which doesn't exist raises a ``KeyError``."""
+    with El1File.open(SAMPLE) as reader, pytest.raises(KeyError):
+        reader.entry("Missing.dat")
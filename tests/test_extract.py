@@ -0,0 +1,144 @@
+"""Tests for extracting raw ``.dat`` entries to directories and archives."""
+
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from el1_parse.el1_file import El1File
+from el1_parse.extract import extract_to_directory, write_tar, write_zip
+from el1_parse.structures.el1 import el1
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+def expected_entries(path: Path) -> dict[str, bytes]:
+    """Return the raw bytes of each entry from a full parse."""
+    parsed = el1.parse(path.read_bytes())
+    data = path.read_bytes()
+    return {
+        metadata.name: data[metadata.offset : metadata.offset + metadata.size]
+        for metadata in parsed.entry_table
+    }
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_view_and_copy_to(use_mmap: bool, tmp_path: Path) -> None:  # noqa: FBT001
+    """Views and copies of entries equal the raw entry bytes."""
+    expected = expected_entries(SAMPLE)
+
+    with El1File.open(SAMPLE, use_mmap=use_mmap) as el1_file:
+        for name, data in expected.items():
+            with el1_file.view(name) as view:
+                assert view == data
+            buffer = io.BytesIO()
+            el1_file.copy_to(name, buffer)
+            assert buffer.getvalue() == data
+            with (tmp_path / name).open("wb") as output:
+                output.write(b"prefix")
+                el1_file.copy_to(name, output)
+                output.write(b"suffix")
+            assert (tmp_path / name).read_bytes() == b"prefix" + data + b"suffix"
+
+
+def test_view_of_buffer_is_not_a_copy() -> None:
+    """A view into an in-memory buffer shares memory with it."""
+    data = bytearray(SAMPLE.read_bytes())
+    el1_file = El1File(data)
+    offset = el1_file.header.entry_table[0].offset
+
+    with el1_file.view(el1_file.names[0]) as view:
+        data[offset] ^= 0xFF
+        assert view[0] == data[offset]
+
+
+def test_extract_to_directory_subset(tmp_path: Path) -> None:
+    """Only the selected entries are written."""
+    expected = expected_entries(SAMPLE)
+
+    paths = extract_to_directory(SAMPLE, tmp_path, ["Photo.dat", "ExpImg.dat"])
+
+    assert paths == [tmp_path / "Photo.dat", tmp_path / "ExpImg.dat"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "ExpImg.dat",
+        "Photo.dat",
+    ]
+    for path in paths:
+        assert path.read_bytes() == expected[path.name]
+
+
+def test_extract_missing_entry(tmp_path: Path) -> None:
+    """Naming an entry the file doesn't have is an error."""
+    with pytest.raises(KeyError, match=r"Nope\.dat"):
+        extract_to_directory(SAMPLE, tmp_path, ["Nope.dat"])
+
+
+def test_tar_stream() -> None:
+    """All entries of all files are written to a readable tar stream."""
+    samples = sorted(SAMPLES_DIR.glob("*.el1"))
+    output = io.BytesIO()
+
+    write_tar(samples, output)
+
+    assert len(output.getvalue()) % tarfile.RECORDSIZE == 0
+    output.seek(0)
+    with tarfile.open(fileobj=output, mode="r|") as archive:
+        members = {
+            member.name: archive.extractfile(member).read() for member in archive
+        }
+    assert members == {
+        f"{path.stem}/{name}": data
+        for path in samples
+        for name, data in expected_entries(path).items()
+    }
+
+
+def test_zip_stream_subset() -> None:
+    """Selected entries are written to a zip archive."""
+    output = io.BytesIO()
+
+    write_zip([SAMPLE], output, ["PhotoFile.dat"])
+
+    with zipfile.ZipFile(output) as archive:
+        assert archive.namelist() == [f"{SAMPLE.stem}/PhotoFile.dat"]
+        assert (
+            archive.read(f"{SAMPLE.stem}/PhotoFile.dat")
+            == (expected_entries(SAMPLE)["PhotoFile.dat"])
+        )
+
+
+@pytest.mark.parametrize("fmt", ["tar", "zip"])
+def test_cli_archive_to_pipe(fmt: str, tmp_path: Path) -> None:
+    """``--extract --archive`` streams to a non-seekable stdout."""
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "from el1_parse.__main__ import main; main()",
+            "--extract",
+            "--archive",
+            fmt,
+            "--entry",
+            "Page.dat",
+            str(SAMPLE),
+        ],
+        stdout=subprocess.PIPE,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(Path(__file__).parent.parent / "src")},
+    )
+    archive_path = tmp_path / f"out.{fmt}"
+    archive_path.write_bytes(result.stdout)
+    expected = expected_entries(SAMPLE)["Page.dat"]
+    if fmt == "tar":
+        with tarfile.open(archive_path) as archive:
+            assert archive.getnames() == [f"{SAMPLE.stem}/Page.dat"]
+            assert archive.extractfile(archive.getmembers()[0]).read() == expected
+    else:
+        with zipfile.ZipFile(archive_path) as archive:
+            assert archive.read(f"{SAMPLE.stem}/Page.dat") == expected
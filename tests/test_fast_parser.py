@@ -0,0 +1,57 @@
+"""Tests for the code-generated fast ``.el1`` parser."""
+
+from pathlib import Path
+
+import pytest
+from construct import ConstError, ConstructError
+
+from el1_parse.structures.el1 import el1, el1_fast
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+
+
+def find_el1_files() -> list[str]:
+    """Find all ``.el1`` files in the samples directory."""
+    return [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+
+
+@pytest.mark.parametrize("el1_file", find_el1_files())
+def test_fast_parse_matches_reference(el1_file: str) -> None:
+    """The fast parser gives the same result as ``el1.parse()``."""
+    data = Path(el1_file).read_bytes()
+
+    expected = el1.parse(data)
+    result = el1_fast._parse(data)  # noqa: SLF001  # bypass the fallback
+
+    assert result == expected
+    assert str(result) == str(expected)
+
+
+@pytest.mark.parametrize(
+    ("offset", "value", "error"),
+    [
+        (0x00, b"X", ConstError),  # magic
+        (0x28, b"\x0c", ConstError),  # num_entries
+    ],
+)
+def test_fast_parse_reports_reference_error(
+    offset: int, value: bytes, error: type[ConstructError]
+) -> None:
+    """Invalid input raises the same error as ``el1.parse()``."""
+    data = bytearray(Path(find_el1_files()[0]).read_bytes())
+    data[offset : offset + len(value)] = value
+
+    with pytest.raises(error) as reference:
+        el1.parse(bytes(data))
+    with pytest.raises(error) as fast:
+        el1_fast.parse(bytes(data))
+
+    assert str(fast.value) == str(reference.value)
+
+
+def test_fast_parse_rejects_truncated_file() -> None:
+    """A truncated file isn't accepted by the fast path."""
+    data = Path(find_el1_files()[0]).read_bytes()[:-1]
+
+    with pytest.raises(ConstructError):
+        el1_fast.parse(data)
@@ -3,6 +3,7 @@
 from datetime import UTC, datetime
 
 import pytest
+from construct import ValidationError
 
 from el1_parse.structures.filetime_adapter import FileTime
 
@@ -20,6 +21,13 @@ def test_parse():
     assert parsed_dt == datetime(2025, 4, 26, 17, 52, 30, 738557, tzinfo=UTC)
 
 
+@pytest.mark.parametrize("data", [b"\xff" * 8, b"\x00" * 7 + b"\x80"])
+def test_parse_out_of_range(data: bytes) -> None:
+    """FILETIMEs past the range of ``datetime`` are invalid, not a ``ValueError``."""
+    with pytest.raises(ValidationError, match="out of the range of datetime"):
+        FileTime.parse(data)
+
+
 @pytest.mark.parametrize(
     ("dt", "expected"),
     [
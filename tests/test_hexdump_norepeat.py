@@ -0,0 +1,94 @@
+"""Tests for the repeat-suppressing hexdump renderer."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from el1_parse.structures.el1 import el1
+from el1_parse.structures.hexdump_norepeat import (
+    hexdump_repeat_suppressed,
+    iter_hexdump_repeat_suppressed,
+)
+
+SAMPLE = Path(__file__).parent.parent / "samples" / "p1-l001-f1one-f2two.el1"
+
+
+def reference_hexdump(data: bytes, width: int = 16, group: int = 2) -> str:
+    """Render a hexdump one byte at a time, like the original implementation."""
+    lines = []
+    star = False
+    last_row = None
+    for offset in range(0, len(data), width):
+        row = data[offset : offset + width]
+        if row == last_row:
+            if not star:
+                lines.append("*")
+                star = True
+            continue
+        star = False
+        hexgroups = [
+            "".join(f"{b:02x}" for b in row[i : i + group])
+            for i in range(0, len(row), group)
+        ]
+        hexstr = " ".join(hexgroups).ljust((width // group) * (group * 2 + 1) - 1)
+        asciistr = "".join(chr(b) if 0x20 <= b <= 0x7E else "." for b in row)  # noqa: PLR2004
+        lines.append(f"{offset:07x}  {hexstr}  {asciistr}")
+        last_row = row
+    return "\n".join(lines)
+
+
+def test_golden() -> None:
+    """A small dump with a repeated row and a partial last row."""
+    data = b"Hello, world!\x00\x01\xff" + b"\x00" * 48 + b"tail~\x7f"
+
+    result = hexdump_repeat_suppressed(data)
+
+    assert result == (
+        "0000000  4865 6c6c 6f2c 2077 6f72 6c64 2100 01ff  Hello, world!...\n"
+        "0000010  0000 0000 0000 0000 0000 0000 0000 0000  ................\n"
+        "*\n"
+        "0000040  7461 696c 7e7f                           tail~."
+    )
+
+
+@pytest.mark.parametrize("entry_index", [0, 1, 2, 4, 6, 7, 8, 9, 10, 12])
+@pytest.mark.parametrize(("width", "group"), [(16, 2), (32, 2), (37, 4), (293, 1)])
+def test_matches_reference_on_sample_entries(
+    entry_index: int, width: int, group: int
+) -> None:
+    """Unparsed sample entries render byte-for-byte like the original renderer."""
+    data = el1.parse(SAMPLE.read_bytes()).entries[entry_index].data.data
+
+    result = hexdump_repeat_suppressed(data, width=width, group=group)
+
+    assert result == reference_hexdump(data, width=width, group=group)
+
+
+def test_matches_reference_on_random_data() -> None:
+    """Random data with runs of repeated rows renders like the original renderer."""
+    rng = random.Random(1)  # noqa: S311
+    for _ in range(200):
+        data = b"".join(
+            bytes([rng.randrange(256)]) * rng.choice([1, 7, 30, 500, 3000])
+            for _ in range(20)
+        )
+        width = rng.choice([4, 16, 28, 32, 84])
+        group = rng.choice([1, 2, 4])
+        assert hexdump_repeat_suppressed(data, width, group) == reference_hexdump(
+            data, width, group
+        )
+
+
+def test_max_lines() -> None:
+    """The dump can be truncated to a maximum number of lines."""
+    data = bytes(range(64)) + b"\x00" * 64
+
+    lines = list(iter_hexdump_repeat_suppressed(data, max_lines=5))
+
+    assert len(lines) == 6  # noqa: PLR2004
+    assert lines[:4] == reference_hexdump(data).splitlines()[:4]
+    assert lines[-1] == "..."
+    assert list(iter_hexdump_repeat_suppressed(data, max_lines=7)) == (
+        reference_hexdump(data).splitlines()
+    )
@@ -0,0 +1,173 @@
+"""Tests for identifying the format variant of ``.el1`` files."""
+
+import io
+import struct
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from construct import StreamError
+
+from el1_parse import identify
+from el1_parse.structures.el1 import el1
+from el1_parse.structures.fast_parser import LimitExceededError
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+class CountingReader(io.BytesIO):
+    """A file object which counts the bytes read from it."""
+
+    bytes_read = 0
+
+    def read(self, size: int | None = -1) -> bytes:
+        """Read and count bytes."""
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def with_mystery_pointer(data: bytes, name: str, value: int) -> bytes:
+    """Change the ``mystery_pointer`` in the header of an entry."""
+    fingerprint = identify.identify(data)
+    [entry] = [entry for entry in fingerprint.entries if entry.name == name]
+    position = entry.offset + 0x30
+    return data[:position] + struct.pack("<I", value) + data[position + 4 :]
+
+
+@pytest.fixture
+def variants(monkeypatch: pytest.MonkeyPatch) -> dict[str, identify.Variant]:
+    """Register variants in a copy of the registry for the test."""
+    registry = dict(identify.VARIANTS)
+    monkeypatch.setattr(identify, "VARIANTS", registry)
+    return registry
+
+
+def test_identify_reads_only_headers() -> None:
+    """The fingerprint has the header of each entry, from a few KB of the file."""
+    data = SAMPLE.read_bytes()
+    reader = CountingReader(data)
+
+    fingerprint = identify.identify(reader)
+
+    assert reader.bytes_read < 8192  # noqa: PLR2004
+    assert (fingerprint.magic, fingerprint.num_entries) == ("File Catalog Manager", 13)
+    assert fingerprint.entries[3] == identify.EntryFingerprint(
+        name="Page.dat",
+        entry_type=203,
+        offset=39036,
+        size=14252,
+        magic="Data Array Manager",
+        num_records=1,
+        mystery_pointer=13676,
+        software="Canon Easy-LayoutPrint",
+        data_array_type="RS_PAGE",
+    )
+    assert identify.identify(data) == fingerprint
+
+
+@pytest.mark.parametrize("path", sorted(SAMPLES_DIR.glob("*.el1")), ids=str)
+def test_samples_match_the_default_variant(path: Path) -> None:
+    """All samples are identified as the variant the structures parse."""
+    fingerprint = identify.identify_file(path)
+
+    assert identify.match_variant(fingerprint) is identify.DEFAULT_VARIANT
+
+
+def test_default_variant_requires_struct_constants() -> None:
+    """The default variant requires the constants of the structures."""
+    variant = identify.DEFAULT_VARIANT
+
+    assert variant.header["num_entries"] == 13  # noqa: PLR2004
+    assert variant.entries["PhotoFile.dat"]["data_array_type"] == "ADD_PHOTO"
+    assert variant.entries["Photo.dat"]["mystery_pointer"] == 3464  # noqa: PLR2004
+    assert variant.entries["ExpImg.dat"] == {}
+
+
+def test_parse_dispatches_to_matching_variant(
+    variants: dict[str, identify.Variant],
+) -> None:
+    """Files are parsed by the variant their fingerprint matches."""
+    data = SAMPLE.read_bytes()
+    other = with_mystery_pointer(data, "Page.dat", 13680)
+    parsed = []
+    default = identify.DEFAULT_VARIANT
+    identify.register_variant(
+        default._replace(
+            name="wider-pages",
+            entries={
+                **default.entries,
+                "Page.dat": {**default.entries["Page.dat"], "mystery_pointer": 13680},
+            },
+            parse=parsed.append,
+        )
+    )
+
+    result = identify.parse(data)
+    identify.parse(other)
+
+    assert result == el1.parse(data)
+    assert parsed == [other]
+    assert list(variants) == ["easy-layoutprint", "wider-pages"]
+
+
+def test_unknown_variant() -> None:
+    """A file which matches no variant fails before parsing, with the differences."""
+    data = with_mystery_pointer(SAMPLE.read_bytes(), "Photo.dat", 1)
+    fingerprint = identify.identify(data)
+
+    assert identify.match_variant(fingerprint) is None
+    assert identify.closest_variant(fingerprint) == (
+        identify.DEFAULT_VARIANT,
+        ["Photo.dat: mystery_pointer 1, expected 3464"],
+    )
+    with pytest.raises(
+        identify.UnknownVariantError,
+        match=r"differs from easy-layoutprint: Photo.dat: mystery_pointer 1,",
+    ):
+        identify.parse(data)
+
+
+def test_truncated_and_crafted_headers() -> None:
+    """Truncated entry tables and huge entry counts raise construct errors."""
+    data = SAMPLE.read_bytes()
+    huge = data[:0x28] + struct.pack("<I", 1 << 30) + data[0x2C:]
+    truncated = identify.identify(data[:20000])
+
+    with pytest.raises(StreamError):
+        identify.identify(data[:1000])
+    with pytest.raises(LimitExceededError):
+        identify.identify(huge)
+    assert identify.DEFAULT_VARIANT.mismatches(truncated) == [
+        "Page.dat: no Data Array Manager header",
+        "Photo.dat: no Data Array Manager header",
+        "PhotoFile.dat: no Data Array Manager header",
+    ]
+
+
+def test_cli(tmp_path: Path) -> None:
+    """``el1-parse identify`` prints the variant of each file and a summary."""
+    unknown = tmp_path / "unknown.el1"
+    unknown.write_bytes(with_mystery_pointer(SAMPLE.read_bytes(), "Photo.dat", 1))
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "from el1_parse.__main__ import main; main()",
+            "identify",
+            str(SAMPLE),
+            str(unknown),
+        ],
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+
+    assert result.returncode == 1
+    assert result.stdout == (
+        f"{SAMPLE}: easy-layoutprint\n"
+        f"{unknown}: unknown; Photo.dat: mystery_pointer 1, expected 3464\n"
+    )
+    assert result.stderr == "1 easy-layoutprint, 1 unknown\n"
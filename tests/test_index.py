@@ -0,0 +1,167 @@
+"""Tests for the SQLite index of photo files in ``.el1`` files."""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from el1_parse.el1_file import El1File
+from el1_parse.index import IndexUpdate, PhotoIndex
+from el1_parse.writer import retarget_photo_files
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE_NAME = "p1-l001-f1one-f2two.el1"
+CACHE_DIR = "C:\\users\\akaihola\\AppData\\Local\\Canon Easy-PhotoPrint EX\\Cache\\"
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    """Copy the sample ``.el1`` files to a temporary directory."""
+    directory = tmp_path / "archive"
+    directory.mkdir()
+    for path in SAMPLES_DIR.glob("*.el1"):
+        shutil.copy(path, directory)
+    return directory
+
+
+def test_build_and_find(archive: Path, tmp_path: Path) -> None:
+    """Files are indexed with their pages, frames and photo files."""
+    with PhotoIndex(tmp_path / "index.sqlite") as index:
+        assert index.update([archive], jobs=2) == IndexUpdate(added=8)
+        _, [(pages, frames)] = index.execute(
+            "SELECT COUNT(*), SUM(num_frames) FROM pages"
+        )
+        _, [(frame_rows,)] = index.execute("SELECT COUNT(*) FROM frames")
+        matches = index.find(origin_filename="PHOTO2-4TO3.JPG")
+
+    assert (pages, frames, frame_rows) == (11, 22, 22)
+    assert [
+        (Path(match["path"]).name, match["photo_file_id"]) for match in matches
+    ] == [
+        ("p1-l001-f1empty-f2cropped.el1", 1),
+        (SAMPLE_NAME, 2),
+    ]
+    assert {match["origin_dir_path"] for match in matches} == {
+        "C:\\users\\akaihola\\Pictures"
+    }
+    assert {match["filesize"] for match in matches} == {5241}
+
+
+def test_find_criteria(archive: Path, tmp_path: Path) -> None:
+    """Directories match with or without a trailing backslash, and wildcards."""
+    with PhotoIndex(tmp_path / "index.sqlite") as index:
+        index.update([archive], jobs=1)
+        by_cache_dir = index.find(cache_dir=CACHE_DIR + "ELPCache_2\\")
+        by_wildcard = index.find(cache_dir="c:\\users\\*\\elpcache_*")
+        both = index.find(origin_dir="*.el1.Data", cache_filename="photo1-4to3.jpg")
+        none = index.find(cache_filename="photo1_4to3.jpg")
+
+    assert len(by_cache_dir) == 6  # noqa: PLR2004
+    assert by_wildcard == by_cache_dir
+    assert [match["path"] for match in both] == [str(archive.resolve() / SAMPLE_NAME)]
+    assert none == []  # ``_`` isn't a wildcard
+
+
+@pytest.mark.parametrize(
+    "criteria",
+    [
+        {"origin_filename": "photo1-4to3.jpg"},
+        {"origin_dir": "C:\\users\\*"},
+        {"cache_filename": "photo1-4to3.jpg"},
+        {"cache_dir": CACHE_DIR + "ELPCache_2"},
+    ],
+)
+def test_lookups_use_indexes(tmp_path: Path, criteria: dict[str, str]) -> None:
+    """Lookups search indexes instead of scanning all photo files."""
+    with PhotoIndex(tmp_path / "index.sqlite") as index:
+        sql = []
+        index._db.set_trace_callback(sql.append)  # noqa: SLF001
+        index.find(**criteria)
+        [query] = [statement for statement in sql if statement.startswith("SELECT")]
+        _, plan = index.execute(f"EXPLAIN QUERY PLAN {query}")
+
+    steps = [step[3] for step in plan]
+    assert not any(step.startswith("SCAN") for step in steps), steps
+
+
+def test_incremental_update(archive: Path, tmp_path: Path) -> None:
+    """Only changed files are hashed and parsed again, and deleted ones removed."""
+    sample = archive / SAMPLE_NAME
+    with PhotoIndex(tmp_path / "index.sqlite") as index:
+        index.update([archive], jobs=1)
+        stat = sample.stat()
+        os.utime(sample, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        with patch.object(El1File, "entry") as entry:
+            touched = index.update([archive], jobs=1)
+        retarget_photo_files(sample, "Z:\\", "Y:\\")
+        modified = index.update([archive], jobs=1)
+        (archive / "p1-l001-f1one-f2empty.el1").unlink()
+        removed = index.update([archive], jobs=1)
+        retargeted = index.find(origin_dir="Y:\\home\\*")
+
+    assert not entry.called
+    assert touched == IndexUpdate(unchanged=8)
+    assert modified == IndexUpdate(updated=1, unchanged=7)
+    assert removed == IndexUpdate(unchanged=7, removed=1)
+    assert [match["path"] for match in retargeted] == [str(sample.resolve())]
+
+
+def test_unparsable_files_are_not_parsed_again(archive: Path, tmp_path: Path) -> None:
+    """Files which fail to parse are recorded with the error."""
+    (archive / "broken.el1").write_bytes(b"not an el1 file")
+    with PhotoIndex(tmp_path / "index.sqlite") as index:
+        first = index.update([archive], jobs=1)
+        second = index.update([archive], jobs=1)
+        _, [(error,)] = index.execute("SELECT error FROM files WHERE error NOT NULL")
+
+    assert first == IndexUpdate(added=8, failed=1)
+    assert second == IndexUpdate(unchanged=9)
+    assert error.startswith("StreamError: ")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_out_of_range_filetime_is_recorded(
+    archive: Path, tmp_path: Path, bad_filetime_el1: Path, jobs: int
+) -> None:
+    """A timestamp past year 9999 fails only its own file, with the error."""
+    shutil.copy(bad_filetime_el1, archive)
+    with PhotoIndex(tmp_path / "index.sqlite") as index:
+        update = index.update([archive], jobs=jobs)
+        _, [(error,)] = index.execute("SELECT error FROM files WHERE error NOT NULL")
+
+    assert update == IndexUpdate(added=8, failed=1)
+    assert error.startswith("ValidationError: ")
+
+
+def test_cli(archive: Path, tmp_path: Path) -> None:
+    """``el1-parse index`` updates and queries an index."""
+    database = tmp_path / "index.sqlite"
+
+    def el1_parse(*args: str) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(  # noqa: S603
+            [
+                sys.executable,
+                "-c",
+                "from el1_parse.__main__ import main; main()",
+                "index",
+                *args,
+            ],
+            capture_output=True,
+            check=False,
+            text=True,
+        )
+
+    update = el1_parse("update", str(database), str(archive), "--jobs", "1")
+    found = el1_parse("query", str(database), "--origin-dir", "Z:\\home\\*")
+    missing = el1_parse("query", str(database), "--origin-filename", "missing.jpg")
+
+    assert update.stderr == "8 added, 0 updated, 0 unchanged, 0 removed, 0 failed\n"
+    assert found.stdout == (
+        f"{archive.resolve() / SAMPLE_NAME}: 1: Z:\\home\\akaihola\\prg\\el1-parse"
+        "\\samples\\p1-l001-f1one-f2empty.el1.Data\\photo1-4to3.jpg\n"
+    )
+    assert (missing.returncode, missing.stdout) == (1, "")
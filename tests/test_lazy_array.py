@@ -0,0 +1,79 @@
+"""Tests for lazily decoded page, photo and photo file records."""
+
+import struct
+from pathlib import Path
+
+import pytest
+from construct import ValidationError
+
+from el1_parse.el1_file import El1File
+from el1_parse.structures.el1 import el1, el1_lazy, make_lazy_parser
+from el1_parse.structures.lazy_array import LazyRecords
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+THREE_PAGES = (
+    SAMPLES_DIR
+    / "p1-l001-f1empty-f2empty-p2-l021-f1empty-f2empty-f3empty-p3-i006-f1empty.el1"
+)
+PAGE_HEADER_SIZE = 0x23C
+PAGE_SIZE = 0x3570
+
+
+def corrupt_second_page(data: bytes) -> bytes:
+    """Put an invalid ``page_unknown2`` value in the second page record."""
+    parsed = el1.parse(data)
+    page_dat = parsed.entry_table[3]
+    offset = page_dat.offset + PAGE_HEADER_SIZE + PAGE_SIZE + 8
+    return data[:offset] + struct.pack("<i", 7) + data[offset + 4 :]
+
+
+@pytest.mark.parametrize(
+    "el1_file", [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+)
+def test_lazy_parse_matches_eager_parse(el1_file: str) -> None:
+    """Lazily decoded records equal the eagerly parsed ones."""
+    data = Path(el1_file).read_bytes()
+
+    result = el1_lazy.parse(data)
+
+    assert isinstance(result.entries[3].data.pages, LazyRecords)
+    assert isinstance(result.entries[5].data.photos, LazyRecords)
+    assert isinstance(result.entries[11].data.photo_files, LazyRecords)
+    assert result == el1.parse(data)
+
+
+def test_only_accessed_records_are_validated() -> None:
+    """An invalid record only fails when it's accessed."""
+    data = corrupt_second_page(THREE_PAGES.read_bytes())
+    with pytest.raises(ValidationError):
+        el1.parse(data)
+
+    pages = el1_lazy.parse(data).entries[3].data.pages
+
+    assert len(pages) == 3  # noqa: PLR2004
+    assert pages[0].page_num == 1
+    assert pages[-1].page_num == 3  # noqa: PLR2004
+    with pytest.raises(ValidationError):
+        pages[1]
+
+
+def test_cache() -> None:
+    """Decoded records are kept in a bounded cache."""
+    pages = make_lazy_parser(cache_size=1).parse(THREE_PAGES.read_bytes())
+    pages = pages.entries[3].data.pages
+
+    first = pages[0]
+
+    assert pages[0] is first
+    pages[1]
+    assert pages[0] is not first
+    assert pages[0] == first
+
+
+def test_el1_file_lazy_entry() -> None:
+    """``El1File`` can read an entry with lazily decoded records."""
+    with El1File.open(THREE_PAGES) as reader:
+        pages = reader.entry("Page.dat", lazy=True).pages
+
+        assert isinstance(pages, LazyRecords)
+        assert [page.num_frames for page in pages] == [2, 3, 1]
@@ -0,0 +1,116 @@
+"""Tests for the compact layout object model."""
+
+import sys
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+import pytest
+from construct import Const
+
+from el1_parse.model import LAYOUT_ENTRIES, Frame, Layout, Page, Photo, PhotoFile
+from el1_parse.structures.el1 import el1_fast
+from el1_parse.structures.page import page
+from el1_parse.structures.photo import photo
+from el1_parse.structures.photo_file import photo_file
+from el1_parse.synthetic import generate_el1
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+def deep_size(obj: object, seen: set[int]) -> int:
+    """Return the size of an object and everything it refers to, counting once."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, list | tuple):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif is_dataclass(obj):
+        size += sum(deep_size(getattr(obj, f.name), seen) for f in fields(obj))
+    return size
+
+
+def record_struct(entry_struct: object, array: str) -> object:
+    """Return the struct of the records in an entry struct's array."""
+    subcon = next(s for s in entry_struct.subcons if s.name == array).subcon
+    while not hasattr(subcon, "subcons"):
+        subcon = subcon.subcon
+    return subcon
+
+
+@pytest.mark.parametrize(
+    "el1_file", [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+)
+def test_fields_match_parsed(el1_file: str) -> None:
+    """Kept fields have the parsed values, and ``load()`` equals a full parse."""
+    parsed = el1_fast.parse(Path(el1_file).read_bytes())
+    entries = {entry.name: entry.data for entry in parsed.entries}
+
+    layout = Layout.from_parsed(parsed)
+
+    assert layout == Layout.load(el1_file)
+    assert len(layout.pages) == entries["Page.dat"].num_entries
+    for page_, parsed_page in zip(layout.pages, entries["Page.dat"].pages, strict=True):
+        assert page_.page_num == parsed_page.page_num
+        assert len(page_.frames) == parsed_page.num_frames
+        for frame, parsed_frame in zip(page_.frames, parsed_page.frames, strict=True):
+            for field in fields(Frame):
+                assert getattr(frame, field.name) == parsed_frame[field.name]
+    for records, name, array, cls in [
+        (layout.photos, "Photo.dat", "photos", Photo),
+        (layout.photo_files, "PhotoFile.dat", "photo_files", PhotoFile),
+    ]:
+        parsed_records = entries[name][array]
+        assert len(records) == len(parsed_records)
+        for record, parsed_record in zip(records, parsed_records, strict=True):
+            for field in fields(cls):
+                assert getattr(record, field.name) == parsed_record[field.name]
+
+
+PAGE_RECORD = record_struct(page, "pages")
+
+
+@pytest.mark.parametrize(
+    ("record", "cls", "derived"),
+    [
+        (PAGE_RECORD, Page, {"num_frames"}),
+        (record_struct(PAGE_RECORD, "frames"), Frame, set()),
+        (record_struct(photo, "photos"), Photo, {"photo_id_repeat"}),
+        (record_struct(photo_file, "photo_files"), PhotoFile, {"photo_file_id_repeat"}),
+    ],
+)
+def test_only_checked_fields_are_dropped(
+    record: object, cls: type, derived: set[str]
+) -> None:
+    """Every dropped field is constant, a count or checked to repeat another."""
+    kept = {field.name for field in fields(cls)}
+    for subcon in record.subcons:
+        if subcon.name and subcon.name not in kept:
+            assert isinstance(subcon.subcon, Const) or subcon.name in derived
+
+
+def test_slots_and_interning() -> None:
+    """Instances have no ``__dict__``, and repeated values are shared."""
+    data = generate_el1(SAMPLE.read_bytes(), num_pages=2, frames_per_page=3)
+
+    layout = Layout.from_parsed(el1_fast.parse(data))
+
+    first, second = layout.pages[0].frames[:2]
+    assert not hasattr(first, "__dict__")
+    assert first.left is second.left
+    assert layout.photo_files[0].cache_dir_path is layout.photo_files[1].cache_dir_path
+    assert layout.photo_files[0].timestamp is layout.photo_files[1].timestamp
+
+
+def test_memory_footprint() -> None:
+    """A layout takes an order of magnitude less memory than its parsed entries."""
+    data = generate_el1(SAMPLE.read_bytes(), num_pages=10, frames_per_page=8)
+    parsed = el1_fast.parse(data)
+    entries = [entry.data for entry in parsed.entries if entry.name in LAYOUT_ENTRIES]
+
+    layout = Layout.from_parsed(parsed)
+
+    assert deep_size(entries, set()) > 10 * deep_size(layout, set())
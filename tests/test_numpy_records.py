@@ -0,0 +1,145 @@
+"""Tests for decoding records into NumPy structured arrays."""
+
+from __future__ import annotations
+
+import datetime as dt
+import struct
+from pathlib import Path
+
+import pytest
+from construct import CheckError, ConstError, ValidationError
+
+from el1_parse.el1_file import El1File
+from el1_parse.structures.el1 import el1
+from el1_parse.structures.photo_file import photo_file
+
+np = pytest.importorskip("numpy")
+numpy_records = pytest.importorskip("el1_parse.numpy_records")
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+THREE_PAGES = (
+    SAMPLES_DIR
+    / "p1-l001-f1empty-f2empty-p2-l021-f1empty-f2empty-f3empty-p3-i006-f1empty.el1"
+)
+HEADER_SIZE = 0x23C
+PAGE_SIZE = 0x3570
+PAGE_HEADER_SIZE = 20
+FRAME_SIZE = 92
+PHOTO_SIZE = 3468
+PHOTO_FILE_STRUCT = photo_file.subcons[-1].subcon.subcon
+
+
+def patch(data: bytes, entry_index: int, offset: int, fmt: str, value: int) -> bytes:
+    """Overwrite a value at an offset inside an entry."""
+    position = el1.parse(data).entry_table[entry_index].offset + offset
+    size = struct.calcsize(fmt)
+    return data[:position] + struct.pack(fmt, value) + data[position + size :]
+
+
+def assert_numbers_equal(records: np.ndarray, parsed: list) -> None:
+    """Assert that numeric columns equal the fields parsed with ``construct``."""
+    for name, (dtype, *_) in records.dtype.fields.items():
+        if dtype.kind in "iu" and name != "timestamp":
+            assert records[name].tolist() == [record[name] for record in parsed], name
+
+
+@pytest.mark.parametrize(
+    "el1_file", [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+)
+def test_matches_construct(el1_file: str) -> None:
+    """Decoded columns equal the records parsed with ``construct``."""
+    parsed = el1.parse(Path(el1_file).read_bytes())
+    pages = parsed.entries[3].data.pages
+    photos = parsed.entries[5].data.photos
+    photo_files = parsed.entries[11].data.photo_files
+
+    with El1File.open(el1_file) as reader:
+        frame_records = numpy_records.read_frames(reader)
+        photo_records = numpy_records.read_records(reader, "Photo.dat")
+        photo_file_records = numpy_records.read_records(reader, "PhotoFile.dat")
+
+    assert frame_records.pages["num_frames"].tolist() == [
+        page.num_frames for page in pages
+    ]
+    assert frame_records.page_index.tolist() == [
+        page_index for page_index, page in enumerate(pages) for _ in page.frames
+    ]
+    assert_numbers_equal(frame_records.pages, pages)
+    assert_numbers_equal(
+        frame_records.frames, [frame for page in pages for frame in page.frames]
+    )
+    assert_numbers_equal(photo_records, photos)
+    assert_numbers_equal(photo_file_records, photo_files)
+    assert numpy_records.decode_field(
+        PHOTO_FILE_STRUCT, photo_file_records, "origin_filename"
+    ).tolist() == [record.origin_filename for record in photo_files]
+    assert numpy_records.filetime_to_datetime64(
+        photo_file_records["timestamp"]
+    ).tolist() == [record.timestamp.replace(tzinfo=None) for record in photo_files]
+
+
+def test_filetime_out_of_range() -> None:
+    """Ticks past the range of ``datetime`` are rejected, not wrapped around."""
+    ticks = np.array([0, 2**64 - 1, 2**63, 0], dtype="<u8")
+
+    with pytest.raises(ValidationError) as exc_info:
+        numpy_records.filetime_to_datetime64(
+            ticks, path="(parsing) -> photo_files -> [{}] -> timestamp".format
+        )
+
+    assert exc_info.value.path == "(parsing) -> photo_files -> [1] -> timestamp"
+    assert "2 record(s) have a FILETIME out of the range of datetime: [1, 2]" in str(
+        exc_info.value
+    )
+    assert numpy_records.filetime_to_datetime64(ticks[[0]]).tolist() == [
+        dt.datetime(1601, 1, 1)  # noqa: DTZ001
+    ]
+
+
+def test_record_dtype_mirrors_struct() -> None:
+    """The dtype has the size and field offsets of the struct."""
+    dtype = numpy_records.record_dtype(PHOTO_FILE_STRUCT)
+
+    assert dtype.itemsize == PHOTO_FILE_STRUCT.sizeof()
+    assert dtype.fields["cache_dir_path"][:2] == (np.dtype("V520"), 8)
+    assert dtype.fields["timestamp"][0] == np.dtype("<u8")
+
+
+def test_oneof_violation_reports_frame() -> None:
+    """An invalid frame value is reported with its page and frame index."""
+    second_frame = PAGE_SIZE + PAGE_HEADER_SIZE + FRAME_SIZE
+    data = patch(THREE_PAGES.read_bytes(), 3, HEADER_SIZE + second_frame, "<I", 7)
+
+    with (
+        El1File(data) as reader,
+        pytest.raises(ValidationError, match="1 record") as exc_info,
+    ):
+        numpy_records.read_frames(reader)
+
+    assert exc_info.value.path == (
+        "(parsing) -> pages -> [1] -> frames -> [1] -> page_frame_unknown1"
+    )
+
+
+def test_const_violation_reports_page() -> None:
+    """An invalid page value is reported with the page index."""
+    data = patch(THREE_PAGES.read_bytes(), 3, HEADER_SIZE + 2 * PAGE_SIZE + 8, "<i", 7)
+
+    with El1File(data) as reader, pytest.raises(ValidationError) as exc_info:
+        numpy_records.read_frames(reader)
+
+    assert exc_info.value.path == "(parsing) -> pages -> [2] -> page_unknown2"
+
+
+def test_photo_violations() -> None:
+    """``Const`` and ``Check`` violations in photos are reported."""
+    data = THREE_PAGES.read_bytes()
+    const_data = patch(data, 5, HEADER_SIZE + 28, "<I", 5)
+    check_data = patch(data, 5, HEADER_SIZE + PHOTO_SIZE - 4, "<I", 99)
+
+    with El1File(const_data) as reader, pytest.raises(ConstError) as exc_info:
+        numpy_records.read_records(reader, "Photo.dat")
+    assert exc_info.value.path == "(parsing) -> photos -> [0] -> photo_unknown3"
+    with El1File(check_data) as reader, pytest.raises(CheckError) as exc_info:
+        numpy_records.read_records(reader, "Photo.dat")
+    assert exc_info.value.path == "(parsing) -> photos -> [0]"
@@ -0,0 +1,85 @@
+"""Tests for profiling the parsing of ``.el1`` files."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from construct import ConstructError
+
+from el1_parse.profiling import ParseProfile
+from el1_parse.structures.el1 import el1_fast
+from el1_parse.synthetic import generate_el1
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+def test_results_are_not_changed() -> None:
+    """The instrumented parser gives the same results as ``el1_fast``."""
+    profile = ParseProfile()
+
+    for path in sorted(SAMPLES_DIR.glob("*.el1")):
+        data = path.read_bytes()
+        assert profile.parse(data) == el1_fast.parse(data)
+
+
+def test_normal_parser_is_not_instrumented() -> None:
+    """Only the profiling parser runs instrumentation code."""
+    assert el1_fast.stats is None
+    assert "clock()" not in el1_fast.source
+
+
+def test_counts_calls_and_bytes() -> None:
+    """Calls and bytes are counted for entries and nested fields."""
+    data = generate_el1(SAMPLE.read_bytes(), num_pages=3, frames_per_page=5)
+    profile = ParseProfile()
+
+    profile.parse(data)
+    profile.parse(data)
+
+    stats = {field.path: field for field in profile.stats()}
+    assert profile.files == 2  # noqa: PLR2004
+    assert stats["Page.dat",].calls == 2  # noqa: PLR2004
+    assert stats["Page.dat", "pages"].calls == 2  # noqa: PLR2004
+    assert stats["Page.dat", "pages", "frames"].calls == 6  # noqa: PLR2004
+    assert stats["PhotoFile.dat", "photo_files", "cache_filename"].calls == 30  # noqa: PLR2004
+    assert stats["PhotoFile.dat", "photo_files", "cache_filename"].bytes == (30 * 0x208)
+    assert sum(stats[name,].bytes for name in el1_fast.entry_structs) == 2 * (
+        len(data) - el1_fast.parse(data).entry_table[0].offset
+    )
+    assert stats["header", "entry_table", "name"].calls == 26  # noqa: PLR2004
+    seconds = [field.seconds for field in profile.stats()]
+    assert seconds == sorted(seconds, reverse=True)
+    assert all(field.seconds <= profile.seconds for field in profile.stats())
+
+
+def test_report_and_dump() -> None:
+    """The totals are rendered as a table and as JSON."""
+    profile = ParseProfile()
+    profile.parse_file(SAMPLE)
+    output = io.StringIO()
+
+    profile.dump(output)
+    report = profile.report(limit=3)
+
+    dumped = json.loads(output.getvalue())
+    assert dumped["files"] == 1
+    assert dumped["fields"][0]["path"] == list(profile.stats()[0].path)
+    assert {"calls", "seconds", "bytes"} <= dumped["fields"][0].keys()
+    assert report.startswith("1 file(s) parsed in ")
+    assert len(report.splitlines()) == 5  # noqa: PLR2004
+    assert profile.stats()[0].name in report.splitlines()[2]
+
+
+def test_reference_parser_fallback() -> None:
+    """Files which need the reference parser are counted separately."""
+    data = bytearray(SAMPLE.read_bytes())
+    data[0] = ord("X")  # break the magic so that the fast path gives up
+    profile = ParseProfile()
+
+    with pytest.raises(ConstructError, match="parsing expected"):
+        profile.parse(bytes(data))
+
+    assert profile.files == 1
+    assert [field.path for field in profile.stats()] == [("(reference parser)",)]
@@ -0,0 +1,121 @@
+"""Tests for rendering ``.el1`` files as HTML fragments."""
+
+import struct
+from html.parser import HTMLParser
+from pathlib import Path
+
+import pytest
+
+from el1_parse.render_html import HtmlRenderer, iter_html
+from el1_parse.untrusted import LimitExceededError, ParseLimits
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+PAGE_DAT_OFFSET = 39036
+NUM_ENTRIES = 0x28  # offset of the record count in entries with arrays
+STRUCTURED = ["Page.dat", "Photo.dat", "PhotoFile.dat"]
+
+
+class TagCounter(HTMLParser):
+    """Check that tags are balanced, and collect the classes of details elements."""
+
+    def __init__(self) -> None:
+        """Start with no open tags."""
+        super().__init__()
+        self.open_tags: list[str] = []
+        self.details: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        """Push the tag, and record the class of a details element."""
+        self.open_tags.append(tag)
+        if tag == "details":
+            self.details.append(dict(attrs)["class"] or "")
+
+    def handle_endtag(self, tag: str) -> None:
+        """Check that the tag closes the innermost open tag."""
+        assert self.open_tags.pop() == tag
+
+
+def parse_fragment(fragment: str) -> TagCounter:
+    """Parse an HTML fragment and check that it's balanced."""
+    counter = TagCounter()
+    counter.feed(fragment)
+    counter.close()
+    assert counter.open_tags == []
+    return counter
+
+
+@pytest.mark.parametrize(
+    "el1_file", [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+)
+def test_one_fragment_per_entry(el1_file: str) -> None:
+    """The header and each entry are balanced fragments, in entry table order."""
+    renderer = HtmlRenderer(memoryview(Path(el1_file).read_bytes()))
+    header, *entries = renderer
+
+    assert parse_fragment(header).details == []
+    assert [parse_fragment(entry).details for entry in entries] == [
+        ["entry" if name in STRUCTURED else "entry hexdump"]
+        for name in renderer.el1_file.names
+    ]
+
+
+def test_hexdumps_on_demand() -> None:
+    """Unparsed entries are rendered empty, and their hexdumps separately."""
+    renderer = HtmlRenderer(SAMPLE.read_bytes())
+
+    assert renderer.entry("Text.dat") == (
+        '<details class="entry hexdump" data-entry="Text.dat">'
+        "<summary>Text.dat (572 bytes)</summary></details>"
+    )
+    hexdump = renderer.hexdump("Text.dat")
+    assert hexdump.startswith("<pre>0000000  4461 7461 2041 7272 6179")
+    assert "Data Array Manager" in hexdump
+
+
+def test_values_are_escaped() -> None:
+    """Parsed values are escaped inside the ``<pre>`` element."""
+    fragment = HtmlRenderer(SAMPLE.read_bytes()).entry("Page.dat")
+
+    assert "u&#x27;Data Array Manager&#x27;" in fragment
+    parse_fragment(fragment)
+
+
+def test_entry_errors_are_rendered() -> None:
+    """An entry over the limits is rendered as an error, and others still render."""
+    data = bytearray(SAMPLE.read_bytes())
+    struct.pack_into("<I", data, PAGE_DAT_OFFSET + NUM_ENTRIES, 100_000)
+
+    fragments = list(iter_html(bytes(data)))
+
+    assert fragments[4].startswith('<details class="entry error" open>')
+    assert "LimitExceededError" in fragments[4]
+    assert fragments[6].startswith('<details class="entry" open>')
+
+
+def test_unexpected_entry_errors_are_rendered(
+    bad_filetime_el1: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Any exception from parsing an entry is rendered as its error."""
+    fragments = list(iter_html(bad_filetime_el1.read_bytes()))
+    renderer = HtmlRenderer(SAMPLE.read_bytes())
+
+    def fail(*_args: object) -> None:
+        msg = "year 60056 is out of range"
+        raise ValueError(msg)
+
+    monkeypatch.setattr(renderer.parser, "parse_entry", fail)
+    page = renderer.entry("Page.dat")
+
+    assert len(fragments) == 14  # noqa: PLR2004
+    assert fragments[12].startswith('<details class="entry error" open>')
+    assert "ValidationError" in fragments[12]
+    assert fragments[13].startswith('<details class="entry hexdump"')
+    assert page.startswith('<details class="entry error" open>')
+    assert "ValueError: year 60056 is out of range" in page
+
+
+def test_file_size_limit() -> None:
+    """Files over the size limit aren't rendered at all."""
+    with pytest.raises(LimitExceededError, match="more than the limit of 1000"):
+        HtmlRenderer(SAMPLE.read_bytes(), ParseLimits(max_size=1000))
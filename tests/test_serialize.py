@@ -0,0 +1,80 @@
+"""Tests for serializing parsed ``.el1`` files."""
+
+import base64
+import io
+import json
+from pathlib import Path
+
+import pytest
+from construct import Container
+
+from el1_parse.serialize import dump, iter_json, iter_msgpack, iter_record, to_builtins
+from el1_parse.structures.el1 import el1
+
+SAMPLE = Path(__file__).parent.parent / "samples" / "p1-l001-f1one-f2two.el1"
+
+
+@pytest.fixture(scope="module")
+def parsed() -> Container:
+    """Parse a sample file with two photos."""
+    return el1.parse(SAMPLE.read_bytes())
+
+
+def test_to_builtins(parsed: Container) -> None:
+    """Parsed structures become JSON-compatible plain objects."""
+    result = to_builtins(parsed)
+
+    assert "_io" not in result
+    assert result["entries"][0]["name"] == "ElpData.dat"
+    assert base64.b64decode(result["entries"][0]["data"]) == (
+        parsed.entries[0].data.data
+    )
+    photo_file = result["entries"][11]["data"]["photo_files"][0]
+    assert photo_file["timestamp"] == "2025-04-26T17:52:30.738557+00:00"
+    assert photo_file["cache_filename"] == "photo1-4to3.jpg"
+
+
+def test_iter_json_matches_json_dumps(parsed: Container) -> None:
+    """Streamed JSON is identical to dumping the whole converted structure."""
+    assert "".join(iter_json(parsed)) == json.dumps(to_builtins(parsed))
+
+
+def test_iter_json_unparsed_references(parsed: Container) -> None:
+    """Unparsed entries can be given as offset and size references."""
+    result = json.loads("".join(iter_json(parsed, unparsed="ref")))
+
+    assert result["entries"][0] == {
+        "name": "ElpData.dat",
+        "data": {"offset": 5756, "size": 1096},
+    }
+    assert result["entries"][3]["data"]["num_pages"] == 1
+
+
+def test_iter_msgpack_matches_packb(parsed: Container) -> None:
+    """Streamed MessagePack is identical to packing the whole structure."""
+    msgpack = pytest.importorskip("msgpack")
+
+    result = b"".join(iter_msgpack(parsed))
+
+    assert result == msgpack.packb(to_builtins(parsed, binary=True))
+    unpacked = msgpack.unpackb(result)
+    assert unpacked["entries"][0]["data"] == parsed.entries[0].data.data
+
+
+def test_iter_record(parsed: Container) -> None:
+    """Batch records wrap the parsed file as ``result``."""
+    line = b"".join(iter_record({"path": "a.el1", "ok": True}, parsed))
+
+    assert line.endswith(b"\n")
+    record = json.loads(line)
+    assert record["path"] == "a.el1"
+    assert record["result"] == to_builtins(parsed)
+
+
+def test_dump_text(parsed: Container) -> None:
+    """Text output is the ``construct`` string representation."""
+    stream = io.BytesIO()
+
+    dump(parsed, stream, "text")
+
+    assert stream.getvalue().decode() == f"{parsed}\n"
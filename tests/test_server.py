@@ -0,0 +1,166 @@
+"""Tests for the local parse service."""
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from el1_parse.batch import serialize_bytes
+from el1_parse.server import ParseClient, ParseService, ServiceError, make_server
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+def serve(
+    service: ParseService, unix_socket: Path | None = None
+) -> Iterator[ParseClient]:
+    """Run a server for the service in a thread, and yield a client for it."""
+    server = make_server(service, unix_socket=unix_socket)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    address = unix_socket or server.server_address[:2]
+    try:
+        with ParseClient(address) as client:
+            yield client
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@pytest.fixture
+def service() -> Iterator[ParseService]:
+    """Create a service which parses in a thread."""
+    with ParseService(jobs=1) as service:
+        yield service
+
+
+@pytest.fixture
+def client(service: ParseService) -> Iterator[ParseClient]:
+    """Run the service on a free localhost port and connect to it."""
+    yield from serve(service)
+
+
+def test_parse_bytes_and_paths(client: ParseClient) -> None:
+    """Results are the same as when parsing on the command line, and cached."""
+    data = SAMPLE.read_bytes()
+    expected = serialize_bytes(data, "json", "ref")[1]
+
+    assert client.parse_bytes(data, unparsed="ref") == expected
+    assert client.parse_path(SAMPLE, unparsed="ref") == expected
+    assert client.parse_path(SAMPLE, "msgpack") == serialize_bytes(data, "msgpack")[1]
+    stats = client.stats()
+    assert (stats["requests"], stats["hits"], stats["parses"]) == (3, 1, 2)
+    assert stats["latency_ms"]["max"] >= stats["latency_ms"]["p50"] > 0
+
+
+def test_errors(client: ParseClient, tmp_path: Path) -> None:
+    """Unparsable files, unreadable paths and bad parameters give HTTP errors."""
+    with pytest.raises(ServiceError) as invalid:
+        client.parse_bytes(b"not an el1 file")
+    with pytest.raises(ServiceError) as missing:
+        client.parse_path(tmp_path / "missing.el1")
+    with pytest.raises(ServiceError) as unsupported:
+        client.parse_bytes(b"", "text")
+
+    assert (invalid.value.status, invalid.value.error["error"]) == (
+        422,
+        "StreamError",
+    )
+    assert (missing.value.status, missing.value.error["error"]) == (
+        404,
+        "FileNotFoundError",
+    )
+    assert unsupported.value.status == 400  # noqa: PLR2004
+    assert client.stats()["failures"] == 1
+
+
+def test_unexpected_errors(
+    client: ParseClient, bad_filetime_el1: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Errors raised while parsing are replied to, not dropped with the connection."""
+    with pytest.raises(ServiceError) as bad_filetime:
+        client.parse_path(bad_filetime_el1)
+
+    def missing_msgpack(*_args: bytes | str) -> tuple[bool, bytes]:
+        msg = "No module named 'msgpack'"
+        raise ImportError(msg)
+
+    monkeypatch.setattr("el1_parse.server.serialize_bytes", missing_msgpack)
+    with pytest.raises(ServiceError) as no_msgpack:
+        client.parse_bytes(SAMPLE.read_bytes(), "msgpack")
+
+    assert (bad_filetime.value.status, bad_filetime.value.error["error"]) == (
+        422,
+        "ValidationError",
+    )
+    assert (no_msgpack.value.status, no_msgpack.value.error["error"]) == (
+        500,
+        "ImportError",
+    )
+    assert client.stats()["failures"] == 2  # noqa: PLR2004
+
+
+def test_unix_socket(service: ParseService, tmp_path: Path) -> None:
+    """The service can listen on a Unix socket."""
+    for client in serve(service, unix_socket=tmp_path / "el1-parse.sock"):
+        result = json.loads(client.parse_path(SAMPLE))
+
+    assert [entry["name"] for entry in result["entries"]][:2] == [
+        "ElpData.dat",
+        "CurrentBase.dat",
+    ]
+
+
+def test_concurrent_requests_are_coalesced(service: ParseService) -> None:
+    """Requests for content which is being parsed wait for the same parse."""
+    data = SAMPLE.read_bytes()
+    release = threading.Event()
+
+    def slow_serialize(*args: bytes | str) -> tuple[bool, bytes]:
+        release.wait()
+        return serialize_bytes(*args)
+
+    results = []
+    with patch("el1_parse.server.serialize_bytes", slow_serialize):
+        threads = [
+            threading.Thread(target=lambda: results.append(service.parse(data)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while service.coalesced < len(threads) - 1:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    assert results == [serialize_bytes(data)] * len(threads)
+    assert service.parses == 1
+
+
+def test_least_recently_used_results_are_evicted() -> None:
+    """Results are evicted in LRU order to keep their total size in the limit."""
+    samples = sorted(SAMPLES_DIR.glob("*.el1"))[:3]
+    data = [path.read_bytes() for path in samples]
+    sizes = [len(serialize_bytes(contents, "json", "ref")[1]) for contents in data]
+    with ParseService(jobs=1, cache_size=sizes[0] + max(sizes[1:])) as service:
+        for contents in [data[0], data[1], data[0], data[2]]:
+            service.parse(contents, unparsed="ref")
+        service.parse(data[0], unparsed="ref")
+        service.parse(data[1], unparsed="ref")
+
+    assert service.parses == 4  # noqa: PLR2004
+    assert service.stats()["cached_results"] == 2  # noqa: PLR2004
+
+
+def test_worker_processes() -> None:
+    """Parsing in worker processes gives the same results."""
+    data = SAMPLE.read_bytes()
+    with ParseService(jobs=2) as service:
+        assert service.parse(data, "msgpack") == serialize_bytes(data, "msgpack")
@@ -0,0 +1,64 @@
+"""Tests for importing only what the selected command line mode needs."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SAMPLE = Path(__file__).parent.parent / "samples" / "p1-l001-f1one-f2two.el1"
+PARSERS = ("el1", "el1_fast", "el1_validator", "el1_lazy", "el1_dat_extract")
+SLOW_MODULES = ("multiprocessing", "sqlite3", "zipfile")
+
+# Runs ``main()`` in a fresh interpreter and reports what it imported and built
+SCRIPT = """
+import contextlib, io, json, sys
+from el1_parse.__main__ import main
+with contextlib.redirect_stdout(io.TextIOWrapper(io.BytesIO())):
+    main(sys.argv[1:])
+el1 = sys.modules["el1_parse.structures.el1"]
+print(json.dumps({
+    "modules": sorted(sys.modules),
+    "built": [name for name in %r if name in vars(el1)],
+}))
+"""
+
+
+def run_main(*args: str) -> dict[str, list[str]]:
+    """Run ``el1-parse`` with ``args`` in a new process and return the report."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", SCRIPT % (PARSERS,), *args],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.parametrize(
+    ("args", "built"),
+    [
+        (["--extract", "--archive", "tar"], []),
+        (["--entry", "PhotoFile.dat"], ["el1", "el1_fast"]),
+        (["--check"], ["el1_validator"]),
+        (["--format", "json"], ["el1", "el1_fast"]),
+    ],
+)
+def test_only_needed_parsers_are_built(args: list[str], built: list[str]) -> None:
+    """Each mode builds only the parsers it uses and skips slow imports."""
+    report = run_main(*args, str(SAMPLE))
+
+    assert report["built"] == built
+    for module in SLOW_MODULES:
+        assert module not in report["modules"]
+
+
+def test_parsers_are_built_once() -> None:
+    """Accessing a parser builds it, and later accesses return the same object."""
+    from el1_parse.structures import el1  # noqa: PLC0415
+
+    assert el1.el1_fast is el1.el1_fast
+    assert el1.el1_fast.reference is el1.el1
+    with pytest.raises(AttributeError):
+        el1.el1_nonexistent  # noqa: B018
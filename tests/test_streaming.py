@@ -0,0 +1,113 @@
+"""Tests for parsing ``.el1`` files incrementally from streams."""
+
+import asyncio
+import io
+import struct
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from construct import StreamError
+
+from el1_parse.el1_file import ENTRY_METADATA_SIZE, HEADER_SIZE, El1File
+from el1_parse.streaming import (
+    EntryOrderError,
+    StreamingParser,
+    aiter_entries,
+    iter_entries,
+)
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+OFFSET_FIELD = 4  # offset of ``offset`` in each entry table row
+
+
+def expected_entries(path: Path) -> list[tuple[str, Any]]:
+    """Parse each entry with random access, and return the names and results."""
+    with El1File.open(path) as el1_file:
+        return [(name, el1_file.entry(name)) for name in el1_file.names]
+
+
+@pytest.mark.parametrize(
+    "el1_file", [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+)
+def test_same_entries_as_random_access(el1_file: str) -> None:
+    """Entries parsed from a stream equal those parsed from the file."""
+    with Path(el1_file).open("rb") as file:
+        entries = list(iter_entries(file, chunk_size=4096))
+
+    assert [entry.index for entry in entries] == list(range(len(entries)))
+    assert [(entry.name, entry.data) for entry in entries] == expected_entries(
+        Path(el1_file)
+    )
+
+
+def test_entries_are_emitted_as_they_arrive() -> None:
+    """Each entry is returned by the chunk which completes it, one byte at a time."""
+    data = SAMPLE.read_bytes()
+    parser = StreamingParser()
+    completed_at = {}
+    max_buffered = 0
+    for offset in range(len(data)):
+        for entry in parser.feed(data[offset : offset + 1]):
+            completed_at[entry.name] = offset + 1
+        max_buffered = max(max_buffered, len(parser._buffer))  # noqa: SLF001
+    parser.close()
+
+    assert completed_at == {
+        metadata.name: metadata.offset + metadata.size
+        for metadata in parser.header.entry_table
+    }
+    assert max_buffered < max(m.size for m in parser.header.entry_table)
+
+
+def test_only_named_entries() -> None:
+    """Other entries are skipped without parsing or buffering them."""
+    parser = StreamingParser(names={"Page.dat", "PhotoFile.dat"})
+    entries = parser.feed(SAMPLE.read_bytes())
+    parser.close()
+
+    assert [entry.name for entry in entries] == ["Page.dat", "PhotoFile.dat"]
+    assert parser._buffer == b""  # noqa: SLF001
+
+
+def test_async_stream() -> None:
+    """Entries are parsed from an async iterable of chunks."""
+    data = SAMPLE.read_bytes()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for offset in range(0, len(data), 10_000):
+            await asyncio.sleep(0)
+            yield data[offset : offset + 10_000]
+
+    async def collect() -> list[tuple[str, Any]]:
+        return [(entry.name, entry.data) async for entry in aiter_entries(chunks())]
+
+    assert asyncio.run(collect()) == expected_entries(SAMPLE)
+
+
+def test_offsets_going_backwards() -> None:
+    """An entry starting inside the previous one is an error once the table is read."""
+    data = bytearray(SAMPLE.read_bytes())
+    second_row = HEADER_SIZE + ENTRY_METADATA_SIZE + OFFSET_FIELD
+    first_offset = struct.unpack_from("<I", data, second_row - ENTRY_METADATA_SIZE)[0]
+    struct.pack_into("<I", data, second_row, first_offset)
+    parser = StreamingParser()
+
+    with pytest.raises(
+        EntryOrderError, match=r"CurrentBase\.dat starts at offset 5756"
+    ):
+        parser.feed(bytes(data[:5000]))
+
+
+def test_truncated_stream() -> None:
+    """A stream which ends inside an entry is an error."""
+    with pytest.raises(StreamError, match=r"before the end of ExpImg\.dat"):
+        list(iter_entries(io.BytesIO(SAMPLE.read_bytes()[:-1])))
+
+
+def test_trailing_bytes() -> None:
+    """Bytes after the last entry are an error, like with ``el1.parse()``."""
+    with pytest.raises(StreamError, match="after the last entry"):
+        list(iter_entries(io.BytesIO(SAMPLE.read_bytes() + b"\0")))
@@ -0,0 +1,52 @@
+"""Tests for generating synthetic ``.el1`` files."""
+
+from itertools import pairwise
+from pathlib import Path
+
+import pytest
+
+from el1_parse.el1_file import El1File
+from el1_parse.structures.el1 import el1, el1_fast
+from el1_parse.synthetic import MAX_FRAMES_PER_PAGE, generate_el1
+
+TEMPLATE = (
+    Path(__file__).parent.parent / "samples" / "p1-l001-f1one-f2two.el1"
+).read_bytes()
+
+
+@pytest.mark.parametrize(
+    ("num_pages", "frames_per_page", "num_photos"),
+    [(1, 1, None), (3, 4, None), (5, 2, 7), (2, MAX_FRAMES_PER_PAGE, 1)],
+)
+def test_generate_el1(
+    num_pages: int, frames_per_page: int, num_photos: int | None
+) -> None:
+    """Generated files parse with the requested counts and gapless entries."""
+    data = generate_el1(TEMPLATE, num_pages, frames_per_page, num_photos)
+
+    parsed = el1.parse(data)
+
+    expected_photos = num_photos or num_pages * frames_per_page
+    pages = parsed.entries[3].data.pages
+    assert [page.page_num for page in pages] == list(range(1, num_pages + 1))
+    assert {page.num_frames for page in pages} == {frames_per_page}
+    assert len(parsed.entries[5].data.photos) == expected_photos
+    photo_files = parsed.entries[11].data.photo_files
+    assert len(photo_files) == expected_photos
+    assert photo_files[-1].cache_filename == f"photo{expected_photos}.jpg"
+    assert [photo_file.more_images for photo_file in photo_files][-2:] == (
+        [1, 0] if expected_photos > 1 else [0]
+    )
+    table = parsed.entry_table
+    for metadata, following in pairwise(table):
+        assert metadata.offset + metadata.size == following.offset
+    assert table[-1].offset + table[-1].size == len(data)
+    assert el1_fast.parse(data) == parsed
+    with El1File(data) as reader:
+        assert reader.entry("Photo.dat").num_photos == expected_photos
+
+
+def test_too_many_frames() -> None:
+    """Pages are padded to a fixed size, which limits the number of frames."""
+    with pytest.raises(ValueError, match="frames fit on a page"):
+        generate_el1(TEMPLATE, 1, MAX_FRAMES_PER_PAGE + 1)
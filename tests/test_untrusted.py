@@ -0,0 +1,146 @@
+"""Tests for parsing untrusted ``.el1`` files with resource limits."""
+
+import re
+import struct
+import time
+from pathlib import Path
+
+import pytest
+from construct import ConstructError
+
+from el1_parse.el1_file import El1File
+from el1_parse.structures.el1 import el1
+from el1_parse.synthetic import generate_el1
+from el1_parse.untrusted import (
+    LimitExceededError,
+    ParseLimits,
+    limited_parser,
+    parse_untrusted,
+    parse_untrusted_file,
+)
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+PAGE_DAT_OFFSET = 39036
+PHOTO_FILE_DAT_OFFSET = 69340
+HEADER_SIZE = 0x23C
+NUM_ENTRIES = 0x28  # offset of the record count in entries with arrays
+NUM_FRAMES = 16  # offset of ``num_frames`` in a page
+
+
+def patch(data: bytes, offset: int, fmt: str, value: int) -> bytes:
+    """Overwrite a value at an absolute offset."""
+    size = struct.calcsize(fmt)
+    return data[:offset] + struct.pack(fmt, value) + data[offset + size :]
+
+
+@pytest.mark.parametrize(
+    "el1_file", [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+)
+def test_samples_parse_as_usual(el1_file: str) -> None:
+    """Files within the limits parse like with ``el1.parse()``."""
+    data = Path(el1_file).read_bytes()
+
+    assert parse_untrusted(data) == el1.parse(data)
+
+
+@pytest.mark.parametrize(
+    ("offset", "count", "message"),
+    [
+        (
+            PAGE_DAT_OFFSET + NUM_ENTRIES,
+            0xFFFFFFFF,
+            "Page.dat/pages: 4294967295 records is more than the limit of 100000",
+        ),
+        (
+            PAGE_DAT_OFFSET + NUM_ENTRIES,
+            2000,
+            (
+                "Page.dat/pages: 2000 records of 13680 bytes don't fit in the"
+                " remaining 176496 bytes"
+            ),
+        ),
+        (
+            PAGE_DAT_OFFSET + HEADER_SIZE + NUM_FRAMES,
+            50000,
+            "Page.dat/pages/frames: 50000 records of 92 bytes don't fit",
+        ),
+    ],
+)
+def test_counts_are_checked_before_reading(
+    offset: int, count: int, message: str
+) -> None:
+    """Counts over the limit or larger than the rest of the file fail at once."""
+    data = patch(SAMPLE.read_bytes(), offset, "<I", count)
+
+    with pytest.raises(LimitExceededError, match=re.escape(message)):
+        parse_untrusted(data)
+
+
+def test_checked_counts_are_still_validated() -> None:
+    """A count with an unmet ``Check`` gets the reference parser's error."""
+    data = patch(SAMPLE.read_bytes(), PHOTO_FILE_DAT_OFFSET + NUM_ENTRIES, "<I", 10**9)
+    with pytest.raises(ConstructError) as expected:
+        el1.parse(data)
+
+    with pytest.raises(ConstructError) as exc_info:
+        parse_untrusted(data)
+
+    assert not isinstance(exc_info.value, LimitExceededError)
+    assert str(exc_info.value) == str(expected.value)
+
+
+def test_out_of_range_filetime(bad_filetime_el1: Path) -> None:
+    """A timestamp past year 9999 raises a ``ConstructError``, not a ``ValueError``."""
+    with pytest.raises(ConstructError, match="out of the range of datetime"):
+        parse_untrusted_file(bad_filetime_el1)
+    with pytest.raises(ConstructError, match="out of the range of datetime"):
+        parse_untrusted(bad_filetime_el1.read_bytes())
+
+
+def test_max_size() -> None:
+    """Files over the size limit aren't parsed, and only the limit is read."""
+    limits = ParseLimits(max_size=1000)
+
+    with pytest.raises(LimitExceededError, match="the file is 1001 bytes"):
+        parse_untrusted_file(SAMPLE, limits)
+
+
+def test_max_records() -> None:
+    """Arrays longer than ``max_records`` fail."""
+    data = generate_el1(SAMPLE.read_bytes(), num_pages=1, frames_per_page=20)
+
+    with pytest.raises(LimitExceededError, match="frames: 20 records"):
+        parse_untrusted(data, ParseLimits(max_records=19))
+
+
+def test_timeout() -> None:
+    """Parsing stops when the time budget runs out."""
+    data = generate_el1(SAMPLE.read_bytes(), num_pages=20, frames_per_page=20)
+    limits = ParseLimits(timeout=1e-6)
+
+    start = time.perf_counter()
+    with pytest.raises(LimitExceededError, match="took over 1e-06 seconds"):
+        parse_untrusted(data, limits)
+
+    assert time.perf_counter() - start < 1
+    assert parse_untrusted(data, ParseLimits(timeout=60)) == el1.parse(data)
+
+
+def test_timeout_of_single_entry() -> None:
+    """The time budget also applies when parsing a single entry."""
+    data = generate_el1(SAMPLE.read_bytes(), num_pages=20, frames_per_page=20)
+    el1_file = El1File(data)
+    parser = limited_parser(ParseLimits(timeout=1e-6))
+
+    with pytest.raises(LimitExceededError, match="took over 1e-06 seconds"):
+        parser.parse_entry(
+            "Page.dat", el1_file.raw("Page.dat"), el1_file.context("Page.dat")
+        )
+
+
+def test_parsers_are_generated_once() -> None:
+    """The parser for the same limits is reused."""
+    assert limited_parser(ParseLimits(max_records=7)) is limited_parser(
+        ParseLimits(max_records=7)
+    )
@@ -0,0 +1,171 @@
+"""Tests for checking ``.el1`` files without parsing them into objects."""
+
+import json
+import random
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+from construct import ConstructError
+
+import el1_parse
+from el1_parse.__main__ import main
+from el1_parse.structures.el1 import el1
+from el1_parse.validation import Violation, validate, validate_file
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+PAGE_DAT_OFFSET = 39036
+PHOTO_DAT_OFFSET = 54212
+HEADER_SIZE = 0x23C
+ENTRY_TABLE_OFFSET = 44
+ENTRY_METADATA_SIZE = 272
+
+
+def patch(data: bytes, offset: int, fmt: str, value: int) -> bytes:
+    """Overwrite a value at an absolute offset."""
+    size = struct.calcsize(fmt)
+    return data[:offset] + struct.pack(fmt, value) + data[offset + size :]
+
+
+@pytest.mark.parametrize(
+    "el1_file", [str(path) for path in sorted(SAMPLES_DIR.glob("*.el1"))]
+)
+def test_samples_are_valid(el1_file: str) -> None:
+    """All sample files satisfy all constraints."""
+    assert validate_file(el1_file) == []
+
+
+def test_package_level_function() -> None:
+    """``validate()`` is available from the package."""
+    assert el1_parse.validate is validate
+
+
+def test_first_violation() -> None:
+    """The path and offset of the first violation are reported."""
+    offset = PAGE_DAT_OFFSET + HEADER_SIZE + 8
+    data = patch(SAMPLE.read_bytes(), offset, "<i", 7)
+
+    result = validate(data)
+
+    assert result == [
+        Violation(
+            "Page.dat -> pages -> [0] -> page_unknown2",
+            offset,
+            "object failed validation: 7",
+        )
+    ]
+    with pytest.raises(ConstructError):
+        el1.parse(data)
+
+
+def test_all_violations() -> None:
+    """All violations can be collected, including failed ``Check`` expressions."""
+    data = SAMPLE.read_bytes()
+    data = patch(data, 0, "<B", 0)
+    data = patch(data, PAGE_DAT_OFFSET + HEADER_SIZE + 8, "<i", 7)
+    second_photo_end = PHOTO_DAT_OFFSET + HEADER_SIZE + 2 * 3468
+    data = patch(data, second_photo_end - 4, "<I", 99)
+
+    result = validate(data, all_violations=True)
+
+    assert [(violation.path, violation.offset) for violation in result] == [
+        ("magic", 0),
+        ("Page.dat -> pages -> [0] -> page_unknown2", PAGE_DAT_OFFSET + 580),
+        ("Photo.dat -> photos -> [1]", second_photo_end),
+    ]
+    assert result[2].message == "check failed during parsing"
+
+
+def test_gap_between_entries() -> None:
+    """Entries must follow each other without gaps."""
+    offset = ENTRY_TABLE_OFFSET + 4 * ENTRY_METADATA_SIZE + 4
+    data = patch(SAMPLE.read_bytes(), offset, "<I", 53290)
+
+    result = validate(data, all_violations=True)
+
+    assert str(result[0]) == (
+        "entry_table -> [4] -> offset at offset 0x470:"
+        " entry starts at 53290, not right after the previous entry at 53288"
+    )
+
+
+def test_truncated_and_trailing_data() -> None:
+    """Truncated entries and data after the last entry are reported."""
+    data = SAMPLE.read_bytes()
+
+    truncated = validate(data[: PAGE_DAT_OFFSET + 100], all_violations=True)
+    trailing = validate(data + b"\0")
+
+    assert truncated[0].path == "entry_table -> [3] -> size"
+    assert len(truncated) == 10  # noqa: PLR2004
+    assert trailing == [
+        Violation("end", len(data), "expected end of file, got 1 bytes")
+    ]
+
+
+def test_unreadable_entry_uses_construct_error() -> None:
+    """If an entry can't be read, the ``construct`` error is reported."""
+    num_entries_offset = PAGE_DAT_OFFSET + 40
+    data = patch(SAMPLE.read_bytes(), num_entries_offset, "<I", 1000)
+
+    *_, violation = validate(data, all_violations=True)
+
+    assert violation.path == "Page.dat"
+    assert violation.offset == PAGE_DAT_OFFSET
+    assert "stream read less than specified amount" in violation.message
+
+
+def test_agrees_with_parser_on_random_corruption() -> None:
+    """A file passes the check if and only if ``el1.parse()`` accepts it."""
+    original = SAMPLE.read_bytes()
+    rng = random.Random(3)  # noqa: S311
+    table_end = ENTRY_TABLE_OFFSET + 13 * ENTRY_METADATA_SIZE
+    for _ in range(300):
+        offset = rng.randrange(table_end, len(original))
+        data = patch(original, offset, "<B", rng.randrange(256))
+        try:
+            el1.parse(data)
+        except (ConstructError, UnicodeDecodeError):
+            assert validate(data), offset
+        else:
+            assert validate(data) == [], offset
+
+
+def test_out_of_range_filetime(
+    bad_filetime_el1: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A timestamp ``el1.parse()`` can't convert fails the check too."""
+    data = bad_filetime_el1.read_bytes()
+    monkeypatch.setattr(sys, "argv", ["el1-parse", "--check", str(bad_filetime_el1)])
+
+    [violation] = validate(data)
+
+    assert violation.path == "PhotoFile.dat -> photo_files -> [0] -> timestamp"
+    assert violation.message == (
+        "FILETIME 18446744073709551615 is out of the range of datetime"
+    )
+    with pytest.raises(ConstructError):
+        el1.parse(data)
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 1
+
+
+def test_main_check(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    """``--check`` prints a result for each file and fails if any are invalid."""
+    broken = tmp_path / "broken.el1"
+    broken.write_bytes(SAMPLE.read_bytes()[:1000])
+    argv = ["el1-parse", "--check", "--format", "json", str(SAMPLE), str(broken)]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+
+    assert exit_info.value.code == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["ok"] for record in records] == [True, False]
+    assert records[1]["violations"][0]["path"] == "(file)"
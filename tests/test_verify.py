@@ -0,0 +1,130 @@
+"""Tests for verifying the cached photo files of ``.el1`` files."""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from el1_parse.cache import ParseCache, file_digest
+from el1_parse.verify import data_directory, verify_album, verify_albums
+
+SAMPLES_DIR = Path(__file__).parent.parent / "samples"
+SAMPLE = SAMPLES_DIR / "p1-l001-f1one-f2two.el1"
+
+
+def copy_sample(tmp_path: Path) -> Path:
+    """Copy the sample file with its data directory to ``tmp_path``."""
+    path = tmp_path / SAMPLE.name
+    shutil.copy(SAMPLE, path)
+    shutil.copytree(data_directory(SAMPLE), data_directory(path))
+    return path
+
+
+def test_samples_are_ok() -> None:
+    """All cached photos of the samples exist with the recorded sizes."""
+    reports = list(verify_albums([SAMPLES_DIR], jobs=4))
+
+    assert [report.path for report in reports] == sorted(SAMPLES_DIR.glob("*.el1"))
+    assert all(report.ok for report in reports)
+    report = reports[[r.path for r in reports].index(SAMPLE)]
+    assert [(check.path.name, check.size) for check in report.checks] == [
+        ("photo1-4to3.jpg", 2161),
+        ("photo2-4to3.jpg", 5241),
+    ]
+
+
+def test_missing_and_truncated(tmp_path: Path) -> None:
+    """Missing files and files of the wrong size are reported."""
+    path = copy_sample(tmp_path)
+    (data_directory(path) / "photo1-4to3.jpg").unlink()
+    with (data_directory(path) / "photo2-4to3.jpg").open("r+b") as photo:
+        photo.truncate(100)
+
+    report = verify_album(path)
+
+    assert not report.ok
+    assert [check.problem for check in report.checks] == [
+        "missing",
+        "size is 100 bytes, expected 5241",
+    ]
+
+
+def test_unreadable_el1_file(tmp_path: Path) -> None:
+    """An ``.el1`` file which can't be parsed is reported as an error."""
+    path = tmp_path / "broken.el1"
+    path.write_bytes(b"not an el1 file")
+
+    report = verify_album(path)
+
+    assert not report.ok
+    assert report.error
+
+
+def test_out_of_range_filetime(tmp_path: Path, bad_filetime_el1: Path) -> None:
+    """A timestamp past year 9999 fails only its own album."""
+    reports = list(verify_albums([bad_filetime_el1, copy_sample(tmp_path)], jobs=2))
+
+    assert [report.ok for report in reports] == [False, True]
+    assert reports[0].error.startswith("ValidationError: ")
+
+
+def test_stored_digests_are_reused(tmp_path: Path) -> None:
+    """Unchanged files aren't hashed again when digests are cached."""
+    path = copy_sample(tmp_path)
+    with ParseCache(tmp_path / "cache") as cache:
+        first = verify_album(path, content=True, cache=cache)
+        with patch("el1_parse.verify.file_digest") as digest:
+            second = verify_album(path, content=True, cache=cache)
+
+    assert not digest.called
+    assert [check.digest for check in first.checks] == [
+        file_digest(check.path) for check in first.checks
+    ]
+    assert second == first
+
+
+def test_rehash_finds_silent_changes(tmp_path: Path) -> None:
+    """Rehashing reports content which changed without a change in size or mtime."""
+    path = copy_sample(tmp_path)
+    photo = data_directory(path) / "photo2-4to3.jpg"
+    with ParseCache(tmp_path / "cache") as cache:
+        verify_album(path, content=True, cache=cache)
+        stat = photo.stat()
+        data = bytearray(photo.read_bytes())
+        data[-1] ^= 0xFF
+        photo.write_bytes(data)
+        os.utime(photo, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        unnoticed = verify_album(path, content=True, cache=cache)
+        rehashed = verify_album(path, content=True, cache=cache, rehash=True)
+
+    assert unnoticed.ok
+    assert [check.problem for check in rehashed.checks] == [
+        None,
+        "content changed without a change in size or mtime",
+    ]
+
+
+def test_cli(tmp_path: Path) -> None:
+    """``el1-parse verify`` lists problems and exits with an error status."""
+    path = copy_sample(tmp_path)
+    (data_directory(path) / "photo1-4to3.jpg").unlink()
+
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "from el1_parse.__main__ import main; main()",
+            "verify",
+            "--hash",
+            str(tmp_path),
+        ],
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+
+    assert result.returncode == 1
+    assert result.stdout.splitlines() == [f"{path}: photo1-4to3.jpg: missing"]
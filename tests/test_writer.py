@@ -0,0 +1,122 @@
+"""Tests for rewriting single entries of ``.el1`` files."""
+
+import shutil
+import struct
+from pathlib import Path
+
+import pytest
+from construct import Container
+
+from el1_parse.el1_file import El1File
+from el1_parse.structures.el1 import el1
+from el1_parse.structures.page import page
+from el1_parse.writer import retarget_photo_files, update_entry, write_entry
+
+SAMPLE = Path(__file__).parent.parent / "samples" / "p1-l001-f1one-f2two.el1"
+NUM_ENTRIES_OFFSET = 0x28
+CACHE_DIR = "C:\\users\\akaihola\\AppData\\Local\\Canon Easy-PhotoPrint EX\\Cache\\"
+
+
+@pytest.fixture
+def el1_path(tmp_path: Path) -> Path:
+    """Return a copy of the sample file which can be modified."""
+    path = tmp_path / SAMPLE.name
+    shutil.copy(SAMPLE, path)
+    return path
+
+
+def raw_entries(path: Path) -> dict[str, bytes]:
+    """Read the raw bytes of each entry."""
+    with El1File.open(path) as el1_file:
+        return {name: el1_file.raw(name) for name in el1_file.names}
+
+
+def test_same_size_is_patched_in_place(el1_path: Path) -> None:
+    """Retargeting paths only changes bytes inside ``PhotoFile.dat``."""
+    before = el1_path.read_bytes()
+    inode = el1_path.stat().st_ino
+    with El1File.open(el1_path) as el1_file:
+        offset = el1_file.header.entry_table[el1_file.index("PhotoFile.dat")].offset
+
+    changed = retarget_photo_files(el1_path, CACHE_DIR, "D:\\cache\\")
+
+    after = el1_path.read_bytes()
+    assert changed == 4  # noqa: PLR2004
+    assert el1_path.stat().st_ino == inode
+    assert len(after) == len(before)
+    assert after[:offset] == before[:offset]
+    assert after != before
+    photo_files = el1.parse(after).entries[11].data.photo_files
+    assert photo_files[0].cache_dir_path == "D:\\cache\\ELPCache_2\\"
+    assert photo_files[0].cache_dir_path2 == "D:\\cache\\ELPCache_2\\"
+    assert photo_files[1].origin_dir_path == "C:\\users\\akaihola\\Pictures"
+
+
+def test_no_change_does_not_write(el1_path: Path) -> None:
+    """Nothing is written when no path has the prefix."""
+    mtime = el1_path.stat().st_mtime_ns
+
+    assert retarget_photo_files(el1_path, "X:\\nowhere\\", "Y:\\") == 0
+
+    assert el1_path.stat().st_mtime_ns == mtime
+    assert el1_path.read_bytes() == SAMPLE.read_bytes()
+
+
+def test_unmodified_round_trip_is_identical(el1_path: Path) -> None:
+    """Re-encoding an entry without changes gives back the same file."""
+    for name in ("Photo.dat", "PhotoFile.dat"):
+        update_entry(el1_path, name, lambda _entry: None)
+
+    assert el1_path.read_bytes() == SAMPLE.read_bytes()
+
+
+def test_resized_entry_loses_only_padding(el1_path: Path) -> None:
+    """Re-encoding a resized ``Page.dat`` zeroes its padding, and nothing else."""
+    before = raw_entries(el1_path)
+    with El1File.open(el1_path) as el1_file:
+        first_page = el1_file.entry("Page.dat").pages[0]
+    padded_page = page.subcons[-1].subcon.subcon
+    pages_start = len(before["Page.dat"]) - padded_page.sizeof()
+    used = padded_page.subcon.build(first_page)
+    header = bytearray(before["Page.dat"][:pages_start])
+    struct.pack_into("<I", header, NUM_ENTRIES_OFFSET, 2)
+    zeroed_page = used.ljust(padded_page.sizeof(), b"\0")
+    # The sample has non-zero bytes in the padding of its page
+    assert before["Page.dat"][pages_start + len(used) :].strip(b"\0")
+
+    def add_page(page_dat: Container) -> None:
+        page_dat.pages.append(page_dat.pages[0])
+        page_dat.num_entries += 1
+
+    update_entry(el1_path, "Page.dat", add_page)
+
+    after = raw_entries(el1_path)
+    assert after == {**before, "Page.dat": bytes(header) + 2 * zeroed_page}
+
+
+@pytest.mark.parametrize("delta", [-100, 1000])
+def test_resized_entry_shifts_later_entries(el1_path: Path, delta: int) -> None:
+    """Entries after a resized one move, and all other entries stay identical."""
+    before = raw_entries(el1_path)
+    new_text = before["Text.dat"][:100] + b"\xab" * (
+        len(before["Text.dat"]) + delta - 100
+    )
+
+    write_entry(el1_path, "Text.dat", new_text)
+
+    after = raw_entries(el1_path)
+    assert after == {**before, "Text.dat": new_text}
+    parsed = el1.parse(el1_path.read_bytes())
+    original = el1.parse(SAMPLE.read_bytes())
+    for metadata, old in zip(parsed.entry_table, original.entry_table, strict=True):
+        shift = delta if old.offset > original.entry_table[7].offset else 0
+        assert metadata.offset == old.offset + shift
+        assert metadata.name == old.name
+    assert len(el1_path.read_bytes()) == len(SAMPLE.read_bytes()) + delta
+    assert not list(el1_path.parent.glob(".*"))
+
+
+def test_missing_entry(el1_path: Path) -> None:
+    """Writing an entry the file doesn't have is an error."""
+    with pytest.raises(KeyError):
+        write_entry(el1_path, "Nope.dat", b"")
@@ -0,0 +1,66 @@
+// Parses uploaded .el1 files off the main thread and posts HTML fragments back.
+//
+// Messages from the page:
+//   {type: "parse", buffer}  -- the file contents as a transferred ArrayBuffer
+//   {type: "hexdump", name}  -- render the hexdump of an unparsed entry
+// Messages to the page:
+//   {type: "ready"}, {type: "fragment", html}, {type: "done"},
+//   {type: "hexdump", name, html}, {type: "error", html}
+
+importScripts("https://cdn.jsdelivr.net/pyodide/v0.27.5/full/pyodide.js");
+
+async function load() {
+    const pyodide = await loadPyodide();
+    await pyodide.loadPackage("micropip");
+    const micropip = pyodide.pyimport("micropip");
+    await micropip.install('https:dist/el1_parse-0.1.0-py3-none-any.whl');
+    await pyodide.runPythonAsync(`
+        import html
+        import traceback
+
+        from js import postMessage
+        from pyodide.ffi import to_js
+
+        from el1_parse.render_html import HtmlRenderer
+        from el1_parse.untrusted import ParseLimits
+
+        renderer = None
+
+        def post(**message):
+            postMessage(to_js(message, dict_converter=dict))
+
+        def post_error():
+            post(type="error", html=f"<pre>{html.escape(traceback.format_exc())}</pre>")
+
+        def parse(buffer):
+            global renderer
+            try:
+                renderer = HtmlRenderer(buffer.to_memoryview(), ParseLimits(timeout=10))
+                for fragment in renderer:
+                    post(type="fragment", html=fragment)
+            except Exception:
+                post_error()
+            post(type="done")
+
+        def hexdump(name):
+            try:
+                post(type="hexdump", name=name, html=renderer.hexdump(name))
+            except Exception:
+                post_error()
+    `);
+    return pyodide;
+}
+
+const ready = load();
+
+self.onmessage = async (event) => {
+    const pyodide = await ready;
+    const message = event.data;
+    if (message.type === "parse") {
+        pyodide.globals.get("parse")(message.buffer);
+    } else if (message.type === "hexdump") {
+        pyodide.globals.get("hexdump")(message.name);
+    }
+};
+
+ready.then(() => postMessage({type: "ready"}));